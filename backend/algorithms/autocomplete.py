@@ -0,0 +1,289 @@
+# Typeahead Autocomplete
+# Purpose: Suggestions for /autocomplete while the user types. Usernames,
+# display names, recipe titles and tags live in one in-memory sorted array of
+# (key, entry) pairs; a prefix is a bisect range, ranked by popularity.
+# Short prefixes (the widest ranges) keep a cached top-k. Registrations,
+# profile edits and uploads update it in place; a periodic rebuild refreshes
+# popularity. The index is held under AUTOCOMPLETE_MEMORY_MB per worker.
+
+import bisect
+import heapq
+import logging
+import os
+import re
+import threading
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import User, Recipe, Follow
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_REBUILD_SECONDS = int(os.getenv("AUTOCOMPLETE_REBUILD_SECONDS", "900"))
+AUTOCOMPLETE_MEMORY_MB = float(os.getenv("AUTOCOMPLETE_MEMORY_MB", "64"))
+AUTOCOMPLETE_LIMIT = 8
+# Prefixes up to this length keep a cached top-k
+CACHED_PREFIX_LEN = 2
+CACHED_TOP_K = 20
+# Approximate CPython cost of one (key, entry id) pair and one entry
+KEY_OVERHEAD_BYTES = 160
+ENTRY_OVERHEAD_BYTES = 400
+# After exceeding the budget, evict the least popular entries down to this share
+EVICT_TO = 0.9
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def suggestion_keys(text: str) -> set:
+    """The full lowercased text plus each word, so 'Omas Lasagne' matches 'las'."""
+    text = (text or "").strip().lower()
+    if not text:
+        return set()
+    return {text, *_WORD.findall(text)}
+
+
+class AutocompleteIndex:
+    def __init__(self, memory_budget_bytes: int = int(AUTOCOMPLETE_MEMORY_MB * 2**20)):
+        self._lock = threading.Lock()
+        self.built = False
+        self.memory_budget_bytes = memory_budget_bytes
+        # Sorted [(key, entry_id), ...]
+        self._keys = []
+        # entry_id -> {"weight", "keys", "payload"}
+        self._entries = {}
+        # Recipes per tag, and each recipe's tags (to undo them on edit/delete)
+        self._tag_counts = {}
+        self._recipe_tags = {}
+        self._bytes = 0
+        # prefix -> [(weight, entry_id), ...] best first
+        self._top_cache = {}
+
+    # ── maintenance ──────────────────────────────────────────────────
+
+    @staticmethod
+    def _entry_bytes(keys, payload) -> int:
+        text = sum(len(str(v)) for v in payload.values())
+        keys_bytes = sum(KEY_OVERHEAD_BYTES + len(k) for k in keys)
+        return ENTRY_OVERHEAD_BYTES + text + keys_bytes
+
+    def _invalidate(self, keys):
+        for key in keys:
+            for n in range(1, min(len(key), CACHED_PREFIX_LEN) + 1):
+                self._top_cache.pop(key[:n], None)
+
+    def _remove_locked(self, entry_id: str):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in entry["keys"]:
+            i = bisect.bisect_left(self._keys, (key, entry_id))
+            if i < len(self._keys) and self._keys[i] == (key, entry_id):
+                del self._keys[i]
+        self._bytes -= entry["bytes"]
+        self._invalidate(entry["keys"])
+
+    def _add_entry(self, entry_id: str, keys: set, weight: float, payload: dict):
+        """Register an entry without touching the sorted key array."""
+        size = self._entry_bytes(keys, payload)
+        self._entries[entry_id] = {
+            "weight": weight,
+            "keys": keys,
+            "payload": payload,
+            "bytes": size,
+        }
+        self._bytes += size
+
+    def _put_locked(self, entry_id: str, keys: set, weight: float, payload: dict):
+        self._remove_locked(entry_id)
+        if not keys:
+            return
+        self._add_entry(entry_id, keys, weight, payload)
+        for key in keys:
+            bisect.insort(self._keys, (key, entry_id))
+        self._invalidate(keys)
+        if self._bytes > self.memory_budget_bytes:
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """Drop the least popular entries until the index is under budget."""
+        target = self.memory_budget_bytes * EVICT_TO
+        by_weight = sorted(
+            self._entries.items(), key=lambda kv: (kv[1]["weight"], kv[0])
+        )
+        dropped = set()
+        for entry_id, entry in by_weight:
+            if self._bytes <= target:
+                break
+            self._bytes -= entry["bytes"]
+            dropped.add(entry_id)
+        for entry_id in dropped:
+            self._invalidate(self._entries.pop(entry_id)["keys"])
+        self._keys = [pair for pair in self._keys if pair[1] not in dropped]
+        logger.info(f"Autocomplete over memory budget, evicted {len(dropped)} entries")
+
+    def _weight_of(self, entry_id: str, default: float = 0.0) -> float:
+        entry = self._entries.get(entry_id)
+        return entry["weight"] if entry else default
+
+    @staticmethod
+    def _user_entry(user_id: int, username: str, display_name) -> tuple:
+        return (
+            f"user:{user_id}",
+            suggestion_keys(username) | suggestion_keys(display_name),
+            {
+                "type": "user",
+                "id": user_id,
+                "username": username,
+                "display_name": display_name or username,
+            },
+        )
+
+    @staticmethod
+    def _recipe_entry(recipe_id: int, title: str) -> tuple:
+        return (
+            f"recipe:{recipe_id}",
+            suggestion_keys(title),
+            {"type": "recipe", "id": recipe_id, "title": title},
+        )
+
+    @staticmethod
+    def _tag_names(tags) -> set:
+        return {
+            t.strip().lower() for t in (tags or []) if isinstance(t, str) and t.strip()
+        }
+
+    def update_user(self, user_id: int, username: str, display_name, weight=None):
+        """Add or refresh a user; keeps the known popularity unless given."""
+        entry_id, keys, payload = self._user_entry(user_id, username, display_name)
+        with self._lock:
+            if weight is None:
+                weight = self._weight_of(entry_id)
+            self._put_locked(entry_id, keys, weight, payload)
+
+    def remove_user(self, user_id: int):
+        with self._lock:
+            self._remove_locked(f"user:{user_id}")
+
+    def _retag_locked(self, recipe_id: int, tags: set):
+        old = self._recipe_tags.pop(recipe_id, set())
+        if tags:
+            self._recipe_tags[recipe_id] = tags
+        for tag in old ^ tags:
+            count = self._tag_counts.get(tag, 0) + (1 if tag in tags else -1)
+            if count > 0:
+                self._tag_counts[tag] = count
+                self._put_locked(
+                    f"tag:{tag}", suggestion_keys(tag), count, {"type": "tag", "tag": tag}
+                )
+            else:
+                self._tag_counts.pop(tag, None)
+                self._remove_locked(f"tag:{tag}")
+
+    def update_recipe(self, recipe_id: int, title: str, tags, weight=None):
+        entry_id, keys, payload = self._recipe_entry(recipe_id, title)
+        with self._lock:
+            if weight is None:
+                weight = self._weight_of(entry_id)
+            self._put_locked(entry_id, keys, weight, payload)
+            self._retag_locked(recipe_id, self._tag_names(tags))
+
+    def remove_recipe(self, recipe_id: int):
+        with self._lock:
+            self._remove_locked(f"recipe:{recipe_id}")
+            self._retag_locked(recipe_id, set())
+
+    # ── build ────────────────────────────────────────────────────────
+
+    def build(self, db: Session):
+        """Full rebuild with current popularity (followers, likes + saves)."""
+        fresh = AutocompleteIndex(self.memory_budget_bytes)
+        followers = dict(
+            db.query(Follow.following_id, func.count())
+            .group_by(Follow.following_id)
+            .all()
+        )
+        # Entries first, then one sort: inserting one by one would be quadratic
+        for u in db.query(User.id, User.username, User.display_name).yield_per(1000):
+            entry_id, keys, payload = self._user_entry(u.id, u.username, u.display_name)
+            if keys:
+                fresh._add_entry(entry_id, keys, followers.get(u.id, 0), payload)
+        rows = db.query(
+            Recipe.id, Recipe.title, Recipe.tags, Recipe.likes_count, Recipe.saves_count
+        ).yield_per(1000)
+        for r in rows:
+            entry_id, keys, payload = self._recipe_entry(r.id, r.title)
+            if keys:
+                weight = (r.likes_count or 0) + (r.saves_count or 0)
+                fresh._add_entry(entry_id, keys, weight, payload)
+            tags = self._tag_names(r.tags)
+            if tags:
+                fresh._recipe_tags[r.id] = tags
+                for tag in tags:
+                    fresh._tag_counts[tag] = fresh._tag_counts.get(tag, 0) + 1
+        for tag, count in fresh._tag_counts.items():
+            fresh._add_entry(
+                f"tag:{tag}", suggestion_keys(tag), count, {"type": "tag", "tag": tag}
+            )
+        fresh._keys = sorted(
+            (key, entry_id)
+            for entry_id, entry in fresh._entries.items()
+            for key in entry["keys"]
+        )
+        if fresh._bytes > fresh.memory_budget_bytes:
+            fresh._evict_locked()
+        with self._lock:
+            for attr in (
+                "_keys",
+                "_entries",
+                "_tag_counts",
+                "_recipe_tags",
+                "_bytes",
+                "_top_cache",
+            ):
+                setattr(self, attr, getattr(fresh, attr))
+            self.built = True
+
+    def ensure_built(self, db: Session):
+        if not self.built:
+            self.build(db)
+
+    @property
+    def approx_bytes(self) -> int:
+        return self._bytes
+
+    # ── queries ──────────────────────────────────────────────────────
+
+    def _ranked_locked(self, prefix: str, k: int) -> list:
+        lo = bisect.bisect_left(self._keys, (prefix,))
+        hi = bisect.bisect_left(self._keys, (prefix + "\uffff",))
+        ids = {entry_id for _, entry_id in self._keys[lo:hi]}
+        return heapq.nlargest(k, ((self._entries[e]["weight"], e) for e in ids))
+
+    def suggest(self, prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> list:
+        prefix = (prefix or "").strip().lower()
+        if not prefix:
+            return []
+        with self._lock:
+            if len(prefix) <= CACHED_PREFIX_LEN and limit <= CACHED_TOP_K:
+                top = self._top_cache.get(prefix)
+                if top is None:
+                    top = self._ranked_locked(prefix, CACHED_TOP_K)
+                    self._top_cache[prefix] = top
+            else:
+                top = self._ranked_locked(prefix, limit)
+            return [self._entries[e]["payload"] for _, e in top[:limit]]
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def rebuild_autocomplete_job():
+    """Periodic rebuild; refreshes popularity and picks up other workers' writes."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        autocomplete_index.build(db)
+    finally:
+        db.close()
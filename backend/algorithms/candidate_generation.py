@@ -0,0 +1,88 @@
+# Feed Candidate Generation (stage 1)
+# Purpose: Pull a few hundred recipe ids per viewer from cheap indexed sources.
+# Ranking happens in-process afterwards (algorithms/ranking.py).
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models import Recipe, RecipeScore, RecipeTag, Like
+from services.following_inbox import read_following_feed
+from services.recipe_tags import recipe_ids_for_tags
+from algorithms.item_similarity import similar_recipe_ids
+
+CANDIDATES_PER_SOURCE = 200
+# Recent likes used to derive the viewer's tag affinity
+AFFINITY_LIKES = 50
+# Most frequent tags among those likes that are looked up
+AFFINITY_TAGS = 10
+# Recent likes whose precomputed neighbours become candidates
+SIMILAR_TO_LIKES = 20
+
+
+def recent_uploads(db: Session, user_id: int, limit: int) -> list:
+    return [r.id for r in db.query(Recipe.id).order_by(Recipe.id.desc()).limit(limit)]
+
+
+def followed_creators(db: Session, user_id: int, limit: int) -> list:
+    return read_following_feed(db, user_id, limit=limit)
+
+
+def top_scored(db: Session, user_id: int, limit: int) -> list:
+    return [
+        r.recipe_id
+        for r in db.query(RecipeScore.recipe_id)
+        .order_by(RecipeScore.score.desc(), RecipeScore.recipe_id.desc())
+        .limit(limit)
+    ]
+
+
+def tag_affinity(db: Session, user_id: int, limit: int) -> list:
+    """Newest uploads carrying the tags the viewer liked most recently (recipe_tags)."""
+    recent_likes = (
+        db.query(Like.recipe_id)
+        .filter(Like.user_id == user_id)
+        .order_by(Like.created_at.desc(), Like.recipe_id.desc())
+        .limit(AFFINITY_LIKES)
+        .subquery()
+    )
+    tags = [
+        row.tag
+        for row in db.query(RecipeTag.tag)
+        .filter(RecipeTag.recipe_id.in_(select(recent_likes.c.recipe_id)))
+        .group_by(RecipeTag.tag)
+        .order_by(func.count().desc(), RecipeTag.tag)
+        .limit(AFFINITY_TAGS)
+    ]
+    return recipe_ids_for_tags(db, tags, limit)
+
+
+def similar_to_liked(db: Session, user_id: int, limit: int) -> list:
+    """Item-item neighbours of the viewer's recent likes (recipe_neighbors)."""
+    liked = [
+        row.recipe_id
+        for row in db.query(Like.recipe_id)
+        .filter(Like.user_id == user_id)
+        .order_by(Like.created_at.desc(), Like.recipe_id.desc())
+        .limit(SIMILAR_TO_LIKES)
+    ]
+    return similar_recipe_ids(db, liked, limit=limit)
+
+
+CANDIDATE_SOURCES = [
+    recent_uploads,
+    followed_creators,
+    top_scored,
+    tag_affinity,
+    similar_to_liked,
+]
+
+
+def generate_candidates(
+    db: Session, user_id: int, per_source: int = CANDIDATES_PER_SOURCE
+) -> list:
+    """Union of all sources, de-duplicated, in first-seen order."""
+    seen = {}
+    for source in CANDIDATE_SOURCES:
+        for rid in source(db, user_id, per_source):
+            seen.setdefault(rid, None)
+    return list(seen)
@@ -1,12 +1,219 @@
 # Contextual Pairing Algorithm
 # Purpose: Suggest complementary recipes (e.g., Sauce for Pasta) based on current video and user preferences.
+# Backed by an in-memory ingredient/tag co-occurrence index with PMI weights,
+# kept current incrementally on upload, update and delete.
 
+from typing import Optional
+import heapq
+import math
+import os
+import threading
 
-def get_contextual_suggestions(current_video_id: int, user_id: int):
+from sqlalchemy.orm import Session
+
+from models import Recipe
+
+PAIRING_REBUILD_SECONDS = int(os.getenv("PAIRING_REBUILD_SECONDS", "3600"))
+# Pairs seen in fewer recipes than this are not trusted
+MIN_PAIR_COUNT = 2
+PAIRING_TERMS = 5
+PAIRING_RECIPES = 10
+
+
+def recipe_terms(tags, ingredients) -> set:
+    """Normalized 'tag:...' / 'ing:...' terms of one recipe."""
+    terms = set()
+    for tag in tags or []:
+        if isinstance(tag, str) and tag.strip():
+            terms.add(f"tag:{tag.strip().lower()}")
+    for ing in ingredients or []:
+        name = ing.get("name") if isinstance(ing, dict) else ing
+        if isinstance(name, str) and name.strip():
+            terms.add(f"ing:{name.strip().lower()}")
+    return terms
+
+
+class CooccurrenceIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._term_ids = {}
+        self._terms = []
+        # term id -> number of recipes containing it
+        self._df = []
+        # term id -> {partner term id: number of recipes containing both}
+        self._pairs = []
+        # term id -> set of recipe ids (posting list)
+        self._postings = []
+        # recipe id -> tuple of term ids, needed to undo a recipe on update
+        self._recipe_terms = {}
+        # term id -> [(ppmi, partner id), ...] best first. PMI depends on the
+        # recipe count and on both terms' df, so an entry is dropped when its
+        # term or one of its partners is touched, and all are when n changes
+        self._partner_cache = {}
+
+    def _term_id(self, term: str) -> int:
+        tid = self._term_ids.get(term)
+        if tid is None:
+            tid = self._term_ids[term] = len(self._terms)
+            self._terms.append(term)
+            self._df.append(0)
+            self._pairs.append({})
+            self._postings.append(set())
+        return tid
+
+    def _apply(self, recipe_id: int, term_ids: tuple, delta: int):
+        for a in term_ids:
+            self._df[a] += delta
+            self._partner_cache.pop(a, None)
+            for b in self._pairs[a]:
+                self._partner_cache.pop(b, None)
+            if delta > 0:
+                self._postings[a].add(recipe_id)
+            else:
+                self._postings[a].discard(recipe_id)
+            partners = self._pairs[a]
+            for b in term_ids:
+                if a == b:
+                    continue
+                count = partners.get(b, 0) + delta
+                if count > 0:
+                    partners[b] = count
+                else:
+                    partners.pop(b, None)
+
+    def update_recipe(self, recipe_id: int, tags, ingredients):
+        """Add a recipe, or replace its previous terms."""
+        with self._lock:
+            n = len(self._recipe_terms)
+            old = self._recipe_terms.pop(recipe_id, None)
+            if old:
+                self._apply(recipe_id, old, -1)
+            new = tuple(self._term_id(t) for t in sorted(recipe_terms(tags, ingredients)))
+            if new:
+                self._recipe_terms[recipe_id] = new
+                self._apply(recipe_id, new, 1)
+            if len(self._recipe_terms) != n:
+                self._partner_cache.clear()
+
+    def remove_recipe(self, recipe_id: int):
+        with self._lock:
+            old = self._recipe_terms.pop(recipe_id, None)
+            if old:
+                self._apply(recipe_id, old, -1)
+                self._partner_cache.clear()
+
+    def build(self, db: Session):
+        """Full rebuild from the recipes table."""
+        fresh = CooccurrenceIndex()
+        for r in db.query(Recipe.id, Recipe.tags, Recipe.ingredients).yield_per(1000):
+            fresh.update_recipe(r.id, r.tags, r.ingredients)
+        with self._lock:
+            for attr in (
+                "_term_ids",
+                "_terms",
+                "_df",
+                "_pairs",
+                "_postings",
+                "_recipe_terms",
+                "_partner_cache",
+            ):
+                setattr(self, attr, getattr(fresh, attr))
+            self.built = True
+
+    def ensure_built(self, db: Session):
+        if not self.built:
+            self.build(db)
+
+    def _partners(self, tid: int) -> list:
+        cached = self._partner_cache.get(tid)
+        if cached is not None:
+            return cached
+        n = len(self._recipe_terms)
+        scored = []
+        for partner, count in self._pairs[tid].items():
+            if count < MIN_PAIR_COUNT:
+                continue
+            pmi = math.log(count * n / (self._df[tid] * self._df[partner]))
+            if pmi > 0:
+                scored.append((pmi, partner))
+        scored.sort(reverse=True)
+        self._partner_cache[tid] = scored
+        return scored
+
+    def complementary_terms(self, recipe_id: int, limit: int = PAIRING_TERMS) -> list:
+        """[(term, score), ...]: terms that co-occur with this recipe's terms but are missing."""
+        with self._lock:
+            base = set(self._recipe_terms.get(recipe_id, ()))
+            scores = {}
+            for tid in base:
+                for pmi, partner in self._partners(tid):
+                    if partner not in base:
+                        scores[partner] = scores.get(partner, 0.0) + pmi
+            best = heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], -kv[0]))
+            return [(self._terms[tid], score) for tid, score in best]
+
+    def recipes_with_terms(
+        self, weighted_terms: list, exclude: int, limit: int = PAIRING_RECIPES
+    ) -> list:
+        """[(recipe_id, score), ...] for recipes containing the weighted terms."""
+        with self._lock:
+            scores = {}
+            for term, weight in weighted_terms:
+                tid = self._term_ids.get(term)
+                if tid is None:
+                    continue
+                for rid in self._postings[tid]:
+                    if rid != exclude:
+                        scores[rid] = scores.get(rid, 0.0) + weight
+            return heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], kv[0]))
+
+
+pairing_index = CooccurrenceIndex()
+
+
+def get_contextual_suggestions(
+    db: Session, current_video_id: int, user_id: Optional[int] = None
+) -> dict:
     """
-    1. Identify 'Base' component in current video (e.g., 'Pasta', 'Steak', 'Pancakes').
-    2. Determine 'Complementary' category (e.g., 'Sauce', 'Side Dish', 'Syrup').
-    3. Filter candidates by User Preferences (e.g., 'Vegetarian', 'No Nuts', 'Spicy').
-    4. Rank by Relevance and Quality Score.
+    1. Identify the base terms of the current recipe (e.g. 'Pasta').
+    2. Find complementary terms by PMI (e.g. 'Sauce', 'Parmesan').
+    3. Collect recipes containing them.
+    4. Re-rank by the user's interest vector, if they have one.
+    Returns {"pairings": [(term, score), ...], "recipe_ids": [...]}.
     """
-    pass
+    from algorithms.recommendation import load_user_vector, interest_scores
+
+    pairing_index.ensure_built(db)
+    terms = pairing_index.complementary_terms(current_video_id)
+    candidates = pairing_index.recipes_with_terms(
+        terms, exclude=current_video_id, limit=PAIRING_RECIPES * 3
+    )
+    if candidates and user_id is not None:
+        rows = (
+            db.query(Recipe.id, Recipe.tags, Recipe.ingredients)
+            .filter(Recipe.id.in_([rid for rid, _ in candidates]))
+            .all()
+        )
+        interest = dict(
+            zip([r.id for r in rows], interest_scores(load_user_vector(db, user_id), rows))
+        )
+        candidates = [
+            (rid, score * (1.0 + interest.get(rid, 0.0))) for rid, score in candidates
+        ]
+        candidates.sort(key=lambda kv: (kv[1], kv[0]), reverse=True)
+    return {
+        "pairings": terms,
+        "recipe_ids": [rid for rid, _ in candidates[:PAIRING_RECIPES]],
+    }
+
+
+def rebuild_pairing_index_job():
+    """Periodic full rebuild; picks up writes made by other workers."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        pairing_index.build(db)
+    finally:
+        db.close()
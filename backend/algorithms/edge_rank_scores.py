@@ -0,0 +1,144 @@
+# Materialized EdgeRank scores
+# Purpose: Keep the viewer-independent part of the feed score in recipe_scores so
+# the request path only has to read an indexed top-N slice.
+
+from datetime import datetime
+from typing import Optional
+import logging
+import os
+
+from sqlalchemy.orm import Session
+
+from models import Recipe, RecipeScore
+from timeutils import utcnow, as_utc
+
+logger = logging.getLogger(__name__)
+
+SCORE_REFRESH_SECONDS = int(os.getenv("SCORE_REFRESH_SECONDS", "60"))
+
+# Cold start boost: views < 50 AND age_in_hours < 24 -> +50
+COLD_START_VIEWS = 50
+COLD_START_HOURS = 24
+COLD_START_BOOST = 50.0
+
+# Quality multiplier: 0.75 at quality 0, 1.0 at the neutral 0.5, 1.25 at 1
+QUALITY_BASE = 0.75
+QUALITY_SPAN = 0.5
+
+
+def age_in_hours(created_at: Optional[datetime], now: datetime) -> float:
+    if not created_at:
+        return 0.0
+    return max((as_utc(now) - as_utc(created_at)).total_seconds() / 3600.0, 0.0)
+
+
+def edge_rank_base_score(
+    likes: int,
+    saves: int,
+    comments: int,
+    views: int,
+    age_hours: float,
+    quality: float = 0.5,
+) -> float:
+    """EdgeRank without the per-viewer follow boost."""
+    base_score = (likes * 2) + (saves * 3) + (comments * 2) + (views * 0.1)
+    time_penalty = (age_hours + 2) ** 1.5
+    score = base_score / time_penalty
+    if views < COLD_START_VIEWS and age_hours < COLD_START_HOURS:
+        score += COLD_START_BOOST
+    return score * (QUALITY_BASE + QUALITY_SPAN * quality)
+
+
+def _inputs(recipe_row, now: datetime):
+    age_hours = age_in_hours(recipe_row.created_at, now)
+    return (
+        recipe_row.likes_count or 0,
+        recipe_row.saves_count or 0,
+        recipe_row.comments_count or 0,
+        recipe_row.views or 0,
+        recipe_row.quality_score if recipe_row.quality_score is not None else 0.5,
+        int(age_hours),
+    ), age_hours
+
+
+def upsert_recipe_score(db: Session, recipe: Recipe, now: Optional[datetime] = None):
+    """Score a single recipe immediately (e.g. right after upload)."""
+    now = now or utcnow()
+    (likes, saves, comments, views, quality, bucket), age_hours = _inputs(recipe, now)
+    row = db.get(RecipeScore, recipe.id) or RecipeScore(recipe_id=recipe.id)
+    row.owner_id = recipe.owner_id
+    row.likes_count = likes
+    row.saves_count = saves
+    row.comments_count = comments
+    row.views = views
+    row.quality_score = quality
+    row.age_bucket = bucket
+    row.score = edge_rank_base_score(likes, saves, comments, views, age_hours, quality)
+    db.add(row)
+
+
+def refresh_recipe_scores(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Recompute scores whose engagement counters or hourly age bucket changed,
+    and drop rows of deleted recipes. Returns the number of rows written.
+    Caller commits.
+    """
+    now = now or utcnow()
+    recipes = db.query(
+        Recipe.id,
+        Recipe.owner_id,
+        Recipe.created_at,
+        Recipe.likes_count,
+        Recipe.saves_count,
+        Recipe.comments_count,
+        Recipe.views,
+        Recipe.quality_score,
+    ).all()
+    existing = {s.recipe_id: s for s in db.query(RecipeScore).all()}
+
+    written = 0
+    for r in recipes:
+        inputs, age_hours = _inputs(r, now)
+        row = existing.pop(r.id, None)
+        if row is not None and inputs == (
+            row.likes_count,
+            row.saves_count,
+            row.comments_count,
+            row.views,
+            row.quality_score,
+            row.age_bucket,
+        ):
+            continue
+        if row is None:
+            row = RecipeScore(recipe_id=r.id)
+            db.add(row)
+        likes, saves, comments, views, quality, bucket = inputs
+        row.owner_id = r.owner_id
+        row.likes_count = likes
+        row.saves_count = saves
+        row.comments_count = comments
+        row.views = views
+        row.quality_score = quality
+        row.age_bucket = bucket
+        row.score = edge_rank_base_score(
+            likes, saves, comments, views, age_hours, quality
+        )
+        written += 1
+
+    for orphan in existing.values():
+        db.delete(orphan)
+    return written
+
+
+def refresh_recipe_scores_job():
+    """Entry point for the periodic background refresher."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        written = refresh_recipe_scores(db)
+        db.commit()
+        if written:
+            logger.info(f"Refreshed {written} recipe scores")
+    finally:
+        db.close()
@@ -0,0 +1,100 @@
+# Database Full-Text Search
+# Purpose: Recipe search on the database's own full-text engine, as an
+# alternative to the in-process BM25 index (algorithms/search_engine.py).
+# SQLite: FTS5 table recipes_fts kept in sync by triggers, ranked by bm25().
+# Postgres: generated tsvector column with a GIN index, ranked by ts_rank.
+# Schema is created in migrations._setup_fulltext. Every backend returns
+# ([(recipe_id, score), ...], total) like search_engine.search_recipes.
+
+from sqlalchemy import or_, select, text
+from sqlalchemy.orm import Session
+
+from models import Recipe, RecipeTag
+from algorithms.search_engine import FIELD_WEIGHTS, tokenize
+from services.recipe_tags import normalize_tag
+
+
+def _fts5_query(words: list, prefix: bool) -> str:
+    terms = [f'"{w}"' for w in words]
+    if prefix:
+        terms[-1] += "*"
+    return " OR ".join(terms)
+
+
+def _tsquery(words: list, prefix: bool) -> str:
+    terms = list(words)
+    if prefix:
+        terms[-1] += ":*"
+    return " | ".join(terms)
+
+
+def _paged(db: Session, sql: str, params: dict, count_sql: str, offset: int) -> tuple:
+    """Runs a ranked query with a count(*) OVER () column; returns (hits, total)."""
+    rows = db.execute(text(sql), params).all()
+    if rows:
+        return [(r.id, float(r.score)) for r in rows], rows[0].total
+    if offset:
+        return [], db.execute(text(count_sql), params).scalar()
+    return [], 0
+
+
+def search_sqlite_fts(db: Session, words: list, prefix: bool, limit: int, offset: int):
+    # Column order of recipes_fts
+    columns = ("title", "tags", "ingredients", "chef")
+    weights = ", ".join(str(FIELD_WEIGHTS[c]) for c in columns)
+    params = {"q": _fts5_query(words, prefix), "limit": limit, "offset": offset}
+    # bm25() is lower-is-better; negate so higher scores rank first everywhere
+    return _paged(
+        db,
+        # bm25() cannot be evaluated inside a window query, hence the subquery
+        "SELECT id, score, count(*) OVER () AS total FROM ("
+        f"SELECT rowid AS id, -bm25(recipes_fts, {weights}) AS score "
+        "FROM recipes_fts WHERE recipes_fts MATCH :q) "
+        "ORDER BY score DESC, id DESC LIMIT :limit OFFSET :offset",
+        params,
+        "SELECT count(*) FROM recipes_fts WHERE recipes_fts MATCH :q",
+        offset,
+    )
+
+
+def search_postgres_fts(db: Session, words: list, prefix: bool, limit: int, offset: int):
+    params = {"q": _tsquery(words, prefix), "limit": limit, "offset": offset}
+    return _paged(
+        db,
+        "SELECT id, ts_rank(search_vector, query) AS score, count(*) OVER () AS total "
+        "FROM recipes, to_tsquery('simple', :q) AS query "
+        "WHERE search_vector @@ query "
+        "ORDER BY score DESC, id DESC LIMIT :limit OFFSET :offset",
+        params,
+        "SELECT count(*) FROM recipes WHERE search_vector @@ to_tsquery('simple', :q)",
+        offset,
+    )
+
+
+FULLTEXT_BACKENDS = {
+    "sqlite": search_sqlite_fts,
+    "postgresql": search_postgres_fts,
+}
+
+
+def fulltext_search(db: Session, query: str, limit: int = 20, offset: int = 0) -> tuple:
+    """Ranked recipe search on the current database's full-text engine."""
+    words = tokenize(query)
+    if not words:
+        return [], 0
+    backend = FULLTEXT_BACKENDS.get(db.get_bind().dialect.name)
+    if backend is None:
+        return ilike_search(db, query, limit, offset)
+    # Search-as-you-type: the last word may still be incomplete
+    return backend(db, words, not query[-1:].isspace(), limit, offset)
+
+
+def ilike_search(db: Session, query: str, limit: int = 20, offset: int = 0) -> tuple:
+    """Title substring or exact tag match (the former /search path, plus tags)."""
+    tagged = select(RecipeTag.recipe_id).where(RecipeTag.tag == normalize_tag(query))
+    matches = db.query(Recipe.id).filter(
+        or_(Recipe.title.ilike(f"%{query}%"), Recipe.id.in_(tagged))
+    )
+    total = matches.count()
+    rows = matches.order_by(Recipe.id.desc()).limit(limit).offset(offset)
+    return [(r.id, 0.0) for r in rows], total
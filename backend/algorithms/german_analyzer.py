@@ -0,0 +1,140 @@
+# German Text Analyzer
+# Purpose: Turn recipe text and search queries into index terms so that
+# "Käsespätzle", "Kaesespaetzle" and "spätzle" find the same recipe.
+# Pipeline per word: umlaut/ß folding -> compound splitting against a lexicon
+# of food words (built in, plus words learned from the indexed recipes) ->
+# light suffix stripping. Used by the in-process search index
+# (algorithms/search_engine.py).
+
+import re
+import unicodedata
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_FOLD = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+# Shortest compound part; learned words must be longer to avoid bogus splits
+COMPOUND_MIN_PART = 3
+LEARNED_MIN_LENGTH = 5
+COMPOUND_MAX_LENGTH = 40
+# Linking elements between compound parts (Fugenelemente): Linse-n-suppe
+LINKS = ("es", "en", "er", "s", "n")
+
+# Consonants after which a trailing -s / -st is a suffix (Savoy's light stemmer)
+_S_ENDING = set("bdfghklmnrt")
+_ST_ENDING = set("bdfghklmnt")
+
+
+def fold(text: str) -> str:
+    """Lowercase, ä/ö/ü -> ae/oe/ue, ß -> ss, other accents dropped."""
+    text = unicodedata.normalize("NFC", text or "").lower().translate(_FOLD)
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)
+    )
+
+
+def words(text: str) -> list:
+    return _WORD.findall(fold(text))
+
+
+def stem(word: str) -> str:
+    """Light German suffix stripping on a folded word (Nudeln/Nudel -> nudel)."""
+    n = len(word)
+    if n > 5 and word.endswith("ern"):
+        word = word[:-3]
+    elif n > 4 and word[-2:] in ("em", "en", "er", "es"):
+        word = word[:-2]
+    elif n > 3 and word[-1] == "e":
+        word = word[:-1]
+    elif n > 3 and word[-1] == "n" and word[-2] in "lr":
+        word = word[:-1]
+    elif n > 3 and word[-1] == "s" and word[-2] in _S_ENDING:
+        word = word[:-1]
+
+    n = len(word)
+    if n > 5 and word.endswith("est"):
+        word = word[:-3]
+    elif n > 4 and word[-2:] in ("er", "en"):
+        word = word[:-2]
+    elif n > 5 and word[-2:] == "st" and word[-3] in _ST_ENDING:
+        word = word[:-2]
+    return word
+
+
+FOOD_WORDS = (
+    "Apfel", "Aprikose", "Aubergine", "Auflauf", "Avocado", "Banane", "Basilikum",
+    "Beere", "Birne", "Blumenkohl", "Bohne", "Braten", "Brot", "Brötchen",
+    "Brühe", "Butter", "Champignon", "Chili", "Creme", "Curry", "Dip", "Dressing",
+    "Eis", "Ente", "Erbse", "Erdbeere", "Essig", "Feta", "Fisch", "Fleisch",
+    "Frikadelle", "Frucht", "Frühstück", "Gans", "Garnele", "Gemüse", "Gewürz",
+    "Gratin", "Grieß", "Gulasch", "Gurke", "Hack", "Hackfleisch", "Hafer",
+    "Hähnchen", "Himbeere", "Honig", "Huhn", "Joghurt", "Kakao", "Kalb", "Karotte",
+    "Kartoffel", "Käse", "Keks", "Kirsche", "Kloß", "Knoblauch", "Knödel", "Kohl",
+    "Kokos", "Korn", "Kraut", "Kräuter", "Kuchen", "Kürbis", "Lachs", "Lamm",
+    "Lauch", "Limette", "Linse", "Mais", "Mandel", "Mango", "Marmelade", "Mehl",
+    "Milch", "Minze", "Möhre", "Nudel", "Nuss", "Obst", "Öl", "Oliven", "Orange",
+    "Paprika", "Pasta", "Pesto", "Pfanne", "Pfannkuchen", "Pfeffer", "Pflaume",
+    "Pilz", "Pizza", "Plätzchen", "Pudding", "Püree", "Quark", "Reis", "Rind",
+    "Rosmarin", "Rotkohl", "Rübe", "Sahne", "Salat", "Salz", "Sauce", "Soße",
+    "Schinken", "Schnitzel", "Schoko", "Schokolade", "Schwein", "Senf", "Soja",
+    "Spargel", "Spätzle", "Speck", "Spinat", "Suppe", "Tee", "Teig", "Thunfisch",
+    "Tofu", "Tomate", "Topf", "Torte", "Vanille", "Waffel", "Walnuss", "Wein",
+    "Wurst", "Zimt", "Zitrone", "Zucchini", "Zucker", "Zwiebel",
+)
+# Stems, so inflected parts count too: Tomate-n-suppe, Kartoffel-n
+FOOD_STEMS = frozenset(stem(fold(w)) for w in FOOD_WORDS)
+
+
+class GermanAnalyzer:
+    def __init__(self, learned=()):
+        # Stems of words seen in indexed recipes, compound parts next to FOOD_STEMS
+        self.learned = set(learned)
+
+    def learn(self, folded_words):
+        self.learned.update(
+            stem(w) for w in folded_words if len(w) >= LEARNED_MIN_LENGTH
+        )
+
+    def _known(self, word: str) -> bool:
+        s = stem(word)
+        return s in FOOD_STEMS or s in self.learned
+
+    def _known_head(self, head: str):
+        if self._known(head):
+            return head
+        for link in LINKS:
+            base = head[: -len(link)]
+            if not head.endswith(link) or len(base) < COMPOUND_MIN_PART:
+                continue
+            if self._known(base):
+                return base
+        return None
+
+    def split_compound(self, word: str) -> list:
+        """Known parts of a folded compound ("kaesespaetzle" -> kaese, spaetzle)."""
+        if not 2 * COMPOUND_MIN_PART <= len(word) <= COMPOUND_MAX_LENGTH:
+            return []
+        # Longest head first: "tomatensuppe" -> tomate + suppe, not tom + ...
+        for i in range(len(word) - COMPOUND_MIN_PART, COMPOUND_MIN_PART - 1, -1):
+            head = self._known_head(word[:i])
+            if head is None:
+                continue
+            tail = word[i:]
+            if self._known(tail):
+                return [head, tail]
+            rest = self.split_compound(tail)
+            if rest:
+                return [head, *rest]
+        return []
+
+    def analyze_word(self, word: str) -> tuple:
+        """(stem of the folded word, [stems of its compound parts])."""
+        return stem(word), [stem(p) for p in self.split_compound(word)]
+
+    def terms(self, text: str) -> list:
+        """Index terms of a text: every word's stem plus its compound parts."""
+        out = []
+        for word in words(text):
+            full, parts = self.analyze_word(word)
+            out.append(full)
+            out.extend(parts)
+        return out
@@ -0,0 +1,230 @@
+# Ingredient Coverage ("Was kann ich damit kochen?")
+# Purpose: Rank recipes by the share of their ingredients the user already has.
+# An in-memory ingredient -> recipe posting-list index over each ingredient's
+# head noun, folded and stemmed ("2 rote Zwiebeln" == "zwiebel"). Recipes sit
+# in dense integer slots, so a query concatenates the posting arrays of the
+# user's ingredients and counts matches per recipe with one np.bincount.
+# Kept current on upload/edit/delete; rebuilt periodically (compacts slots).
+
+import os
+import re
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models import Recipe
+from algorithms.german_analyzer import FOOD_STEMS, fold, stem
+
+INGREDIENT_INDEX_REBUILD_SECONDS = int(
+    os.getenv("INGREDIENT_INDEX_REBUILD_SECONDS", "3600")
+)
+COOK_WITH_LIMIT = 20
+# Most ingredients a single query may list
+COOK_WITH_MAX_INGREDIENTS = 50
+
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+UNIT_WORDS = (
+    "g", "kg", "mg", "ml", "cl", "dl", "l", "EL", "TL", "Esslöffel", "Teelöffel",
+    "Prise", "Msp", "Stück", "Stk", "Pck", "Packung", "Päckchen", "Dose", "Bund",
+    "Becher", "Tasse", "Glas", "Scheibe", "Zehe", "Handvoll", "etwas", "ca",
+)
+UNIT_STEMS = frozenset(stem(fold(w)) for w in UNIT_WORDS)
+
+
+def normalize_ingredient(name) -> str:
+    """
+    Folded, stemmed head noun of an ingredient name, so amounts, units and
+    adjectives do not matter ('2 rote Zwiebeln', '100ml Milch'). The head is
+    the last known food word, else the last capitalized (noun) word, else the
+    last word.
+    """
+    if not isinstance(name, str):
+        return ""
+    tokens = [
+        (stem(fold(w)), w[0].isupper())
+        for w in _WORD.findall(name)
+        # Amounts such as "2", "½" or "100ml"
+        if not w[0].isnumeric()
+    ]
+    tokens = [(t, noun) for t, noun in tokens if t and t not in UNIT_STEMS]
+    if not tokens:
+        return ""
+    for preferred in (
+        [t for t, _ in tokens if t in FOOD_STEMS],
+        [t for t, noun in tokens if noun],
+    ):
+        if preferred:
+            return preferred[-1]
+    return tokens[-1][0]
+
+
+def ingredient_name(ingredient):
+    return ingredient.get("name") if isinstance(ingredient, dict) else ingredient
+
+
+def recipe_ingredients(ingredients) -> tuple:
+    """Unique normalized ingredient names (head nouns) of one recipe."""
+    names = (normalize_ingredient(ingredient_name(i)) for i in ingredients or [])
+    return tuple(dict.fromkeys(n for n in names if n))
+
+
+def missing_ingredients(ingredients, have: set) -> list:
+    """The recipe's ingredient entries (as stored) not covered by have."""
+    return [
+        i
+        for i in ingredients or []
+        if normalize_ingredient(ingredient_name(i)) not in have
+    ]
+
+
+class IngredientIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._slots = {}
+        # slot -> recipe id (0 once the recipe was removed)
+        self._recipe_ids = np.zeros(0, dtype=np.int64)
+        # slot -> number of distinct ingredients
+        self._sizes = np.zeros(0, dtype=np.int32)
+        self._used = 0
+        # ingredient -> set of slots; arrays are materialized on first query
+        self._postings = {}
+        self._arrays = {}
+        # recipe id -> ingredient names, needed to undo a recipe on update
+        self._recipe_names = {}
+
+    # ── maintenance ──────────────────────────────────────────────────
+
+    def _grow(self):
+        capacity = max(1024, 2 * len(self._sizes))
+        self._recipe_ids = np.resize(self._recipe_ids, capacity)
+        self._sizes = np.resize(self._sizes, capacity)
+
+    def _remove_locked(self, recipe_id: int):
+        names = self._recipe_names.pop(recipe_id, None)
+        slot = self._slots.pop(recipe_id, None)
+        if slot is None:
+            return
+        self._recipe_ids[slot] = 0
+        self._sizes[slot] = 0
+        for name in names:
+            posting = self._postings[name]
+            posting.discard(slot)
+            self._arrays.pop(name, None)
+            if not posting:
+                del self._postings[name]
+
+    def update_recipe(self, recipe_id: int, ingredients):
+        """Add a recipe, or replace its previous ingredients (in a new slot)."""
+        names = recipe_ingredients(ingredients)
+        with self._lock:
+            self._remove_locked(recipe_id)
+            if not names:
+                return
+            if self._used == len(self._sizes):
+                self._grow()
+            slot = self._used
+            self._used += 1
+            self._slots[recipe_id] = slot
+            self._recipe_ids[slot] = recipe_id
+            self._sizes[slot] = len(names)
+            self._recipe_names[recipe_id] = names
+            for name in names:
+                self._postings.setdefault(name, set()).add(slot)
+                self._arrays.pop(name, None)
+
+    def remove_recipe(self, recipe_id: int):
+        with self._lock:
+            self._remove_locked(recipe_id)
+
+    def build(self, db: Session):
+        """Full rebuild from the recipes table, with densely packed slots."""
+        fresh = IngredientIndex()
+        for r in db.query(Recipe.id, Recipe.ingredients).yield_per(1000):
+            fresh.update_recipe(r.id, r.ingredients)
+        with self._lock:
+            for attr in (
+                "_slots",
+                "_recipe_ids",
+                "_sizes",
+                "_used",
+                "_postings",
+                "_arrays",
+                "_recipe_names",
+            ):
+                setattr(self, attr, getattr(fresh, attr))
+            self.built = True
+
+    def ensure_built(self, db: Session):
+        if not self.built:
+            self.build(db)
+
+    # ── queries ──────────────────────────────────────────────────────
+
+    def _posting_array(self, name: str):
+        array = self._arrays.get(name)
+        if array is None:
+            array = np.fromiter(self._postings[name], dtype=np.int64)
+            self._arrays[name] = array
+        return array
+
+    def cook_with(
+        self,
+        have,
+        limit: int = COOK_WITH_LIMIT,
+        offset: int = 0,
+        min_coverage: float = 0.0,
+    ) -> tuple:
+        """
+        Recipes containing any of the ingredients in have (normalized names),
+        best coverage first; ties go to recipes with more matches, then newer
+        ones. Returns ([(recipe_id, coverage, matched), ...] for the requested
+        page, total number of matching recipes).
+        """
+        with self._lock:
+            arrays = [self._posting_array(n) for n in set(have) if n in self._postings]
+            if not arrays:
+                return [], 0
+            n = self._used
+            matched = np.bincount(np.concatenate(arrays), minlength=n)
+            slots = np.flatnonzero(matched)
+            matched = matched[slots]
+            coverage = matched / self._sizes[slots]
+            recipe_ids = self._recipe_ids[slots]
+
+        keep = coverage >= min_coverage
+        slots, matched, coverage, recipe_ids = (
+            slots[keep],
+            matched[keep],
+            coverage[keep],
+            recipe_ids[keep],
+        )
+        # np.lexsort sorts by the last key first
+        order = np.lexsort((-recipe_ids, -matched, -coverage))[offset : offset + limit]
+        page = [
+            (int(recipe_ids[i]), float(coverage[i]), int(matched[i])) for i in order
+        ]
+        return page, len(slots)
+
+
+ingredient_index = IngredientIndex()
+
+
+def cook_with(db: Session, ingredients: list, **kwargs) -> tuple:
+    """cook_with on the shared index, for raw ingredient names as typed."""
+    ingredient_index.ensure_built(db)
+    have = {n for n in map(normalize_ingredient, ingredients) if n}
+    return ingredient_index.cook_with(have, **kwargs)
+
+
+def rebuild_ingredient_index_job():
+    """Periodic full rebuild; picks up writes made by other workers."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        ingredient_index.build(db)
+    finally:
+        db.close()
@@ -0,0 +1,223 @@
+# Item-to-Item Collaborative Filtering
+# Purpose: Precompute each recipe's top-K most similar recipes ("people who
+# liked/saved this also liked/saved ...") into recipe_neighbors, so request
+# paths only do one indexed read.
+
+from typing import Optional
+import logging
+import os
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import insert, or_
+from sqlalchemy.orm import Session
+
+from models import Recipe, Like, SavedRecipe, RecipeNeighbor, RecipeNeighborState
+
+logger = logging.getLogger(__name__)
+
+NEIGHBORS_REFRESH_SECONDS = int(os.getenv("NEIGHBORS_REFRESH_SECONDS", "3600"))
+NEIGHBORS_TOP_K = 20
+# Target recipes per similarity block; bounds the (block x recipes) product
+NEIGHBORS_BLOCK_SIZE = 512
+# Neighbours sharing fewer users than this are noise
+MIN_CO_INTERACTIONS = 2
+
+
+def build_interaction_matrix(db: Session):
+    """
+    Binary user x recipe CSR matrix from likes and saves.
+    Returns (matrix, recipe_ids) where column j belongs to recipe_ids[j].
+    """
+    pairs = set(db.query(Like.user_id, Like.recipe_id).all())
+    pairs.update(db.query(SavedRecipe.user_id, SavedRecipe.recipe_id).distinct().all())
+    if not pairs:
+        return sp.csr_matrix((0, 0), dtype=np.float32), np.empty(0, dtype=np.int64)
+
+    users, recipes = np.array(sorted(pairs), dtype=np.int64).T
+    user_ids, rows = np.unique(users, return_inverse=True)
+    recipe_ids, cols = np.unique(recipes, return_inverse=True)
+    matrix = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(user_ids), len(recipe_ids)),
+    )
+    return matrix, recipe_ids
+
+
+def top_k_neighbors(matrix, columns, top_k: int = NEIGHBORS_TOP_K):
+    """
+    Cosine top-K for the given target columns, computed block by block.
+    Yields (column, neighbor_columns, similarities) with similarities descending.
+    """
+    norms = np.sqrt(np.asarray(matrix.sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+    normalized = (matrix @ sp.diags(1.0 / norms)).tocsc()
+
+    for start in range(0, len(columns), NEIGHBORS_BLOCK_SIZE):
+        block = np.asarray(columns[start : start + NEIGHBORS_BLOCK_SIZE])
+        sims = (normalized[:, block].T @ normalized).tocsr()
+        for i, col in enumerate(block):
+            lo, hi = sims.indptr[i], sims.indptr[i + 1]
+            idx, vals = sims.indices[lo:hi], sims.data[lo:hi]
+            # Binary matrix: shared users = cosine * |a| * |b|
+            shared = np.rint(vals * norms[col] * norms[idx])
+            keep = (idx != col) & (shared >= MIN_CO_INTERACTIONS)
+            idx, vals = idx[keep], vals[keep]
+            if len(idx) > top_k:
+                part = np.argpartition(-vals, top_k - 1)[:top_k]
+                idx, vals = idx[part], vals[part]
+            order = np.lexsort((idx, -vals))
+            yield col, idx[order], vals[order]
+
+
+def mark_interactions_changed(db: Session, recipe_ids):
+    """After likes/saves of the recipes were added or removed. Caller commits."""
+    recipe_ids = list(recipe_ids)
+    if recipe_ids:
+        db.query(Recipe).filter(Recipe.id.in_(recipe_ids)).update(
+            {Recipe.interactions_version: Recipe.interactions_version + 1},
+            synchronize_session=False,
+        )
+
+
+def _dirty_recipe_ids(db: Session) -> list:
+    """Recipes with likes/saves written since their neighbours were computed."""
+    rows = (
+        db.query(Recipe.id)
+        .outerjoin(RecipeNeighborState, RecipeNeighborState.recipe_id == Recipe.id)
+        .filter(
+            or_(
+                RecipeNeighborState.recipe_id.is_(None),
+                RecipeNeighborState.interactions != Recipe.interactions_version,
+            )
+        )
+        .all()
+    )
+    return [r.id for r in rows]
+
+
+def _pointing_at(db: Session, recipe_ids: list) -> set:
+    """Recipes whose stored neighbour lists contain any of recipe_ids."""
+    pointing = set()
+    for start in range(0, len(recipe_ids), NEIGHBORS_BLOCK_SIZE):
+        chunk = recipe_ids[start : start + NEIGHBORS_BLOCK_SIZE]
+        pointing.update(
+            r.recipe_id
+            for r in db.query(RecipeNeighbor.recipe_id)
+            .filter(RecipeNeighbor.neighbor_id.in_(chunk))
+            .distinct()
+        )
+    return pointing
+
+
+def refresh_item_neighbors(
+    db: Session, full: bool = False, top_k: int = NEIGHBORS_TOP_K
+) -> int:
+    """
+    Recompute neighbours for recipes with new interactions (or all with
+    full=True) and drop rows of deleted recipes. Changes propagate one hop:
+    recipes listing a changed recipe, and its new neighbours, are recomputed
+    too. Returns recipes refreshed. Caller commits.
+    """
+    live = {
+        r.id: r.interactions_version
+        for r in db.query(Recipe.id, Recipe.interactions_version)
+    }
+    dirty = list(live) if full else _dirty_recipe_ids(db)
+
+    # Rows of deleted recipes
+    stale = [
+        r.recipe_id
+        for r in db.query(RecipeNeighborState.recipe_id)
+        if r.recipe_id not in live
+    ]
+    # Lists that pointed at a changed or deleted recipe
+    extra = set() if full else _pointing_at(db, dirty + stale)
+    if stale:
+        db.query(RecipeNeighbor).filter(
+            or_(
+                RecipeNeighbor.recipe_id.in_(stale),
+                RecipeNeighbor.neighbor_id.in_(stale),
+            )
+        ).delete(synchronize_session=False)
+        db.query(RecipeNeighborState).filter(
+            RecipeNeighborState.recipe_id.in_(stale)
+        ).delete(synchronize_session=False)
+    if not dirty and not extra:
+        return 0
+
+    matrix, recipe_ids = build_interaction_matrix(db)
+    column_of = {int(rid): j for j, rid in enumerate(recipe_ids)}
+
+    def compute(targets):
+        columns = [column_of[rid] for rid in targets if rid in column_of]
+        return [
+            {
+                "recipe_id": int(recipe_ids[col]),
+                "neighbor_id": int(recipe_ids[n]),
+                "score": float(s),
+            }
+            for col, neighbor_cols, sims in top_k_neighbors(matrix, columns, top_k)
+            for n, s in zip(neighbor_cols, sims)
+        ]
+
+    rows = compute(dirty)
+    if not full:
+        # New neighbours of a changed recipe may now rank it in their top-K
+        extra.update(row["neighbor_id"] for row in rows)
+        extra = sorted(rid for rid in extra.difference(dirty) if rid in live)
+        rows.extend(compute(extra))
+    targets = dirty + list(extra)
+
+    for chunk_start in range(0, len(targets), NEIGHBORS_BLOCK_SIZE):
+        chunk = targets[chunk_start : chunk_start + NEIGHBORS_BLOCK_SIZE]
+        db.query(RecipeNeighbor).filter(RecipeNeighbor.recipe_id.in_(chunk)).delete(
+            synchronize_session=False
+        )
+        db.query(RecipeNeighborState).filter(
+            RecipeNeighborState.recipe_id.in_(chunk)
+        ).delete(synchronize_session=False)
+        db.execute(
+            insert(RecipeNeighborState),
+            [{"recipe_id": rid, "interactions": live[rid]} for rid in chunk],
+        )
+    if rows:
+        db.execute(insert(RecipeNeighbor), rows)
+    return len(targets)
+
+
+def similar_recipe_ids(
+    db: Session,
+    recipe_ids: list,
+    limit: int = NEIGHBORS_TOP_K,
+    exclude: Optional[set] = None,
+) -> list:
+    """Neighbour ids of one or more recipes, best first (one indexed read)."""
+    if not recipe_ids:
+        return []
+    exclude = set(exclude or ()) | set(recipe_ids)
+    rows = (
+        db.query(RecipeNeighbor.neighbor_id)
+        .filter(RecipeNeighbor.recipe_id.in_(recipe_ids))
+        .order_by(RecipeNeighbor.score.desc(), RecipeNeighbor.neighbor_id.desc())
+        .limit(limit * 2 + len(exclude))
+    )
+    seen = {}
+    for row in rows:
+        if row.neighbor_id not in exclude:
+            seen.setdefault(row.neighbor_id, None)
+    return list(seen)[:limit]
+
+
+def refresh_item_neighbors_job():
+    """Entry point for the periodic background refresher."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        refreshed = refresh_item_neighbors(db)
+        db.commit()
+        if refreshed:
+            logger.info(f"Refreshed item neighbours for {refreshed} recipes")
+    finally:
+        db.close()
@@ -0,0 +1,299 @@
+# Near-Duplicate Detection
+# Purpose: Recognize re-uploads of the same recipe. Each recipe gets a MinHash
+# signature over word shingles of its normalized title, ingredients and steps;
+# LSH band buckets (recipe_lsh_buckets) turn the duplicate check into a few
+# indexed lookups. Copies point at the earliest upload via Recipe.duplicate_of
+# and are collapsed in feed ranking. Edits to a signed field re-sign the recipe
+# and re-check its copies (resign_recipe).
+
+from typing import Optional
+import hashlib
+import logging
+import re
+import zlib
+
+import numpy as np
+from sqlalchemy import and_, insert, or_, update
+from sqlalchemy.orm import Session
+
+from models import Recipe, RecipeLshBucket
+
+logger = logging.getLogger(__name__)
+
+MINHASH_PERMUTATIONS = 64
+# 16 bands x 4 rows: pairs above ~0.5 Jaccard become candidates
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 2
+# Estimated Jaccard similarity at which an upload counts as a copy
+DUPLICATE_THRESHOLD = 0.8
+BACKFILL_CHUNK = 1000
+# Recipe fields the signature is computed from
+SIGNATURE_FIELDS = {"title", "ingredients", "steps"}
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_MASK64 = (1 << 64) - 1
+
+
+def _hash_params():
+    """Odd 64-bit multipliers and offsets, fixed across processes and versions."""
+    params = [
+        int.from_bytes(
+            hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest(), "little"
+        )
+        for i in range(MINHASH_PERMUTATIONS)
+    ]
+    a = np.array([(p & _MASK64) | 1 for p in params], dtype=np.uint64)
+    b = np.array([p >> 64 for p in params], dtype=np.uint64)
+    return a, b
+
+
+_HASH_A, _HASH_B = _hash_params()
+
+
+def normalized_tokens(title, ingredients, steps) -> list:
+    """Lowercased word tokens; ingredient order does not matter."""
+    names = sorted(
+        ((i.get("name") or "") if isinstance(i, dict) else str(i)).strip().lower()
+        for i in (ingredients or [])
+    )
+    texts = [title or "", *names]
+    texts.extend(
+        (s.get("instruction") or "") if isinstance(s, dict) else str(s)
+        for s in (steps or [])
+    )
+    return _TOKEN.findall(" ".join(texts).lower())
+
+
+def shingles(tokens: list) -> set:
+    if len(tokens) <= SHINGLE_SIZE:
+        return {" ".join(tokens)} if tokens else set()
+    return {
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(title, ingredients, steps):
+    """uint32 signature of length MINHASH_PERMUTATIONS, or None for empty recipes."""
+    grams = shingles(normalized_tokens(title, ingredients, steps))
+    if not grams:
+        return None
+    x = np.array([zlib.crc32(g.encode()) for g in grams], dtype=np.uint64)
+    # Multiply-shift hashing; uint64 arithmetic wraps mod 2^64
+    hashed = (_HASH_A[:, None] * x[None, :] + _HASH_B[:, None]) >> np.uint64(32)
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def band_buckets(signature) -> list:
+    """[(band, bucket), ...]; bucket is a signed 64-bit hash of the band's rows."""
+    rows = signature.reshape(LSH_BANDS, LSH_ROWS)
+    return [
+        (
+            band,
+            int.from_bytes(
+                hashlib.blake2b(rows[band].tobytes(), digest_size=8).digest(),
+                "little",
+                signed=True,
+            ),
+        )
+        for band in range(LSH_BANDS)
+    ]
+
+
+def estimated_similarity(a, b) -> float:
+    return float(np.mean(a == b))
+
+
+def _best_original(signature, candidates) -> Optional[int]:
+    """Earliest-uploaded original among [(id, duplicate_of, signature)] above threshold."""
+    best = None
+    for rid, duplicate_of, other in candidates:
+        if estimated_similarity(signature, other) >= DUPLICATE_THRESHOLD:
+            original = duplicate_of or rid
+            best = original if best is None else min(best, original)
+    return best
+
+
+def _candidates(db: Session, buckets, keep) -> list:
+    """[(id, duplicate_of, signature)] of signed recipes sharing a bucket, if keep(row)."""
+    candidate_ids = {
+        row.recipe_id
+        for row in db.query(RecipeLshBucket.recipe_id).filter(
+            or_(
+                *(
+                    and_(RecipeLshBucket.band == band, RecipeLshBucket.bucket == bucket)
+                    for band, bucket in buckets
+                )
+            )
+        )
+    }
+    if not candidate_ids:
+        return []
+    rows = db.query(Recipe.id, Recipe.duplicate_of, Recipe.minhash).filter(
+        Recipe.id.in_(candidate_ids)
+    )
+    return [
+        (r.id, r.duplicate_of, np.frombuffer(r.minhash, dtype=np.uint32))
+        for r in rows
+        if r.minhash and keep(r)
+    ]
+
+
+def _insert_buckets(db: Session, recipe_id: int, buckets):
+    db.execute(
+        insert(RecipeLshBucket),
+        [{"band": band, "bucket": bucket, "recipe_id": recipe_id} for band, bucket in buckets],
+    )
+
+
+def register_recipe_signature(db: Session, recipe: Recipe):
+    """
+    Sign a freshly flushed recipe, flag it if it copies an existing one and
+    add it to the LSH buckets. One candidate lookup plus one insert. Caller commits.
+    """
+    signature = minhash_signature(recipe.title, recipe.ingredients, recipe.steps)
+    if signature is None:
+        return
+    buckets = band_buckets(signature)
+    recipe.duplicate_of = _best_original(
+        signature, _candidates(db, buckets, lambda r: r.id != recipe.id)
+    )
+    recipe.minhash = signature.tobytes()
+    _insert_buckets(db, recipe.id, buckets)
+
+
+def resign_recipe(db: Session, recipe: Recipe):
+    """
+    After an edit to a SIGNATURE_FIELDS field: replace the recipe's signature
+    and buckets, flag it if it now copies another recipe, and re-check its
+    former copies. Copies that still match follow it; the others look for an
+    earlier original among their own candidates. Caller commits.
+    """
+    db.query(RecipeLshBucket).filter(RecipeLshBucket.recipe_id == recipe.id).delete(
+        synchronize_session=False
+    )
+    copies = (
+        db.query(Recipe.id, Recipe.minhash)
+        .filter(Recipe.duplicate_of == recipe.id)
+        .order_by(Recipe.id)
+        .all()
+    )
+    copy_ids = {c.id for c in copies}
+    signature = minhash_signature(recipe.title, recipe.ingredients, recipe.steps)
+    recipe.duplicate_of = None
+    recipe.minhash = None
+    if signature is not None:
+        buckets = band_buckets(signature)
+        recipe.duplicate_of = _best_original(
+            signature,
+            _candidates(
+                db, buckets, lambda r: r.id != recipe.id and r.id not in copy_ids
+            ),
+        )
+        recipe.minhash = signature.tobytes()
+        _insert_buckets(db, recipe.id, buckets)
+
+    original = recipe.duplicate_of or recipe.id
+    # Oldest first, so earlier siblings are settled before later ones look
+    for copy in copies:
+        own = np.frombuffer(copy.minhash, dtype=np.uint32) if copy.minhash else None
+        if own is None:
+            duplicate_of = None
+        elif (
+            signature is not None
+            and estimated_similarity(own, signature) >= DUPLICATE_THRESHOLD
+        ):
+            duplicate_of = original
+        else:
+            duplicate_of = _best_original(
+                own,
+                _candidates(
+                    db,
+                    band_buckets(own),
+                    lambda r, copy_id=copy.id: r.id < copy_id and r.id != recipe.id,
+                ),
+            )
+        db.query(Recipe).filter(Recipe.id == copy.id).update(
+            {Recipe.duplicate_of: duplicate_of}, synchronize_session=False
+        )
+
+
+def forget_recipe_signature(db: Session, recipe_id: int):
+    """
+    Drop a recipe's buckets before it is deleted. Its copies are re-pointed at
+    the earliest remaining copy, which becomes the new original. Caller commits.
+    """
+    db.query(RecipeLshBucket).filter(RecipeLshBucket.recipe_id == recipe_id).delete(
+        synchronize_session=False
+    )
+    copies = [
+        r.id
+        for r in db.query(Recipe.id)
+        .filter(Recipe.duplicate_of == recipe_id)
+        .order_by(Recipe.id)
+    ]
+    if copies:
+        db.query(Recipe).filter(Recipe.id.in_(copies[1:])).update(
+            {Recipe.duplicate_of: copies[0]}, synchronize_session=False
+        )
+        db.query(Recipe).filter(Recipe.id == copies[0]).update(
+            {Recipe.duplicate_of: None}, synchronize_session=False
+        )
+
+
+def backfill_near_duplicates(db: Session) -> dict:
+    """
+    Recompute signatures, buckets and duplicate flags for all recipes, oldest
+    first, with the bucket index held in memory. Caller commits.
+    """
+    db.query(RecipeLshBucket).delete(synchronize_session=False)
+    buckets = {}
+    signatures = {}
+    originals = {}
+    stats = {"recipes": 0, "duplicates": 0}
+
+    last_id = 0
+    while True:
+        # Keyset pages, so writes never interleave with an open cursor
+        rows = (
+            db.query(Recipe.id, Recipe.title, Recipe.ingredients, Recipe.steps)
+            .filter(Recipe.id > last_id)
+            .order_by(Recipe.id)
+            .limit(BACKFILL_CHUNK)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+        updates, bucket_rows = [], []
+        for r in rows:
+            stats["recipes"] += 1
+            signature = minhash_signature(r.title, r.ingredients, r.steps)
+            if signature is None:
+                updates.append({"id": r.id, "minhash": None, "duplicate_of": None})
+                continue
+            keys = band_buckets(signature)
+            candidates = {rid for key in keys for rid in buckets.get(key, ())}
+            original = _best_original(
+                signature, [(rid, originals[rid], signatures[rid]) for rid in candidates]
+            )
+            if original is not None:
+                stats["duplicates"] += 1
+            signatures[r.id] = signature
+            originals[r.id] = original
+            for key in keys:
+                buckets.setdefault(key, []).append(r.id)
+            updates.append(
+                {"id": r.id, "minhash": signature.tobytes(), "duplicate_of": original}
+            )
+            bucket_rows.extend(
+                {"band": band, "bucket": bucket, "recipe_id": r.id} for band, bucket in keys
+            )
+        db.execute(update(Recipe), updates)
+        if bucket_rows:
+            db.execute(insert(RecipeLshBucket), bucket_rows)
+    logger.info(
+        f"Signed {stats['recipes']} recipes, {stats['duplicates']} near-duplicates"
+    )
+    return stats
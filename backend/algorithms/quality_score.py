@@ -1,12 +1,152 @@
 # Video Quality Scoring Module
 # Purpose: Evaluate the objective and subjective quality of a video.
+# Scores all recipes in one vectorized pass on a schedule and persists
+# Recipe.quality_score in [0, 1] (0.5 = neutral); EdgeRank scales by it.
 
+import logging
+import os
 
-def calculate_quality_score(video_id: int):
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from models import Recipe
+
+logger = logging.getLogger(__name__)
+
+QUALITY_REFRESH_SECONDS = int(os.getenv("QUALITY_REFRESH_SECONDS", "900"))
+NEUTRAL_QUALITY = 0.5
+# Changes smaller than this are not written back
+QUALITY_EPSILON = 1e-3
+
+# Engagement rates at which a signal counts as ~63% "good" (1 - e^-1)
+LIKE_RATE_SCALE = 0.08
+SAVE_RATE_SCALE = 0.03
+COMMENT_RATE_SCALE = 0.02
+# Views of pseudo-evidence pulling small samples towards the neutral score
+PRIOR_VIEWS = 20.0
+# Short-form sweet spot for cooking videos
+IDEAL_DURATION_MS = (15_000, 90_000)
+FULL_HD_SHORT_SIDE = 1080
+
+SIGNAL_WEIGHTS = {
+    "like": 0.30,
+    "save": 0.20,
+    "comment": 0.10,
+    "completion": 0.25,
+    "resolution": 0.10,
+    "duration": 0.05,
+}
+
+
+def _rate_signal(events, views, scale):
+    """Saturating rate score, shrunk towards neutral for few views."""
+    rate = events / np.maximum(views, 1.0)
+    signal = 1.0 - np.exp(-rate / scale)
+    trust = views / (views + PRIOR_VIEWS)
+    return trust * signal + (1.0 - trust) * NEUTRAL_QUALITY
+
+
+def compute_quality_scores(
+    likes, saves, comments, views, watch_ms, duration_ms, width, height
+) -> np.ndarray:
+    """
+    Quality in [0, 1] for arrays of recipes. duration_ms / width / height may
+    contain NaN for unknown video metadata; those signals are then neutral.
+    """
+    views = np.asarray(views, dtype=np.float64)
+
+    completion = np.full(views.shape, NEUTRAL_QUALITY)
+    known = ~np.isnan(duration_ms) & (duration_ms > 0) & (views > 0)
+    completion[known] = np.clip(
+        watch_ms[known] / (views[known] * duration_ms[known]), 0.0, 1.0
+    )
+    trust = views / (views + PRIOR_VIEWS)
+    completion = np.where(known, trust * completion + (1 - trust) * NEUTRAL_QUALITY, completion)
+
+    short_side = np.fmin(width, height)
+    resolution = np.where(
+        np.isnan(short_side),
+        NEUTRAL_QUALITY,
+        np.clip(np.nan_to_num(short_side) / FULL_HD_SHORT_SIDE, 0.0, 1.0),
+    )
+
+    low, high = IDEAL_DURATION_MS
+    d = np.nan_to_num(duration_ms, nan=-1.0)
+    duration = np.where(
+        d < 0,
+        NEUTRAL_QUALITY,
+        np.where(d < low, d / low, np.where(d > high, high / np.maximum(d, 1.0), 1.0)),
+    )
+
+    score = (
+        SIGNAL_WEIGHTS["like"] * _rate_signal(likes, views, LIKE_RATE_SCALE)
+        + SIGNAL_WEIGHTS["save"] * _rate_signal(saves, views, SAVE_RATE_SCALE)
+        + SIGNAL_WEIGHTS["comment"] * _rate_signal(comments, views, COMMENT_RATE_SCALE)
+        + SIGNAL_WEIGHTS["completion"] * completion
+        + SIGNAL_WEIGHTS["resolution"] * resolution
+        + SIGNAL_WEIGHTS["duration"] * duration
+    )
+    return np.clip(score, 0.0, 1.0)
+
+
+def refresh_quality_scores(db: Session) -> int:
     """
-    Factors to consider:
-    - Resolution/Bitrate
-    - User engagement (completion rate, like ratio)
-    - Report rate (negative signal)
+    Recompute quality for all recipes in one pass and write back only the
+    rows whose score moved. Returns the number of rows written. Caller commits.
     """
-    pass
+    rows = db.query(
+        Recipe.id,
+        Recipe.likes_count,
+        Recipe.saves_count,
+        Recipe.comments_count,
+        Recipe.views,
+        Recipe.watch_ms_total,
+        Recipe.video_duration_ms,
+        Recipe.video_width,
+        Recipe.video_height,
+        Recipe.quality_score,
+    ).all()
+    if not rows:
+        return 0
+
+    def column(i, nullable=False):
+        return np.array(
+            [np.nan if r[i] is None and nullable else (r[i] or 0) for r in rows],
+            dtype=np.float64,
+        )
+
+    scores = compute_quality_scores(
+        likes=column(1),
+        saves=column(2),
+        comments=column(3),
+        views=column(4),
+        watch_ms=column(5),
+        duration_ms=column(6, nullable=True),
+        width=column(7, nullable=True),
+        height=column(8, nullable=True),
+    )
+    current = np.array(
+        [NEUTRAL_QUALITY if r.quality_score is None else r.quality_score for r in rows]
+    )
+    changed = np.flatnonzero(np.abs(scores - current) > QUALITY_EPSILON)
+    if len(changed):
+        db.execute(
+            update(Recipe),
+            [{"id": rows[i].id, "quality_score": float(scores[i])} for i in changed],
+        )
+    return len(changed)
+
+
+def refresh_quality_scores_job():
+    """Entry point for the periodic background scorer."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        written = refresh_quality_scores(db)
+        db.commit()
+        if written:
+            logger.info(f"Updated quality score of {written} recipes")
+    finally:
+        db.close()
@@ -1,18 +1,216 @@
 # Recommendation Algorithm Module
-# Purpose: Determine which videos a user sees in their feed.
+# Purpose: Determine which videos a user sees in their feed. Each user has a
+# sparse tag/ingredient interest vector (hashed feature ids + weights, stored
+# in user_interest_vectors); candidates are scored against it with batched
+# NumPy dot products.
 
+from typing import Optional
+import zlib
 
-def get_recommended_content(user_id: int, limit: int = 10):
+import numpy as np
+from sqlalchemy.orm import Session
+
+from database import dialect_insert
+from models import Recipe, Like, SavedRecipe, Comment, UserInterestVector
+from timeutils import utcnow
+
+# Hashed feature space; collisions only merge weights of unrelated features
+FEATURE_DIM = 1 << 20
+TAG_WEIGHT = 1.0
+INGREDIENT_WEIGHT = 0.5
+# Interaction weights used when folding a recipe into a user's vector
+INTERACTION_WEIGHTS = {"like": 1.0, "save": 2.0, "comment": 0.5}
+# Older interests fade a little with every new interaction
+INTEREST_DECAY = 0.98
+# Features kept per user (smallest weights are dropped)
+MAX_USER_FEATURES = 256
+# Interactions read when a vector has to be built from history
+HISTORY_LIMIT = 200
+
+
+def _feature_id(kind: str, value: str) -> int:
+    return zlib.crc32(f"{kind}:{value.strip().lower()}".encode("utf-8")) % FEATURE_DIM
+
+
+def recipe_features(tags, ingredients):
+    """Sorted unique feature ids and their weights for one recipe."""
+    feats = {}
+    for tag in tags or []:
+        if isinstance(tag, str) and tag.strip():
+            fid = _feature_id("tag", tag)
+            feats[fid] = feats.get(fid, 0.0) + TAG_WEIGHT
+    for ing in ingredients or []:
+        name = ing.get("name") if isinstance(ing, dict) else ing
+        if isinstance(name, str) and name.strip():
+            fid = _feature_id("ing", name)
+            feats[fid] = feats.get(fid, 0.0) + INGREDIENT_WEIGHT
+    ids = np.array(sorted(feats), dtype=np.int32)
+    return ids, np.array([feats[i] for i in ids.tolist()], dtype=np.float32)
+
+
+def _merge(ids_a, w_a, ids_b, w_b):
+    """Sparse a + b, with ids sorted and zero/negative weights dropped."""
+    ids = np.concatenate([ids_a, ids_b])
+    weights = np.concatenate([w_a, w_b])
+    ids, inverse = np.unique(ids, return_inverse=True)
+    summed = np.bincount(inverse, weights=weights, minlength=len(ids)).astype(np.float32)
+    keep = summed > 1e-6
+    ids, summed = ids[keep], summed[keep]
+    if len(ids) > MAX_USER_FEATURES:
+        top = np.sort(np.argpartition(-summed, MAX_USER_FEATURES - 1)[:MAX_USER_FEATURES])
+        ids, summed = ids[top], summed[top]
+    return ids.astype(np.int32), summed
+
+
+def _empty():
+    return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+
+def build_user_vector(db: Session, user_id: int):
+    """Interest vector from the user's most recent likes, saves and comments."""
+    interactions = []
+    for model, kind, newest_first in (
+        (Like, "like", (Like.created_at.desc(), Like.recipe_id.desc())),
+        (SavedRecipe, "save", (SavedRecipe.id.desc(),)),
+        (Comment, "comment", (Comment.id.desc(),)),
+    ):
+        rows = (
+            db.query(Recipe.tags, Recipe.ingredients)
+            .join(model, model.recipe_id == Recipe.id)
+            .filter(model.user_id == user_id)
+            .order_by(*newest_first)
+            .limit(HISTORY_LIMIT)
+            .all()
+        )
+        interactions.extend((row, INTERACTION_WEIGHTS[kind]) for row in rows)
+
+    ids, weights = _empty()
+    for row, weight in interactions:
+        r_ids, r_w = recipe_features(row.tags, row.ingredients)
+        ids, weights = _merge(ids, weights, r_ids, r_w * weight)
+    return ids, weights
+
+
+def load_user_vector(db: Session, user_id: int):
+    """Stored vector, or one built from history (not persisted) for new users."""
+    row = db.get(UserInterestVector, user_id)
+    if row is None:
+        return build_user_vector(db, user_id)
+    return (
+        np.frombuffer(row.feature_ids, dtype=np.int32),
+        np.frombuffer(row.weights, dtype=np.float32),
+    )
+
+
+def _values(ids, weights) -> dict:
+    return {
+        "feature_ids": ids.astype(np.int32).tobytes(),
+        "weights": weights.astype(np.float32).tobytes(),
+        "updated_at": utcnow(),
+    }
+
+
+def _store(row: UserInterestVector, ids, weights):
+    for key, value in _values(ids, weights).items():
+        setattr(row, key, value)
+
+
+def _store_built(db: Session, user_id: int, ids, weights):
+    # Upsert: two first interactions of one user can both get here concurrently
+    values = _values(ids, weights)
+    stmt = dialect_insert(db.get_bind(), UserInterestVector).values(
+        user_id=user_id, **values
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserInterestVector.user_id], set_=values
+        )
+    )
+
+
+def train_user_model(
+    db: Session, user_id: int, recipe_id: int, interaction: str, undo: bool = False
+):
     """
-    1. Fetch user interest profile (tags, watching history).
-    2. Score candidate videos.
-    3. Return top X videos.
+    Fold one like/save/comment (or its removal, undo=True) into the user's
+    stored vector. Users without a vector get one built from their history
+    instead, which already reflects this interaction. Caller commits.
     """
-    pass
+    row = db.get(UserInterestVector, user_id)
+    if row is None:
+        db.flush()
+        _store_built(db, user_id, *build_user_vector(db, user_id))
+        return
+
+    recipe = (
+        db.query(Recipe.tags, Recipe.ingredients).filter(Recipe.id == recipe_id).first()
+    )
+    if recipe is None:
+        return
+    r_ids, r_w = recipe_features(recipe.tags, recipe.ingredients)
+    weight = INTERACTION_WEIGHTS[interaction]
+    ids = np.frombuffer(row.feature_ids, dtype=np.int32)
+    weights = np.frombuffer(row.weights, dtype=np.float32)
+    if undo:
+        # Inverse of the update below, so like + unlike restores the vector
+        ids, weights = _merge(
+            ids, weights / INTEREST_DECAY, r_ids, -r_w * weight / INTEREST_DECAY
+        )
+    else:
+        ids, weights = _merge(ids, weights * INTEREST_DECAY, r_ids, r_w * weight)
+    _store(row, ids, weights)
 
 
-def train_user_model(user_id: int):
+def interest_scores(user_vector, recipes) -> np.ndarray:
     """
-    Update user preferences based on recent actions.
+    Cosine similarity in [0, 1] between the user vector and each recipe's
+    features (rows need .tags and .ingredients), as one batched computation.
     """
-    pass
+    u_ids, u_w = user_vector
+    n = len(recipes)
+    if n == 0 or len(u_ids) == 0:
+        return np.zeros(n)
+
+    features = [recipe_features(r.tags, r.ingredients) for r in recipes]
+    lengths = np.array([len(ids) for ids, _ in features])
+    if not lengths.any():
+        return np.zeros(n)
+    all_ids = np.concatenate([ids for ids, _ in features])
+    all_w = np.concatenate([w for _, w in features]).astype(np.float64)
+    rows = np.repeat(np.arange(n), lengths)
+
+    pos = np.minimum(np.searchsorted(u_ids, all_ids), len(u_ids) - 1)
+    hit = u_ids[pos] == all_ids
+    contrib = np.where(hit, u_w[pos] * all_w, 0.0)
+    dots = np.bincount(rows, weights=contrib, minlength=n)
+    recipe_norms = np.sqrt(np.bincount(rows, weights=all_w**2, minlength=n))
+    user_norm = float(np.sqrt(np.sum(u_w.astype(np.float64) ** 2)))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = dots / (recipe_norms * user_norm)
+    return np.nan_to_num(scores)
+
+
+def get_recommended_content(
+    db: Session, user_id: int, limit: int = 10, candidate_ids: Optional[list] = None
+) -> list:
+    """
+    1. Load the user's interest vector.
+    2. Score candidate recipes (feed candidate sources by default).
+    3. Return the top `limit` as [(recipe_id, score), ...].
+    """
+    vector = load_user_vector(db, user_id)
+    if len(vector[0]) == 0:
+        return []
+    if candidate_ids is None:
+        from algorithms.candidate_generation import generate_candidates
+
+        candidate_ids = generate_candidates(db, user_id)
+    rows = (
+        db.query(Recipe.id, Recipe.tags, Recipe.ingredients)
+        .filter(Recipe.id.in_(candidate_ids), Recipe.owner_id != user_id)
+        .all()
+    )
+    scores = interest_scores(vector, rows)
+    ids = np.array([r.id for r in rows], dtype=np.int64)
+    order = np.lexsort((-ids, -scores))[:limit]
+    return [(int(ids[i]), float(scores[i])) for i in order if scores[i] > 0]
@@ -0,0 +1,398 @@
+# Related Recipes (TF-IDF)
+# Purpose: "More like this" for a recipe. Title, tags, ingredient names and
+# step text are indexed as a sparse TF-IDF matrix; a related query is one
+# sparse mat-vec product. The matrix is snapshotted to .npy files and
+# memory-mapped on worker start instead of rebuilt from the database; the
+# snapshot records each recipe's updated_at so edits are caught up as well.
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy.orm import Session
+
+from models import Recipe
+from timeutils import to_iso
+
+logger = logging.getLogger(__name__)
+
+RELATED_INDEX_DIR = os.getenv("RELATED_INDEX_DIR", "./index_snapshots/related")
+RELATED_REBUILD_SECONDS = int(os.getenv("RELATED_REBUILD_SECONDS", "3600"))
+# Pending (added/updated) rows merged into the base matrix past this size
+RELATED_COMPACT_AFTER = 1000
+
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "ingredients": 2.0, "steps": 1.0}
+STOPWORDS = {
+    "und", "oder", "mit", "der", "die", "das", "den", "dem", "des", "ein", "eine",
+    "einen", "in", "im", "auf", "an", "zu", "zum", "zur", "von", "für", "aus",
+    "bei", "ist", "es", "sie", "alles", "etwas", "dann", "noch", "minuten",
+}
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list:
+    return [
+        t
+        for t in _TOKEN.findall((text or "").lower())
+        if len(t) > 1 and not t.isdigit() and t not in STOPWORDS
+    ]
+
+
+def _version_key(version: str) -> int:
+    """Snapshot directories are named v<milliseconds>-<unique suffix>."""
+    return int(version[1:].split("-")[0])
+
+
+def recipe_field_texts(title, tags, ingredients, steps) -> dict:
+    return {
+        "title": title or "",
+        "tags": " ".join(t for t in (tags or []) if isinstance(t, str)),
+        "ingredients": " ".join(
+            (i.get("name") or "") if isinstance(i, dict) else str(i)
+            for i in (ingredients or [])
+        ),
+        "steps": " ".join(
+            (s.get("instruction") or "") if isinstance(s, dict) else str(s)
+            for s in (steps or [])
+        ),
+    }
+
+
+class TfidfIndex:
+    """
+    Documents are stored as L2-normalized log-TF rows; IDF is applied on the
+    query side (score = doc . (query * idf^2)), so adding a document never
+    rewrites other rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        self._vocab = {}
+        self._df = np.zeros(0, dtype=np.int64)
+        self._n_docs = 0
+        # Base matrix (possibly memory-mapped) and the recipe id of each row
+        self._base = sp.csr_matrix((0, 0), dtype=np.float32)
+        self._base_ids = np.empty(0, dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        # Rows added since the base was built: recipe_id -> (cols, vals)
+        self._pending = {}
+        self._pending_matrix = None
+        # recipe_id -> base row index
+        self._base_row = {}
+        # recipe_id -> updated_at (ISO) of the indexed version
+        self._stamps = {}
+
+    # ── document vectors ──────────────────────────────────────────────
+
+    def _vectorize(self, fields: dict, grow: bool):
+        counts = {}
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                col = self._vocab.get(token)
+                if col is None:
+                    if not grow:
+                        continue
+                    col = self._vocab[token] = len(self._vocab)
+                counts[col] = counts.get(col, 0.0) + weight
+        if not counts:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        cols = np.array(sorted(counts), dtype=np.int32)
+        vals = 1.0 + np.log(np.array([counts[c] for c in cols.tolist()]))
+        vals = (vals / np.linalg.norm(vals)).astype(np.float32)
+        return cols, vals
+
+    def _doc_vector(self, recipe_id: int):
+        if recipe_id in self._pending:
+            return self._pending[recipe_id]
+        row = self._base_row.get(recipe_id)
+        if row is None:
+            return None
+        lo, hi = self._base.indptr[row], self._base.indptr[row + 1]
+        return np.asarray(self._base.indices[lo:hi]), np.asarray(self._base.data[lo:hi])
+
+    def _grow_df(self):
+        if len(self._df) < len(self._vocab):
+            self._df = np.concatenate(
+                [self._df, np.zeros(len(self._vocab) - len(self._df), dtype=np.int64)]
+            )
+
+    def _remove_locked(self, recipe_id: int):
+        vec = self._pending.pop(recipe_id, None)
+        if vec is not None:
+            self._pending_matrix = None
+        else:
+            row = self._base_row.pop(recipe_id, None)
+            if row is None:
+                return
+            self._alive[row] = False
+            lo, hi = self._base.indptr[row], self._base.indptr[row + 1]
+            vec = (self._base.indices[lo:hi], None)
+        self._df[np.asarray(vec[0])] -= 1
+        self._n_docs -= 1
+
+    # ── incremental maintenance ──────────────────────────────────────
+
+    def update_recipe(
+        self, recipe_id: int, title, tags, ingredients, steps, updated_at=None
+    ):
+        """Add a recipe, or replace its previous vector."""
+        with self._lock:
+            self._remove_locked(recipe_id)
+            self._stamps[recipe_id] = to_iso(updated_at)
+            cols, vals = self._vectorize(
+                recipe_field_texts(title, tags, ingredients, steps), grow=True
+            )
+            self._grow_df()
+            if len(cols):
+                self._pending[recipe_id] = (cols, vals)
+                self._pending_matrix = None
+                self._df[cols] += 1
+                self._n_docs += 1
+            if len(self._pending) > RELATED_COMPACT_AFTER:
+                self._compact_locked()
+
+    def remove_recipe(self, recipe_id: int):
+        with self._lock:
+            self._remove_locked(recipe_id)
+            self._stamps.pop(recipe_id, None)
+
+    def _compact_locked(self):
+        """Fold pending rows into the base matrix and drop dead rows."""
+        live_rows = np.flatnonzero(self._alive)
+        base = self._base[live_rows]
+        base.resize((base.shape[0], len(self._vocab)))
+        ids = self._base_ids[live_rows]
+        if self._pending:
+            pending_ids = np.fromiter(self._pending, dtype=np.int64)
+            base = sp.vstack([base, self._pending_csr()], format="csr")
+            ids = np.concatenate([ids, pending_ids])
+        self._base = base.tocsr().astype(np.float32)
+        self._base_ids = ids
+        self._alive = np.ones(len(ids), dtype=bool)
+        self._base_row = {int(rid): i for i, rid in enumerate(ids)}
+        self._pending = {}
+        self._pending_matrix = None
+
+    def _pending_csr(self):
+        if self._pending_matrix is None:
+            vecs = list(self._pending.values())
+            indptr = np.concatenate([[0], np.cumsum([len(c) for c, _ in vecs])])
+            indices = np.concatenate([c for c, _ in vecs]) if vecs else np.empty(0, np.int32)
+            data = np.concatenate([v for _, v in vecs]) if vecs else np.empty(0, np.float32)
+            self._pending_matrix = sp.csr_matrix(
+                (data, indices, indptr), shape=(len(vecs), len(self._vocab))
+            )
+        return self._pending_matrix
+
+    # ── build / snapshot ─────────────────────────────────────────────
+
+    def build(self, db: Session):
+        fresh = TfidfIndex()
+        rows = db.query(
+            Recipe.id,
+            Recipe.title,
+            Recipe.tags,
+            Recipe.ingredients,
+            Recipe.steps,
+            Recipe.updated_at,
+        ).yield_per(1000)
+        for r in rows:
+            fresh.update_recipe(
+                r.id, r.title, r.tags, r.ingredients, r.steps, updated_at=r.updated_at
+            )
+        fresh._compact_locked()
+        self._swap(fresh)
+
+    def _swap(self, other: "TfidfIndex"):
+        with self._lock:
+            for attr in (
+                "_vocab",
+                "_df",
+                "_n_docs",
+                "_base",
+                "_base_ids",
+                "_alive",
+                "_pending",
+                "_pending_matrix",
+                "_base_row",
+                "_stamps",
+            ):
+                setattr(self, attr, getattr(other, attr))
+            self.built = True
+
+    def save(self, directory: str = RELATED_INDEX_DIR):
+        """
+        Write a snapshot; CURRENT is switched atomically after all files exist.
+        Version directories and the CURRENT temp file are unique per call, so
+        several workers can save at the same time.
+        """
+        with self._lock:
+            self._compact_locked()
+            base, ids, df, vocab = self._base, self._base_ids, self._df, dict(self._vocab)
+            stamps = {str(rid): stamp for rid, stamp in self._stamps.items()}
+        os.makedirs(directory, exist_ok=True)
+        target = tempfile.mkdtemp(prefix=f"v{int(time.time() * 1000)}-", dir=directory)
+        version = os.path.basename(target)
+        np.save(os.path.join(target, "data.npy"), base.data)
+        np.save(os.path.join(target, "indices.npy"), base.indices)
+        np.save(os.path.join(target, "indptr.npy"), base.indptr)
+        np.save(os.path.join(target, "ids.npy"), ids)
+        np.save(os.path.join(target, "df.npy"), df)
+        with open(os.path.join(target, "vocab.json"), "w") as f:
+            json.dump(vocab, f)
+        with open(os.path.join(target, "stamps.json"), "w") as f:
+            json.dump(stamps, f)
+        fd, tmp = tempfile.mkstemp(prefix="CURRENT.", suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(directory, "CURRENT"))
+
+        # Prune relative to what CURRENT names now (another worker may have
+        # switched it since), keeping that version and the one before it,
+        # which workers may still have mapped
+        with open(os.path.join(directory, "CURRENT")) as f:
+            current = f.read().strip()
+        older = sorted(
+            (
+                v
+                for v in os.listdir(directory)
+                if v.startswith("v") and _version_key(v) < _version_key(current)
+            ),
+            key=_version_key,
+        )
+        for old in older[:-1]:
+            shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+        return target
+
+    def load(self, directory: str = RELATED_INDEX_DIR) -> bool:
+        """Memory-map the current snapshot. Returns False if there is none."""
+        try:
+            with open(os.path.join(directory, "CURRENT")) as f:
+                target = os.path.join(directory, f.read().strip())
+            with open(os.path.join(target, "vocab.json")) as f:
+                vocab = json.load(f)
+            with open(os.path.join(target, "stamps.json")) as f:
+                stamps = json.load(f)
+
+            def mapped(name):
+                return np.load(os.path.join(target, f"{name}.npy"), mmap_mode="r")
+
+            fresh = TfidfIndex()
+            fresh._vocab = vocab
+            fresh._df = np.array(mapped("df"))
+            fresh._base_ids = np.array(mapped("ids"))
+            fresh._base = sp.csr_matrix(
+                (mapped("data"), mapped("indices"), mapped("indptr")),
+                shape=(len(fresh._base_ids), len(vocab)),
+                copy=False,
+            )
+        except (OSError, ValueError):
+            return False
+        fresh._alive = np.ones(len(fresh._base_ids), dtype=bool)
+        fresh._base_row = {int(rid): i for i, rid in enumerate(fresh._base_ids)}
+        fresh._n_docs = len(fresh._base_ids)
+        fresh._stamps = {int(rid): stamp for rid, stamp in stamps.items()}
+        self._swap(fresh)
+        return True
+
+    def sync_with(self, db: Session):
+        """Catch a loaded snapshot up with recipes created, edited or deleted since."""
+        live = {r.id: to_iso(r.updated_at) for r in db.query(Recipe.id, Recipe.updated_at)}
+        with self._lock:
+            stamps = dict(self._stamps)
+        for rid in stamps.keys() - live.keys():
+            self.remove_recipe(rid)
+        stale = [
+            rid for rid, stamp in live.items() if rid not in stamps or stamps[rid] != stamp
+        ]
+        for start in range(0, len(stale), 1000):
+            for r in db.query(
+                Recipe.id,
+                Recipe.title,
+                Recipe.tags,
+                Recipe.ingredients,
+                Recipe.steps,
+                Recipe.updated_at,
+            ).filter(Recipe.id.in_(stale[start : start + 1000])):
+                self.update_recipe(
+                    r.id, r.title, r.tags, r.ingredients, r.steps, updated_at=r.updated_at
+                )
+
+    def ensure_built(self, db: Session):
+        if not self.built:
+            self.build(db)
+
+    # ── queries ──────────────────────────────────────────────────────
+
+    def related(self, recipe_id: int, limit: int = 10) -> list:
+        """[(recipe_id, score), ...] most similar first, excluding the recipe itself."""
+        with self._lock:
+            vec = self._doc_vector(recipe_id)
+            if vec is None or len(vec[0]) == 0:
+                return []
+            cols, vals = np.asarray(vec[0]), np.asarray(vec[1], dtype=np.float64)
+            idf = np.log((1.0 + self._n_docs) / (1.0 + self._df[cols])) + 1.0
+            query = np.zeros(len(self._vocab))
+            query[cols] = vals * idf**2
+
+            base_cols = self._base.shape[1]
+            base_scores = self._base @ query[:base_cols]
+            base_scores = np.where(self._alive, base_scores, 0.0)
+            ids = self._base_ids
+            scores = base_scores
+            if self._pending:
+                ids = np.concatenate([ids, np.fromiter(self._pending, dtype=np.int64)])
+                scores = np.concatenate([scores, self._pending_csr() @ query])
+
+        scores = np.where(ids == recipe_id, 0.0, scores)
+        k = min(limit, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((-ids[top], -scores[top]))]
+        return [(int(ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+related_index = TfidfIndex()
+
+
+def get_related_recipes(db: Session, recipe_id: int, limit: int = 10) -> list:
+    related_index.ensure_built(db)
+    return related_index.related(recipe_id, limit)
+
+
+def load_or_build_related_index():
+    """Startup: memory-map the snapshot and catch up, or build and snapshot."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if related_index.load():
+            related_index.sync_with(db)
+        else:
+            related_index.build(db)
+            related_index.save()
+    finally:
+        db.close()
+
+
+def rebuild_related_index_job():
+    """Periodic rebuild; fixes IDF drift and refreshes the snapshot."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        related_index.build(db)
+        related_index.save()
+        logger.info("Rebuilt related-recipes index")
+    finally:
+        db.close()
@@ -0,0 +1,402 @@
+# Recipe Search Engine
+# Purpose: Full-text search for /search without ILIKE table scans. An
+# in-process inverted index over title, tags, ingredients and chef, ranked
+# with BM25; the last query word also matches as a prefix (search-as-you-type).
+# Text goes through the German analyzer (umlaut folding, compound splitting,
+# stemming); query terms that match nothing are corrected with a SymSpell
+# dictionary over the index vocabulary, precomputed when the index is built.
+# Kept current on upload/edit/delete and snapshotted to a JSON file so
+# workers load it on boot instead of reading every recipe; each document keeps
+# the recipe's updated_at, so a loaded snapshot also catches up on edits.
+
+import bisect
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+import uuid
+
+from sqlalchemy.orm import Session
+
+from models import Recipe
+from timeutils import to_iso
+from algorithms.german_analyzer import GermanAnalyzer, words as folded_words
+from algorithms.spelling import SymSpell
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "./index_snapshots/search.json")
+SEARCH_REBUILD_SECONDS = int(os.getenv("SEARCH_REBUILD_SECONDS", "3600"))
+
+# Term frequency weight of a token per field (BM25F-style)
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "ingredients": 1.5, "chef": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Prefix expansions of the last query word, and their weight vs an exact hit
+MAX_PREFIX_EXPANSIONS = 50
+PREFIX_WEIGHT = 0.7
+# Weight of matching a compound query word through its parts only
+COMPOUND_WEIGHT = 0.8
+# Weight of a typo-corrected term; shorter terms allow fewer edits
+TYPO_WEIGHT = 0.6
+TYPO_MIN_LENGTH = 4
+TYPO_TWO_EDITS_LENGTH = 7
+# Bumped whenever the analyzer changes, so older snapshots are rebuilt
+SNAPSHOT_VERSION = 3
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> list:
+    """Plain lowercased words (the database full-text backends tokenize themselves)."""
+    return _TOKEN.findall((text or "").lower())
+
+
+def recipe_fields(title, tags, ingredients, chef) -> dict:
+    return {
+        "title": title or "",
+        "tags": " ".join(t for t in (tags or []) if isinstance(t, str)),
+        "ingredients": " ".join(
+            (i.get("name") or "") if isinstance(i, dict) else str(i)
+            for i in (ingredients or [])
+        ),
+        "chef": chef or "",
+    }
+
+
+class SearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.built = False
+        # term -> {recipe_id: weighted tf}
+        self._postings = {}
+        # recipe_id -> (weighted length, {term: weighted tf})
+        self._docs = {}
+        # recipe_id -> updated_at (ISO) of the indexed version
+        self._stamps = {}
+        self._total_len = 0.0
+        # All terms, sorted, for prefix lookups
+        self._terms = []
+        self._analyzer = GermanAnalyzer()
+        # Deletion dictionary over all terms, for typo correction
+        self._speller = SymSpell()
+        # Bumped on every change; see generation
+        self._instance = uuid.uuid4().hex[:12]
+        self._writes = 0
+
+    # ── maintenance ──────────────────────────────────────────────────
+
+    def _add_locked(self, recipe_id: int, length: float, tfs: dict):
+        for term, tf in tfs.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+                self._speller.add(term)
+            posting[recipe_id] = tf
+        self._docs[recipe_id] = (length, tfs)
+        self._total_len += length
+
+    def _remove_locked(self, recipe_id: int):
+        doc = self._docs.pop(recipe_id, None)
+        if doc is None:
+            return
+        length, tfs = doc
+        self._total_len -= length
+        for term in tfs:
+            posting = self._postings[term]
+            posting.pop(recipe_id, None)
+            if not posting:
+                del self._postings[term]
+                self._speller.remove(term)
+                i = bisect.bisect_left(self._terms, term)
+                if i < len(self._terms) and self._terms[i] == term:
+                    del self._terms[i]
+
+    def update_recipe(
+        self, recipe_id: int, title, tags, ingredients, chef, updated_at=None
+    ):
+        """Add a recipe, or replace its previous postings."""
+        fields = recipe_fields(title, tags, ingredients, chef)
+        with self._lock:
+            # Its own words become known compound parts (Spätzle -> Käsespätzle).
+            # Under the lock: save() and _swap read the analyzer concurrently
+            analyzer = self._analyzer
+            analyzer.learn(w for text in fields.values() for w in folded_words(text))
+        tfs = {}
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for term in analyzer.terms(text):
+                tfs[term] = tfs.get(term, 0.0) + weight
+        with self._lock:
+            self._remove_locked(recipe_id)
+            self._stamps[recipe_id] = to_iso(updated_at)
+            self._writes += 1
+            if tfs:
+                self._add_locked(recipe_id, sum(tfs.values()), tfs)
+
+    def remove_recipe(self, recipe_id: int):
+        with self._lock:
+            self._remove_locked(recipe_id)
+            self._stamps.pop(recipe_id, None)
+            self._writes += 1
+
+    def _swap(self, other: "SearchIndex"):
+        with self._lock:
+            self._postings = other._postings
+            self._docs = other._docs
+            self._stamps = other._stamps
+            self._total_len = other._total_len
+            self._terms = other._terms
+            self._analyzer = other._analyzer
+            self._speller = other._speller
+            self._writes += 1
+            self.built = True
+
+    def build(self, db: Session):
+        fresh = SearchIndex()
+        rows = db.query(
+            Recipe.id,
+            Recipe.title,
+            Recipe.tags,
+            Recipe.ingredients,
+            Recipe.chef,
+            Recipe.updated_at,
+        ).all()
+        # Learn the whole vocabulary first so every recipe splits compounds alike
+        for r in rows:
+            fields = recipe_fields(r.title, r.tags, r.ingredients, r.chef)
+            fresh._analyzer.learn(w for text in fields.values() for w in folded_words(text))
+        for r in rows:
+            fresh.update_recipe(
+                r.id, r.title, r.tags, r.ingredients, r.chef, updated_at=r.updated_at
+            )
+        self._swap(fresh)
+
+    def ensure_built(self, db: Session):
+        if not self.built:
+            self.build(db)
+
+    @property
+    def generation(self) -> str:
+        """
+        Changes with every write to this index. Unique per process, so results
+        cached in a shared backend are never served from another worker's
+        index, which may not have caught up with the same writes.
+        """
+        with self._lock:
+            return f"{self._instance}.{self._writes}"
+
+    def sync_with(self, db: Session):
+        """Catch a loaded snapshot up with recipes created, edited or deleted since."""
+        live = {r.id: to_iso(r.updated_at) for r in db.query(Recipe.id, Recipe.updated_at)}
+        with self._lock:
+            stamps = dict(self._stamps)
+        for rid in stamps.keys() - live.keys():
+            self.remove_recipe(rid)
+        stale = [
+            rid for rid, stamp in live.items() if rid not in stamps or stamps[rid] != stamp
+        ]
+        for start in range(0, len(stale), 1000):
+            for r in db.query(
+                Recipe.id,
+                Recipe.title,
+                Recipe.tags,
+                Recipe.ingredients,
+                Recipe.chef,
+                Recipe.updated_at,
+            ).filter(Recipe.id.in_(stale[start : start + 1000])):
+                self.update_recipe(
+                    r.id, r.title, r.tags, r.ingredients, r.chef, updated_at=r.updated_at
+                )
+
+    # ── snapshot ─────────────────────────────────────────────────────
+
+    def save(self, path: str = SEARCH_INDEX_PATH):
+        """
+        Write the snapshot to a temp file of its own and atomically replace the
+        old one, so workers saving at the same time never share a file.
+        """
+        with self._lock:
+            docs = {
+                str(rid): [length, tfs] for rid, (length, tfs) in self._docs.items()
+            }
+            stamps = {str(rid): stamp for rid, stamp in self._stamps.items()}
+            learned = sorted(self._analyzer.learned)
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {
+                        "version": SNAPSHOT_VERSION,
+                        "docs": docs,
+                        "stamps": stamps,
+                        "learned": learned,
+                    },
+                    f,
+                    separators=(",", ":"),
+                )
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load(self, path: str = SEARCH_INDEX_PATH) -> bool:
+        """Load a snapshot. Returns False if there is none or it is outdated."""
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                return False
+            docs = snapshot["docs"]
+            stamps = snapshot["stamps"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            return False
+        fresh = SearchIndex()
+        fresh._analyzer = GermanAnalyzer(snapshot.get("learned", []))
+        for rid, (length, tfs) in docs.items():
+            for term, tf in tfs.items():
+                fresh._postings.setdefault(term, {})[int(rid)] = tf
+            fresh._docs[int(rid)] = (length, tfs)
+            fresh._total_len += length
+        fresh._stamps = {int(rid): stamp for rid, stamp in stamps.items()}
+        fresh._terms = sorted(fresh._postings)
+        for term in fresh._terms:
+            fresh._speller.add(term)
+        self._swap(fresh)
+        return True
+
+    # ── queries ──────────────────────────────────────────────────────
+
+    def _prefix_terms(self, prefix: str) -> list:
+        start = bisect.bisect_left(self._terms, prefix)
+        terms = []
+        for term in self._terms[start : start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _correct_locked(self, term: str):
+        """Closest known term within 1-2 edits (most frequent on ties), or None."""
+        if len(term) < TYPO_MIN_LENGTH:
+            return None
+        max_distance = 1 if len(term) < TYPO_TWO_EDITS_LENGTH else 2
+        matches = self._speller.lookup(term, max_distance)
+        if not matches:
+            return None
+        best = matches[0][0]
+        return max(
+            (t for d, t in matches if d == best),
+            key=lambda t: (len(self._postings[t]), t),
+        )
+
+    def _alternatives_locked(self, word: str, is_prefix: bool) -> list:
+        """Ways a folded query word can match: [((term, ...), weight), ...]."""
+        full, parts = self._analyzer.analyze_word(word)
+        alternatives = []
+        if full in self._postings:
+            alternatives.append(((full,), 1.0))
+        if parts:
+            alternatives.append((tuple(parts), COMPOUND_WEIGHT))
+        if is_prefix:
+            alternatives += [
+                ((t,), PREFIX_WEIGHT) for t in self._prefix_terms(full) if t != full
+            ]
+        if not alternatives:
+            corrected = self._correct_locked(full)
+            if corrected is not None:
+                alternatives.append(((corrected,), TYPO_WEIGHT))
+        return alternatives
+
+    def _term_scores_locked(self, term: str, n_docs: int, avg_len: float) -> dict:
+        posting = self._postings.get(term)
+        if not posting:
+            return {}
+        df = len(posting)
+        idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        scores = {}
+        for rid, tf in posting.items():
+            length = self._docs[rid][0]
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+            scores[rid] = idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> tuple:
+        """
+        BM25 top-k. Returns ([(recipe_id, score), ...] for the requested page,
+        total number of matching recipes).
+        """
+        words = folded_words(query)
+        if not words:
+            return [], 0
+        # Search-as-you-type: the last word may still be incomplete
+        prefix = None if query[-1:].isspace() else words[-1]
+
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs:
+                return [], 0
+            avg_len = self._total_len / n_docs
+            scores = {}
+            for word in dict.fromkeys(words):
+                # Per document, the best of the word's alternatives counts; a
+                # compound matched through its parts scores their average
+                best = {}
+                for terms, weight in self._alternatives_locked(word, word == prefix):
+                    alternative = {}
+                    for term in terms:
+                        term_scores = self._term_scores_locked(term, n_docs, avg_len)
+                        for rid, s in term_scores.items():
+                            alternative[rid] = alternative.get(rid, 0.0) + s
+                    for rid, s in alternative.items():
+                        s *= weight / len(terms)
+                        if s > best.get(rid, 0.0):
+                            best[rid] = s
+                for rid, s in best.items():
+                    scores[rid] = scores.get(rid, 0.0) + s
+
+        top = heapq.nlargest(offset + limit, scores.items(), key=lambda kv: (kv[1], kv[0]))
+        return top[offset:], len(scores)
+
+
+search_index = SearchIndex()
+
+
+def search_recipes(db: Session, query: str, limit: int = 20, offset: int = 0) -> tuple:
+    search_index.ensure_built(db)
+    return search_index.search(query, limit, offset)
+
+
+def load_or_build_search_index():
+    """Startup: load the snapshot and catch up, or build and snapshot."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if search_index.load():
+            search_index.sync_with(db)
+        else:
+            search_index.build(db)
+            search_index.save()
+    finally:
+        db.close()
+
+
+def rebuild_search_index_job():
+    """Periodic rebuild; picks up other workers' edits and refreshes the snapshot."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        search_index.build(db)
+        search_index.save()
+        logger.info("Rebuilt search index")
+    finally:
+        db.close()
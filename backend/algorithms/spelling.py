@@ -0,0 +1,98 @@
+# Spelling Correction
+# Purpose: Typo tolerance for search terms without scanning the vocabulary
+# (SymSpell, symmetric delete). Each dictionary term is filed under every
+# string reachable by deleting up to MAX_EDIT_DISTANCE characters from its
+# first PREFIX_LENGTH characters. A lookup generates the same deletes for the
+# query term, so only the handful of terms sharing one of them are compared;
+# the cost does not grow with the dictionary.
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (an adjacent swap counts as one edit).
+    Stops early and returns limit + 1 once the distance must exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (
+                prev2 is not None
+                and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return min(prev[-1], limit + 1)
+
+
+class SymSpell:
+    def __init__(
+        self, max_distance: int = MAX_EDIT_DISTANCE, prefix_length: int = PREFIX_LENGTH
+    ):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._terms = set()
+        # delete variant -> {terms}
+        self._deletes = {}
+
+    def _variants(self, term: str) -> set:
+        key = term[: self.prefix_length]
+        variants = {key}
+        frontier = {key}
+        for _ in range(self.max_distance):
+            frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+            variants |= frontier
+        return variants
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, term: str):
+        if term in self._terms:
+            return
+        self._terms.add(term)
+        for variant in self._variants(term):
+            self._deletes.setdefault(variant, set()).add(term)
+
+    def remove(self, term: str):
+        if term not in self._terms:
+            return
+        self._terms.discard(term)
+        for variant in self._variants(term):
+            terms = self._deletes.get(variant)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._deletes[variant]
+
+    def lookup(self, term: str, max_distance: int = None) -> list:
+        """[(distance, term), ...] within max_distance, closest first."""
+        limit = self.max_distance
+        if max_distance is not None:
+            limit = min(max_distance, limit)
+        if term in self._terms:
+            return [(0, term)]
+        candidates = set()
+        for variant in self._variants(term):
+            candidates |= self._deletes.get(variant, set())
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(term, candidate, limit)
+            if distance <= limit:
+                matches.append((distance, candidate))
+        return sorted(matches)
@@ -0,0 +1,231 @@
+# Trending Engine
+# Purpose: Rank recipes by recent engagement instead of all-time views. Counter
+# deltas (likes, saves, comments, views) are kept in hourly ring buffers per
+# recipe, decayed by bucket age, and the top TRENDING_SIZE ids are held in
+# memory for /recipes/trending. The buckets live in a cache backend: with
+# CACHE_BACKEND=redis all workers share one history that survives restarts,
+# one worker refreshes it per tick and the others load it. The in-process
+# default is per worker and starts empty on restart.
+
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional
+import os
+import threading
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models import Recipe
+from services.cache_backends import InMemoryLRUCache, create_cache_backend
+from timeutils import utcnow, as_utc
+
+TRENDING_REFRESH_SECONDS = int(os.getenv("TRENDING_REFRESH_SECONDS", "60"))
+TRENDING_WINDOW_HOURS = 24
+TRENDING_HALF_LIFE_HOURS = 6.0
+TRENDING_SIZE = 15
+
+# Same weights as the EdgeRank base score: likes, saves, comments, views
+CHANNELS = ("likes_count", "saves_count", "comments_count", "views")
+CHANNEL_WEIGHTS = np.array([2.0, 3.0, 2.0, 0.1])
+
+STATE_KEY = "trending:state"
+# Held by the worker that is refreshing, so two never fold the same deltas
+REFRESH_LOCK_KEY = "trending:refresh"
+
+
+def _hour_of(dt: datetime) -> int:
+    return int(as_utc(dt).timestamp() // 3600)
+
+
+class TrendingEngine:
+    def __init__(
+        self,
+        window_hours: int = TRENDING_WINDOW_HOURS,
+        half_life_hours: float = TRENDING_HALF_LIFE_HOURS,
+        size: int = TRENDING_SIZE,
+        backend=None,
+    ):
+        self.window_hours = window_hours
+        self.half_life_hours = half_life_hours
+        self.size = size
+        self.backend = backend or InMemoryLRUCache(
+            max_entries=2, default_ttl=window_hours * 3600
+        )
+        self._lock = threading.Lock()
+        # Counter snapshot of the previous refresh, sorted by recipe id
+        self._ids = np.empty(0, dtype=np.int64)
+        self._counts = np.empty((0, len(CHANNELS)), dtype=np.int64)
+        # recipe_id -> (window_hours, channels) deltas, slot = hour % window_hours.
+        # Only recipes with engagement inside the window have a ring.
+        self._rings = {}
+        self._hour = None
+        self._top = []
+        self._newest = deque(maxlen=size)
+
+    def _ring(self, recipe_id: int) -> np.ndarray:
+        ring = self._rings.get(recipe_id)
+        if ring is None:
+            ring = self._rings[recipe_id] = np.zeros(
+                (self.window_hours, len(CHANNELS)), dtype=np.int64
+            )
+        return ring
+
+    def _advance(self, hour: int):
+        """Zero the slots of the hours that left the window since the last refresh."""
+        if self._hour is None:
+            return
+        expired = [
+            h % self.window_hours
+            for h in range(self._hour + 1, min(hour, self._hour + self.window_hours) + 1)
+        ]
+        if not expired:
+            return
+        for recipe_id in list(self._rings):
+            ring = self._rings[recipe_id]
+            ring[expired] = 0
+            if not ring.any():
+                del self._rings[recipe_id]
+
+    def _load_locked(self):
+        """Adopt the shared state, if there is one."""
+        state = self.backend.get(STATE_KEY)
+        if state is None:
+            return
+        self._hour = state["hour"]
+        self._ids = np.array(state["ids"], dtype=np.int64)
+        self._counts = np.array(state["counts"], dtype=np.int64).reshape(
+            len(self._ids), len(CHANNELS)
+        )
+        self._rings = {
+            recipe_id: np.array(ring, dtype=np.int64) for recipe_id, ring in state["rings"]
+        }
+        self._top = list(state["top"])
+        self._newest = deque(state["newest"], maxlen=self.size)
+
+    def _store_locked(self):
+        self.backend.set(
+            STATE_KEY,
+            {
+                "hour": self._hour,
+                "ids": self._ids.tolist(),
+                "counts": self._counts.tolist(),
+                "rings": [[rid, ring.tolist()] for rid, ring in self._rings.items()],
+                "top": list(self._top),
+                "newest": list(self._newest),
+            },
+            ttl=self.window_hours * 3600,
+        )
+
+    def refresh(self, db: Session, now: Optional[datetime] = None):
+        if not self.backend.add(REFRESH_LOCK_KEY, 1, ttl=TRENDING_REFRESH_SECONDS):
+            # Another worker is refreshing; serve the last state it stored
+            with self._lock:
+                self._load_locked()
+            return
+        try:
+            self._refresh(db, now or utcnow())
+        finally:
+            self.backend.delete(REFRESH_LOCK_KEY)
+
+    def _refresh(self, db: Session, now: datetime):
+        hour = _hour_of(now)
+        rows = (
+            db.query(Recipe.id, Recipe.created_at, *[getattr(Recipe, c) for c in CHANNELS])
+            .order_by(Recipe.id)
+            .all()
+        )
+        ids = np.array([r.id for r in rows], dtype=np.int64)
+        counts = np.array(
+            [[getattr(r, c) or 0 for c in CHANNELS] for r in rows], dtype=np.int64
+        ).reshape(len(rows), len(CHANNELS))
+
+        with self._lock:
+            self._load_locked()
+            self._advance(hour)
+
+            # Align with the previous snapshot; both id arrays are sorted
+            pos = np.searchsorted(self._ids, ids)
+            known = pos < len(self._ids)
+            known[known] = self._ids[pos[known]] == ids[known]
+            deltas = np.zeros_like(counts)
+            deltas[known] = np.maximum(counts[known] - self._counts[pos[known]], 0)
+
+            slot = hour % self.window_hours
+            for i in np.flatnonzero(known & deltas.any(axis=1)):
+                self._ring(int(ids[i]))[slot] += deltas[i]
+
+            # First sighting: credit engagement of recipes uploaded inside the
+            # window to their upload hour; older recipes only set the baseline
+            window_start = now - timedelta(hours=self.window_hours)
+            for i in np.flatnonzero(~known):
+                created_at = rows[i].created_at
+                if created_at and as_utc(created_at) > as_utc(window_start) and counts[i].any():
+                    upload_slot = min(_hour_of(created_at), hour) % self.window_hours
+                    self._ring(int(ids[i]))[upload_slot] += counts[i]
+
+            # Rings of deleted recipes
+            for recipe_id in set(self._rings) - set(ids.tolist()):
+                del self._rings[recipe_id]
+
+            self._ids, self._counts, self._hour = ids, counts, hour
+            self._top = self._rank(hour)
+            self._newest = deque(
+                reversed(ids[-self.size :].tolist()), maxlen=self.size
+            )
+            self._store_locked()
+
+    def _rank(self, hour: int) -> list:
+        if not self._rings:
+            return []
+        ring_ids = np.fromiter(self._rings, dtype=np.int64, count=len(self._rings))
+        rings = np.stack(list(self._rings.values()))
+        # Age in hours of each slot relative to the current hour
+        slots = np.arange(self.window_hours)
+        ages = (hour - slots) % self.window_hours
+        decay = np.power(0.5, ages / self.half_life_hours)
+        scores = (rings @ CHANNEL_WEIGHTS) @ decay
+
+        k = min(self.size, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((-ring_ids[top], -scores[top]))]
+        return [int(ring_ids[i]) for i in top if scores[i] > 0]
+
+    def note_upload(self, recipe_id: int):
+        """Make a fresh upload eligible as filler before the next refresh."""
+        with self._lock:
+            self._newest.appendleft(recipe_id)
+
+    def forget(self, recipe_id: int):
+        with self._lock:
+            self._rings.pop(recipe_id, None)
+            self._top = [rid for rid in self._top if rid != recipe_id]
+            if recipe_id in self._newest:
+                self._newest.remove(recipe_id)
+
+    def top_ids(self) -> list:
+        """Trending ids, filled up with the newest uploads when there are too few."""
+        with self._lock:
+            ids = list(self._top)
+            for recipe_id in self._newest:
+                if len(ids) >= self.size:
+                    break
+                if recipe_id not in ids:
+                    ids.append(recipe_id)
+        return ids
+
+
+trending_engine = TrendingEngine(
+    backend=create_cache_backend(2, TRENDING_WINDOW_HOURS * 3600)
+)
+
+
+def refresh_trending_job():
+    """Entry point for the periodic background refresher."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        trending_engine.refresh(db)
+    finally:
+        db.close()
@@ -26,3 +26,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def dialect_insert(bind, model):
+    """insert() of the bind's dialect, for on_conflict_do_nothing / _do_update."""
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
@@ -3,10 +3,43 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.errors import RateLimitExceeded
 from slowapi import _rate_limit_exceeded_handler
+import asyncio
 import os
 
 from database import engine, Base
 from limiter import limiter
+from migrations import run_auto_migrations
+from services.background_tasks import run_periodically
+from services.view_counter import VIEW_FLUSH_SECONDS, flush_view_buffer_job
+from algorithms.edge_rank_scores import SCORE_REFRESH_SECONDS, refresh_recipe_scores_job
+from algorithms.trending import TRENDING_REFRESH_SECONDS, refresh_trending_job
+from algorithms.quality_score import QUALITY_REFRESH_SECONDS, refresh_quality_scores_job
+from algorithms.contextual_pairing import (
+    PAIRING_REBUILD_SECONDS,
+    rebuild_pairing_index_job,
+)
+from algorithms.related_recipes import (
+    RELATED_REBUILD_SECONDS,
+    load_or_build_related_index,
+    rebuild_related_index_job,
+)
+from algorithms.search_engine import (
+    SEARCH_REBUILD_SECONDS,
+    load_or_build_search_index,
+    rebuild_search_index_job,
+)
+from algorithms.autocomplete import (
+    AUTOCOMPLETE_REBUILD_SECONDS,
+    rebuild_autocomplete_job,
+)
+from algorithms.ingredient_coverage import (
+    INGREDIENT_INDEX_REBUILD_SECONDS,
+    rebuild_ingredient_index_job,
+)
+from algorithms.item_similarity import (
+    NEIGHBORS_REFRESH_SECONDS,
+    refresh_item_neighbors_job,
+)
 from routers import (
     auth_router,
     users_router,
@@ -28,20 +61,63 @@ from contextlib import asynccontextmanager
 async def lifespan(app: FastAPI):
     # Create tables
     Base.metadata.create_all(bind=engine)
-    # Auto-migrate: add parent_id to comments if missing
-    from sqlalchemy import text, inspect
-
-    with engine.connect() as conn:
-        inspector = inspect(engine)
-        columns = [c["name"] for c in inspector.get_columns("comments")]
-        if "parent_id" not in columns:
-            conn.execute(
-                text(
-                    "ALTER TABLE comments ADD COLUMN parent_id INTEGER REFERENCES comments(id)"
-                )
+    # Auto-migrate columns added after the initial schema
+    run_auto_migrations(engine)
+
+    # Load index snapshots (built once if missing)
+    await asyncio.to_thread(load_or_build_related_index)
+    await asyncio.to_thread(load_or_build_search_index)
+
+    # Periodic in-process jobs
+    tasks = [
+        asyncio.create_task(
+            run_periodically(
+                SCORE_REFRESH_SECONDS, refresh_recipe_scores_job, run_immediately=True
+            )
+        ),
+        asyncio.create_task(run_periodically(VIEW_FLUSH_SECONDS, flush_view_buffer_job)),
+        asyncio.create_task(
+            run_periodically(
+                TRENDING_REFRESH_SECONDS, refresh_trending_job, run_immediately=True
+            )
+        ),
+        asyncio.create_task(
+            run_periodically(NEIGHBORS_REFRESH_SECONDS, refresh_item_neighbors_job)
+        ),
+        asyncio.create_task(
+            run_periodically(
+                PAIRING_REBUILD_SECONDS, rebuild_pairing_index_job, run_immediately=True
+            )
+        ),
+        asyncio.create_task(
+            run_periodically(QUALITY_REFRESH_SECONDS, refresh_quality_scores_job)
+        ),
+        asyncio.create_task(
+            run_periodically(RELATED_REBUILD_SECONDS, rebuild_related_index_job)
+        ),
+        asyncio.create_task(
+            run_periodically(SEARCH_REBUILD_SECONDS, rebuild_search_index_job)
+        ),
+        asyncio.create_task(
+            run_periodically(
+                AUTOCOMPLETE_REBUILD_SECONDS,
+                rebuild_autocomplete_job,
+                run_immediately=True,
+            )
+        ),
+        asyncio.create_task(
+            run_periodically(
+                INGREDIENT_INDEX_REBUILD_SECONDS,
+                rebuild_ingredient_index_job,
+                run_immediately=True,
             )
-            conn.commit()
+        ),
+    ]
     yield
+    for task in tasks:
+        task.cancel()
+    # Write out views buffered since the last periodic flush
+    flush_view_buffer_job()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -0,0 +1,356 @@
+"""Lightweight auto-migrations run at startup.
+
+create_all() only creates missing tables, so columns added to existing
+tables are patched in here with plain ALTER TABLE statements.
+"""
+
+from sqlalchemy import text, inspect, BigInteger, DateTime
+
+# Former ISO-string columns that are now DateTime(timezone=True): (table, column, indexed)
+TIMESTAMP_COLUMNS = [
+    ("recipes", "created_at", True),
+    ("comments", "created_at", True),
+    ("notifications", "created_at", True),
+    ("messages", "created_at", True),
+    ("conversations", "created_at", False),
+    ("conversations", "updated_at", True),
+    ("comment_likes", "created_at", False),
+]
+
+
+def _column_names(engine, table: str) -> list:
+    return [c["name"] for c in inspect(engine).get_columns(table)]
+
+
+def _migrate_timestamps(engine, conn):
+    columns = {
+        table: {c["name"]: c["type"] for c in inspect(engine).get_columns(table)}
+        for table in {t for t, _, _ in TIMESTAMP_COLUMNS}
+    }
+    for table, col, indexed in TIMESTAMP_COLUMNS:
+        if engine.dialect.name == "postgresql":
+            if not isinstance(columns[table][col], DateTime):
+                # Legacy values are naive ISO strings; interpret them as UTC
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table} ALTER COLUMN {col} "
+                        f"TYPE TIMESTAMP WITH TIME ZONE "
+                        f"USING (NULLIF({col}, '')::timestamp AT TIME ZONE 'UTC')"
+                    )
+                )
+        elif engine.dialect.name == "sqlite":
+            # SQLite keeps text; normalize 'YYYY-MM-DDTHH:MM:SS' to the
+            # 'YYYY-MM-DD HH:MM:SS' storage format so text order == time order
+            conn.execute(
+                text(
+                    f"UPDATE {table} SET {col} = replace({col}, 'T', ' ') "
+                    f"WHERE {col} LIKE '____-__-__T%'"
+                )
+            )
+        if indexed:
+            conn.execute(
+                text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{col} ON {table} ({col})")
+            )
+    conn.commit()
+
+
+# Full-text search over recipes (algorithms/fulltext_search.py)
+SQLITE_FTS_COLUMNS = """
+    new.title,
+    (SELECT group_concat(value, ' ') FROM json_each(new.tags)),
+    (SELECT group_concat(json_extract(value, '$.name'), ' ')
+       FROM json_each(new.ingredients)),
+    new.chef
+"""
+
+SQLITE_FTS_STATEMENTS = [
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_insert AFTER INSERT ON recipes BEGIN "
+    "INSERT INTO recipes_fts (rowid, title, tags, ingredients, chef) "
+    f"VALUES (new.id, {SQLITE_FTS_COLUMNS}); END",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_delete AFTER DELETE ON recipes BEGIN "
+    "DELETE FROM recipes_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS recipes_fts_update "
+    "AFTER UPDATE OF title, tags, ingredients, chef ON recipes BEGIN "
+    "DELETE FROM recipes_fts WHERE rowid = old.id; "
+    "INSERT INTO recipes_fts (rowid, title, tags, ingredients, chef) "
+    f"VALUES (new.id, {SQLITE_FTS_COLUMNS}); END",
+]
+
+# Weights: title A, tags B, ingredient names C, chef D
+POSTGRES_SEARCH_VECTOR = """
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+    || setweight(to_tsvector('simple', coalesce(tags::text, '')), 'B')
+    || setweight(to_tsvector('simple', coalesce(
+           jsonb_path_query_array(ingredients::jsonb, '$[*].name')::text, '')), 'C')
+    || setweight(to_tsvector('simple', coalesce(chef, '')), 'D')
+"""
+
+
+def _setup_fulltext(engine, conn):
+    if engine.dialect.name == "sqlite":
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'recipes_fts'")
+        ).first()
+        if not exists:
+            conn.execute(
+                text(
+                    "CREATE VIRTUAL TABLE recipes_fts USING fts5("
+                    "title, tags, ingredients, chef, "
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                )
+            )
+            conn.execute(
+                text(
+                    "INSERT INTO recipes_fts (rowid, title, tags, ingredients, chef) "
+                    "SELECT new.id, "
+                    + SQLITE_FTS_COLUMNS
+                    + " FROM recipes AS new"
+                )
+            )
+        for statement in SQLITE_FTS_STATEMENTS:
+            conn.execute(text(statement))
+    elif engine.dialect.name == "postgresql":
+        if "search_vector" not in _column_names(engine, "recipes"):
+            conn.execute(
+                text(
+                    "ALTER TABLE recipes ADD COLUMN search_vector tsvector "
+                    f"GENERATED ALWAYS AS ({POSTGRES_SEARCH_VECTOR}) STORED"
+                )
+            )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_recipes_search_vector "
+                "ON recipes USING GIN (search_vector)"
+            )
+        )
+    conn.commit()
+
+
+def run_auto_migrations(engine):
+    with engine.connect() as conn:
+        # comments.parent_id (threaded replies)
+        columns = _column_names(engine, "comments")
+        if "parent_id" not in columns:
+            conn.execute(
+                text(
+                    "ALTER TABLE comments ADD COLUMN parent_id INTEGER REFERENCES comments(id)"
+                )
+            )
+            conn.commit()
+
+        # comments.likes_count / replies_count (denormalized comment counters)
+        comment_counters_added = False
+        for col in ("likes_count", "replies_count"):
+            if col not in columns:
+                conn.execute(
+                    text(
+                        f"ALTER TABLE comments ADD COLUMN {col} INTEGER NOT NULL DEFAULT 0"
+                    )
+                )
+                comment_counters_added = True
+        if comment_counters_added:
+            conn.commit()
+
+        # conversations: denormalized last message + unread counters
+        columns = _column_names(engine, "conversations")
+        timestamp = (
+            "TIMESTAMP WITH TIME ZONE" if engine.dialect.name == "postgresql" else "DATETIME"
+        )
+        conversation_summaries_added = False
+        for col, ddl in (
+            ("last_message_id", "INTEGER"),
+            ("last_message_preview", "VARCHAR"),
+            ("last_message_at", timestamp),
+            ("user1_unread", "INTEGER NOT NULL DEFAULT 0"),
+            ("user2_unread", "INTEGER NOT NULL DEFAULT 0"),
+        ):
+            if col not in columns:
+                conn.execute(text(f"ALTER TABLE conversations ADD COLUMN {col} {ddl}"))
+                conversation_summaries_added = True
+        if conversation_summaries_added:
+            conn.commit()
+
+        # recipes.*_count (denormalized engagement counters)
+        columns = _column_names(engine, "recipes")
+        added = False
+        for col in ("likes_count", "saves_count", "comments_count"):
+            if col not in columns:
+                conn.execute(
+                    text(
+                        f"ALTER TABLE recipes ADD COLUMN {col} INTEGER NOT NULL DEFAULT 0"
+                    )
+                )
+                added = True
+        if added:
+            conn.commit()
+
+        # recipes.watch_ms_total (view events); int4 overflows at ~25 days
+        if "watch_ms_total" not in columns:
+            conn.execute(
+                text(
+                    "ALTER TABLE recipes ADD COLUMN watch_ms_total BIGINT NOT NULL DEFAULT 0"
+                )
+            )
+            conn.commit()
+        elif engine.dialect.name == "postgresql" and not any(
+            c["name"] == "watch_ms_total" and isinstance(c["type"], BigInteger)
+            for c in inspect(engine).get_columns("recipes")
+        ):
+            conn.execute(
+                text("ALTER TABLE recipes ALTER COLUMN watch_ms_total TYPE BIGINT")
+            )
+            conn.commit()
+
+        # recipes.interactions_version (item neighbour dirtiness); neighbour
+        # state rows hold likes + saves from before, so start from that
+        if "interactions_version" not in columns:
+            conn.execute(
+                text(
+                    "ALTER TABLE recipes ADD COLUMN interactions_version "
+                    "INTEGER NOT NULL DEFAULT 0"
+                )
+            )
+            conn.execute(
+                text("UPDATE recipes SET interactions_version = likes_count + saves_count")
+            )
+            conn.commit()
+
+        # Last content edit, compared by the in-process index snapshots
+        recipes_updated_at_added = "updated_at" not in columns
+        if recipes_updated_at_added:
+            conn.execute(text(f"ALTER TABLE recipes ADD COLUMN updated_at {timestamp}"))
+            conn.commit()
+
+        # When a like was given; older likes are dated to their recipe's upload
+        likes_created_at_added = "created_at" not in _column_names(engine, "likes")
+        if likes_created_at_added:
+            conn.execute(text(f"ALTER TABLE likes ADD COLUMN created_at {timestamp}"))
+            conn.commit()
+
+        # Video metadata + batch quality score
+        for col, ddl in (
+            ("video_width", "INTEGER"),
+            ("video_height", "INTEGER"),
+            ("video_duration_ms", "INTEGER"),
+            ("quality_score", "FLOAT NOT NULL DEFAULT 0.5"),
+        ):
+            if col not in columns:
+                conn.execute(text(f"ALTER TABLE recipes ADD COLUMN {col} {ddl}"))
+                conn.commit()
+        # Near-duplicate signatures (recipe_lsh_buckets comes from create_all)
+        for col, ddl in (
+            ("minhash", "BLOB" if engine.dialect.name == "sqlite" else "BYTEA"),
+            ("duplicate_of", "INTEGER REFERENCES recipes(id)"),
+        ):
+            if col not in columns:
+                conn.execute(text(f"ALTER TABLE recipes ADD COLUMN {col} {ddl}"))
+                conn.commit()
+        if "quality_score" not in _column_names(engine, "recipe_scores"):
+            conn.execute(
+                text(
+                    "ALTER TABLE recipe_scores ADD COLUMN quality_score FLOAT NOT NULL DEFAULT 0.5"
+                )
+            )
+            conn.commit()
+
+        # Indexes added to existing tables
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_recipes_owner_id ON recipes (owner_id)")
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_recipes_duplicate_of ON recipes (duplicate_of)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_follows_following_id ON follows (following_id)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_comments_recipe_parent_id "
+                "ON comments (recipe_id, parent_id, id)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_comments_parent_id ON comments (parent_id, id)"
+            )
+        )
+        for slot in ("user1", "user2"):
+            conn.execute(
+                text(
+                    f"CREATE INDEX IF NOT EXISTS ix_conversations_{slot}_last "
+                    f"ON conversations ({slot}_id, last_message_at, id)"
+                )
+            )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_messages_conversation_id "
+                "ON messages (conversation_id, id)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_likes_user_created "
+                "ON likes (user_id, created_at)"
+            )
+        )
+        conn.commit()
+
+        # ISO string timestamps -> DateTime columns
+        _migrate_timestamps(engine, conn)
+        if recipes_updated_at_added:
+            conn.execute(
+                text("UPDATE recipes SET updated_at = created_at WHERE updated_at IS NULL")
+            )
+            conn.commit()
+        if likes_created_at_added:
+            conn.execute(
+                text(
+                    "UPDATE likes SET created_at = (SELECT created_at FROM recipes "
+                    "WHERE recipes.id = likes.recipe_id) WHERE created_at IS NULL"
+                )
+            )
+            conn.commit()
+
+        # FTS5 table + triggers (SQLite) / tsvector column + GIN index (Postgres)
+        _setup_fulltext(engine, conn)
+
+    if added:
+        from sqlalchemy.orm import Session
+        from services.engagement_counters import rebuild_engagement_counters
+
+        with Session(engine) as db:
+            rebuild_engagement_counters(db)
+            db.commit()
+
+    if comment_counters_added:
+        from sqlalchemy.orm import Session
+        from services.engagement_counters import rebuild_comment_counters
+
+        with Session(engine) as db:
+            rebuild_comment_counters(db)
+            db.commit()
+
+    if conversation_summaries_added:
+        from sqlalchemy.orm import Session
+        from services.conversation_summaries import rebuild_conversation_summaries
+
+        with Session(engine) as db:
+            rebuild_conversation_summaries(db)
+            db.commit()
+
+    # recipe_tags (new table from create_all): backfill from the JSON column once
+    with engine.connect() as conn:
+        needs_tags = conn.execute(
+            text("SELECT 1 FROM recipes WHERE tags IS NOT NULL LIMIT 1")
+        ).first() and not conn.execute(text("SELECT 1 FROM recipe_tags LIMIT 1")).first()
+    if needs_tags:
+        from sqlalchemy.orm import Session
+        from services.recipe_tags import backfill_recipe_tags
+
+        with Session(engine) as db:
+            backfill_recipe_tags(db)
+            db.commit()
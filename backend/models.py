@@ -1,7 +1,9 @@
-from sqlalchemy import ForeignKey, JSON
+from sqlalchemy import ForeignKey, JSON, Index, DateTime, LargeBinary, BigInteger
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import Optional
+from datetime import datetime
 from database import Base
+from timeutils import utcnow
 
 
 class User(Base):
@@ -30,7 +32,9 @@ class Notification(Base):
         ForeignKey("recipes.id"), default=None
     )
     read: Mapped[bool] = mapped_column(default=False)
-    created_at: Mapped[str] = mapped_column()
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, index=True
+    )
 
 
 class ShoppingList(Base):
@@ -68,19 +72,141 @@ class Recipe(Base):
     title: Mapped[str] = mapped_column()
     video_url: Mapped[str] = mapped_column()
     chef: Mapped[str] = mapped_column()
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     ingredients: Mapped[Optional[list]] = mapped_column(JSON)
     steps: Mapped[Optional[list]] = mapped_column(JSON)
     tags: Mapped[Optional[list]] = mapped_column(JSON)
     tips: Mapped[Optional[str]] = mapped_column(default=None)
     views: Mapped[int] = mapped_column(default=0)
-    created_at: Mapped[Optional[str]] = mapped_column(default=None)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=utcnow, index=True
+    )
+    # Last content edit (PATCH); in-process indexes compare it to catch up
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=utcnow
+    )
+
+    # Denormalized engagement counters, maintained by services/engagement_counters
+    likes_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    saves_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    comments_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    # Bumped whenever a like or save is added or removed; item_similarity
+    # recomputes neighbours computed at an older version
+    interactions_version: Mapped[int] = mapped_column(default=0, server_default="0")
+    # Sum of reported watch time, flushed by services/view_counter with views
+    watch_ms_total: Mapped[int] = mapped_column(
+        BigInteger, default=0, server_default="0"
+    )
+
+    # Video metadata reported by the uploading client (None = unknown)
+    video_width: Mapped[Optional[int]] = mapped_column(default=None)
+    video_height: Mapped[Optional[int]] = mapped_column(default=None)
+    video_duration_ms: Mapped[Optional[int]] = mapped_column(default=None)
+    # Batch-computed by algorithms/quality_score; 0.5 = neutral
+    quality_score: Mapped[float] = mapped_column(default=0.5, server_default="0.5")
+
+    # Near-duplicate detection (algorithms/near_duplicates): MinHash signature
+    # as raw uint32 bytes (deferred: only the duplicate check reads it), and
+    # the earliest recipe this one is a copy of
+    minhash: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, default=None, deferred=True
+    )
+    duplicate_of: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("recipes.id"), default=None, index=True
+    )
+
+
+class RecipeTag(Base):
+    """Normalized Recipe.tags, one row per tag (services/recipe_tags)."""
+
+    __tablename__ = "recipe_tags"
+    recipe_id: Mapped[int] = mapped_column(
+        ForeignKey("recipes.id"), primary_key=True, index=True
+    )
+    tag: Mapped[str] = mapped_column(primary_key=True)
+    # Copy of recipes.created_at so tag pages never touch the recipes table
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=utcnow
+    )
+
+
+Index(
+    "ix_recipe_tags_tag_created",
+    RecipeTag.tag,
+    RecipeTag.created_at.desc(),
+    RecipeTag.recipe_id.desc(),
+)
+
+
+class RecipeLshBucket(Base):
+    """LSH band buckets of recipe MinHash signatures (algorithms/near_duplicates)."""
+
+    __tablename__ = "recipe_lsh_buckets"
+    band: Mapped[int] = mapped_column(primary_key=True)
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    recipe_id: Mapped[int] = mapped_column(
+        ForeignKey("recipes.id"), primary_key=True, index=True
+    )
+
+
+class RecipeScore(Base):
+    """Viewer-independent EdgeRank score, refreshed by algorithms/edge_rank_scores."""
+
+    __tablename__ = "recipe_scores"
+    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id"), primary_key=True)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    score: Mapped[float] = mapped_column()
+    # Inputs the score was computed from; the row is recomputed when they change
+    likes_count: Mapped[int] = mapped_column(default=0)
+    saves_count: Mapped[int] = mapped_column(default=0)
+    comments_count: Mapped[int] = mapped_column(default=0)
+    views: Mapped[int] = mapped_column(default=0)
+    quality_score: Mapped[float] = mapped_column(default=0.5, server_default="0.5")
+    age_bucket: Mapped[int] = mapped_column(default=0)
+
+
+Index(
+    "ix_recipe_scores_score_id",
+    RecipeScore.score.desc(),
+    RecipeScore.recipe_id.desc(),
+)
+
+
+class RecipeNeighbor(Base):
+    """Top-K item-item similar recipes, built by algorithms/item_similarity."""
+
+    __tablename__ = "recipe_neighbors"
+    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id"), primary_key=True)
+    neighbor_id: Mapped[int] = mapped_column(ForeignKey("recipes.id"), primary_key=True)
+    score: Mapped[float] = mapped_column()
+
+
+Index(
+    "ix_recipe_neighbors_recipe_score",
+    RecipeNeighbor.recipe_id,
+    RecipeNeighbor.score.desc(),
+)
+
+
+class RecipeNeighborState(Base):
+    """Recipe.interactions_version a recipe's neighbours were computed from."""
+
+    __tablename__ = "recipe_neighbor_state"
+    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id"), primary_key=True)
+    interactions: Mapped[int] = mapped_column(default=0)
 
 
 class Like(Base):
     __tablename__ = "likes"
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
     recipe_id: Mapped[int] = mapped_column(ForeignKey("recipes.id"), primary_key=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=utcnow
+    )
+
+
+# A user's likes, newest first (recommendation sources)
+Index("ix_likes_user_created", Like.user_id, Like.created_at)
 
 
 class Comment(Base):
@@ -92,14 +218,26 @@ class Comment(Base):
     parent_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("comments.id"), default=None
     )
-    created_at: Mapped[str] = mapped_column()
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, index=True
+    )
+    # Denormalized counters (services/engagement_counters)
+    likes_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    replies_count: Mapped[int] = mapped_column(default=0, server_default="0")
+
+
+# Keyset pages: top-level comments of a recipe, replies of a comment
+Index("ix_comments_recipe_parent_id", Comment.recipe_id, Comment.parent_id, Comment.id)
+Index("ix_comments_parent_id", Comment.parent_id, Comment.id)
 
 
 class CommentLike(Base):
     __tablename__ = "comment_likes"
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
     comment_id: Mapped[int] = mapped_column(ForeignKey("comments.id"), primary_key=True)
-    created_at: Mapped[Optional[str]] = mapped_column(default=None)
+    created_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=utcnow
+    )
 
 
 class Collection(Base):
@@ -132,7 +270,40 @@ class SharedCollection(Base):
 class Follow(Base):
     __tablename__ = "follows"
     follower_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
-    following_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    following_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), primary_key=True, index=True
+    )
+
+
+class FeedInboxEntry(Base):
+    """Fan-out-on-write "Following" inbox; read by (follower_id, recipe_id DESC)."""
+
+    __tablename__ = "feed_inbox"
+    follower_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    recipe_id: Mapped[int] = mapped_column(
+        ForeignKey("recipes.id"), primary_key=True, index=True
+    )
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+
+
+class FanoutOnReadCreator(Base):
+    """Creators whose uploads skipped fan-out; followers pull them on read."""
+
+    __tablename__ = "fanout_on_read_creators"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+
+
+class UserInterestVector(Base):
+    """Sparse tag/ingredient interests, maintained by algorithms/recommendation."""
+
+    __tablename__ = "user_interest_vectors"
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    # int32 hashed feature ids (sorted) and float32 weights, as raw bytes
+    feature_ids: Mapped[bytes] = mapped_column(LargeBinary)
+    weights: Mapped[bytes] = mapped_column(LargeBinary)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=utcnow
+    )
 
 
 class Conversation(Base):
@@ -140,8 +311,37 @@ class Conversation(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user1_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     user2_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    created_at: Mapped[str] = mapped_column()
-    updated_at: Mapped[str] = mapped_column()
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, index=True
+    )
+    # Denormalized inbox summary (services/conversation_summaries.py);
+    # last_message_at starts at created_at so the inbox keyset is never NULL
+    last_message_id: Mapped[Optional[int]] = mapped_column(nullable=True)
+    last_message_preview: Mapped[Optional[str]] = mapped_column(nullable=True)
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=True
+    )
+    # Messages from the other participant not yet read by user1 / user2
+    user1_unread: Mapped[int] = mapped_column(default=0, server_default="0")
+    user2_unread: Mapped[int] = mapped_column(default=0, server_default="0")
+
+
+# Inbox: a user's conversations by recency, once per participant slot
+Index(
+    "ix_conversations_user1_last",
+    Conversation.user1_id,
+    Conversation.last_message_at,
+    Conversation.id,
+)
+Index(
+    "ix_conversations_user2_last",
+    Conversation.user2_id,
+    Conversation.last_message_at,
+    Conversation.id,
+)
 
 
 class Message(Base):
@@ -150,10 +350,15 @@ class Message(Base):
     conversation_id: Mapped[int] = mapped_column(ForeignKey("conversations.id"))
     sender_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     text: Mapped[str] = mapped_column()
-    created_at: Mapped[str] = mapped_column()
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, index=True
+    )
     read: Mapped[bool] = mapped_column(default=False)
 
 
+Index("ix_messages_conversation_id", Message.conversation_id, Message.id)
+
+
 class PushToken(Base):
     __tablename__ = "push_tokens"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
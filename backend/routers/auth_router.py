@@ -10,6 +10,8 @@ from schemas import UserCreate, Token, UserVerify
 from auth import get_password_hash, verify_password, create_access_token
 from fastapi.security import OAuth2PasswordRequestForm
 from limiter import limiter
+from algorithms.autocomplete import autocomplete_index
+from services.result_cache import bump_user_versions
 
 router = APIRouter()
 
@@ -59,6 +61,8 @@ def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username oder Email bereits vergeben",
         )
+    autocomplete_index.update_user(new_user.id, new_user.username, new_user.display_name)
+    bump_user_versions()
 
     # Auto-verify: direkt Token zurückgeben
     access_token = create_access_token(data={"sub": user.username})
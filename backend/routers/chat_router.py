@@ -7,14 +7,22 @@ from fastapi import (
     Query,
 )
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func, desc
+from sqlalchemy import or_, and_, case, func, desc
+from typing import List, Optional
 from datetime import datetime
-from typing import List
 
 from database import get_db
 from models import User, Conversation, Message
 from auth import get_current_user, SECRET_KEY, ALGORITHM
-from schemas import MessageCreate, MessageOut, ConversationOut, ConversationUserOut
+from timeutils import utcnow, to_iso, as_utc
+from schemas import (
+    MessageCreate,
+    MessageOut,
+    ConversationOut,
+    ConversationPageOut,
+    ConversationUserOut,
+)
+from services.conversation_summaries import record_message, mark_read
 from jose import JWTError, jwt
 
 router = APIRouter()
@@ -34,60 +42,90 @@ def get_conversation_for_user(conv_id: int, user_id: int, db: Session) -> Conver
 
 
 # ── GET /conversations ───────────────────────────────────────────────
-@router.get("/conversations", response_model=List[ConversationOut])
+INBOX_PAGE_SIZE = 30
+
+
+def _encode_inbox_cursor(conv: Conversation) -> str:
+    return f"{to_iso(conv.last_message_at)}_{conv.id}"
+
+
+def _decode_inbox_cursor(cursor: str) -> tuple:
+    try:
+        at, conv_id = cursor.rsplit("_", 1)
+        return as_utc(datetime.fromisoformat(at)), int(conv_id)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+
+@router.get("/conversations", response_model=ConversationPageOut)
 def get_conversations(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    limit: int = Query(INBOX_PAGE_SIZE, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
-    convs = (
-        db.query(Conversation)
-        .filter(
+    # One query: the summary columns on Conversation joined to the other user,
+    # newest first (ix_conversations_user1_last / ix_conversations_user2_last)
+    is_user1 = Conversation.user1_id == current_user.id
+    other_id = case((is_user1, Conversation.user2_id), else_=Conversation.user1_id)
+    unread = case((is_user1, Conversation.user1_unread), else_=Conversation.user2_unread)
+    query = (
+        db.query(Conversation, User, unread)
+        .join(User, User.id == other_id)
+        .filter(or_(is_user1, Conversation.user2_id == current_user.id))
+    )
+    if cursor:
+        at, conv_id = _decode_inbox_cursor(cursor)
+        query = query.filter(
             or_(
-                Conversation.user1_id == current_user.id,
-                Conversation.user2_id == current_user.id,
+                Conversation.last_message_at < at,
+                and_(Conversation.last_message_at == at, Conversation.id < conv_id),
             )
         )
-        .order_by(desc(Conversation.updated_at))
+    rows = (
+        query.order_by(desc(Conversation.last_message_at), desc(Conversation.id))
+        .limit(limit + 1)
         .all()
     )
-
-    result = []
-    for c in convs:
-        other_id = c.user2_id if c.user1_id == current_user.id else c.user1_id
-        other_user = db.query(User).filter(User.id == other_id).first()
-        if not other_user:
-            continue
-
-        last_msg = (
-            db.query(Message)
-            .filter(Message.conversation_id == c.id)
-            .order_by(desc(Message.id))
-            .first()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    result = [
+        ConversationOut(
+            id=c.id,
+            other_user=ConversationUserOut(
+                id=other_user.id,
+                username=other_user.username,
+                avatar_url=other_user.avatar_url,
+            ),
+            last_message=c.last_message_preview,
+            last_message_time=to_iso(c.last_message_at) if c.last_message_id else None,
+            unread_count=unread_count or 0,
         )
+        for c, other_user, unread_count in rows
+    ]
+    return ConversationPageOut(
+        data=result,
+        nextCursor=_encode_inbox_cursor(rows[-1][0]) if has_more else None,
+    )
 
-        unread = (
-            db.query(func.count(Message.id))
-            .filter(
-                Message.conversation_id == c.id,
-                Message.sender_id != current_user.id,
-                not Message.read,
-            )
-            .scalar()
-        )
 
-        result.append(
-            ConversationOut(
-                id=c.id,
-                other_user=ConversationUserOut(
-                    id=other_user.id,
-                    username=other_user.username,
-                    avatar_url=other_user.avatar_url,
-                ),
-                last_message=last_msg.text if last_msg else None,
-                last_message_time=last_msg.created_at if last_msg else None,
-                unread_count=unread or 0,
+# ── GET /conversations/unread-count ──────────────────────────────────
+@router.get("/conversations/unread-count")
+def get_unread_count(
+    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+):
+    is_user1 = Conversation.user1_id == current_user.id
+    total = (
+        db.query(
+            func.sum(
+                case((is_user1, Conversation.user1_unread), else_=Conversation.user2_unread)
             )
         )
-    return result
+        .filter(or_(is_user1, Conversation.user2_id == current_user.id))
+        .scalar()
+    )
+    return {"unread_count": total or 0}
 
 
 # ── POST /conversations ──────────────────────────────────────────────
@@ -124,9 +162,13 @@ def create_conversation(
     if existing:
         return {"conversation_id": existing.id}
 
-    now = datetime.utcnow().isoformat()
+    now = utcnow()
     conv = Conversation(
-        user1_id=current_user.id, user2_id=user_id, created_at=now, updated_at=now
+        user1_id=current_user.id,
+        user2_id=user_id,
+        created_at=now,
+        updated_at=now,
+        last_message_at=now,
     )
     db.add(conv)
     db.commit()
@@ -169,7 +211,7 @@ async def send_message(
     if not msg.text or not msg.text.strip():
         raise HTTPException(400, "Message cannot be empty")
 
-    now = datetime.utcnow().isoformat()
+    now = utcnow()
     message = Message(
         conversation_id=conv.id,
         sender_id=current_user.id,
@@ -178,7 +220,8 @@ async def send_message(
         read=False,
     )
     db.add(message)
-    conv.updated_at = now
+    db.flush()
+    record_message(db, conv, message)
     db.commit()
     db.refresh(message)
 
@@ -196,7 +239,7 @@ async def send_message(
                         "id": message.id,
                         "text": message.text,
                         "sender_id": message.sender_id,
-                        "created_at": message.created_at,
+                        "created_at": to_iso(message.created_at),
                         "read": message.read,
                     },
                 }
@@ -230,11 +273,7 @@ def mark_as_read(
 ):
     conv = get_conversation_for_user(conv_id, current_user.id, db)
 
-    db.query(Message).filter(
-        Message.conversation_id == conv.id,
-        Message.sender_id != current_user.id,
-        not Message.read,
-    ).update({"read": True})
+    mark_read(db, conv, current_user.id)
     db.commit()
     return {"status": "ok"}
 
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import Notification, User, Recipe
 from auth import get_current_user
+from timeutils import to_iso
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -49,7 +50,7 @@ def get_notifications(
                 id=n.id,
                 type=n.type,
                 read=n.read,
-                created_at=n.created_at,
+                created_at=to_iso(n.created_at),
                 sender_name=sender.username if sender else "Unknown",
                 sender_avatar=sender.avatar_url if sender else None,
                 post_id=n.post_id,
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+import hashlib
 import os
 
 from database import get_db
@@ -13,16 +14,67 @@ from models import (
     CommentLike,
     Collection,
     SavedRecipe,
-    Follow,
     Notification,
+    RecipeScore,
+    FeedInboxEntry,
+    RecipeNeighbor,
+    RecipeNeighborState,
+)
+from schemas import (
+    RecipeCreate,
+    RecipeUpdate,
+    CommentCreate,
+    CollectionCreate,
+    ExtractInfoRequest,
+    ViewEventBatch,
 )
-from schemas import RecipeCreate, RecipeUpdate, CommentCreate, CollectionCreate, ExtractInfoRequest
 import asyncio
 from auth import get_current_user
+from timeutils import as_utc, utcnow, to_iso
+from services.engagement_counters import bump_counter
+from services.recipe_cards import (
+    apply_viewer_flags,
+    build_recipe_cards,
+    hydrate_recipe_cards,
+)
+from services.result_cache import bump_recipe_versions, result_cache
+from services.view_counter import view_buffer
+from services.following_inbox import fan_out_recipe_job, read_following_feed
+from services.feed_sessions import (
+    FEED_SNAPSHOT_SIZE,
+    feed_sessions,
+    encode_cursor,
+    decode_cursor,
+)
 
 router = APIRouter()
 
-from algorithms.feed_logic import get_feed_with_edge_rank
+from algorithms.feed_logic import rank_feed
+from algorithms.edge_rank_scores import upsert_recipe_score
+from algorithms.trending import trending_engine
+from algorithms.recommendation import train_user_model
+from algorithms.item_similarity import mark_interactions_changed, similar_recipe_ids
+from algorithms.contextual_pairing import get_contextual_suggestions
+from algorithms.related_recipes import get_related_recipes
+from algorithms.near_duplicates import (
+    SIGNATURE_FIELDS,
+    forget_recipe_signature,
+    register_recipe_signature,
+    resign_recipe,
+)
+from algorithms.ingredient_coverage import (
+    COOK_WITH_MAX_INGREDIENTS,
+    cook_with,
+    missing_ingredients,
+    normalize_ingredient,
+)
+from services.recipe_tags import (
+    sync_recipe_tags,
+    delete_recipe_tags,
+    normalize_tag,
+    recipe_ids_for_tags,
+)
+from services.recipe_indexes import INDEXED_FIELDS, index_recipe, unindex_recipe
 
 
 @router.get("/feed")
@@ -31,91 +83,53 @@ def get_feed(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    cursor_score = None
-    cursor_id = None
-    if cursor and "_" in cursor:
-        try:
-            parts = cursor.split("_")
-            cursor_score = float(parts[0])
-            cursor_id = int(parts[1])
-        except ValueError:
-            pass
-
-    # Get recipes using the Edge Rank algorithm
-    ranked_recipes = get_feed_with_edge_rank(
-        db=db,
-        current_user_id=current_user.id,
-        cursor_score=cursor_score,
-        cursor_id=cursor_id,
-        limit=10,
-    )
+    page_size = 10
+
+    # Continue an existing feed session if the cursor points to a live snapshot
+    snapshot_id, offset, entries = None, 0, None
+    decoded = decode_cursor(cursor) if cursor else None
+    if decoded:
+        snapshot_id, offset = decoded
+        entries = feed_sessions.load(current_user.id, snapshot_id)
+
+    if entries is None:
+        # New session (or expired snapshot): rank once with the Edge Rank algorithm
+        entries = rank_feed(db, current_user.id, limit=FEED_SNAPSHOT_SIZE)
+        snapshot_id = feed_sessions.create(current_user.id, entries)
+        offset = 0
+
+    page = entries[offset : offset + page_size]
+    recipes = {
+        r.id: r
+        for r in db.query(Recipe).filter(Recipe.id.in_([rid for rid, _ in page]))
+    }
+    page = [(recipes[rid], score) for rid, score in page if rid in recipes]
 
-    results = []
-    for r, score in ranked_recipes:
-        owner = db.query(User).filter(User.id == r.owner_id).first()
-        chef_display = owner.display_name if owner else "Unknown"
-        owner_avatar = owner.avatar_url if owner else None
-
-        # We can still count likes and comments for the response,
-        # or we could optimize by returning them from the query,
-        # but for simplicity we keep the existing response format
-        count = db.query(Like).filter(Like.recipe_id == r.id).count()
-        comment_count = db.query(Comment).filter(Comment.recipe_id == r.id).count()
-        my_like = (
-            db.query(Like)
-            .filter(Like.recipe_id == r.id, Like.user_id == current_user.id)
-            .first()
-        )
-        # Check ob das Rezept IRGENDWO gespeichert ist
-        my_save = (
-            db.query(SavedRecipe)
-            .filter(
-                SavedRecipe.recipe_id == r.id, SavedRecipe.user_id == current_user.id
-            )
-            .first()
-        )
-        # Check ob ich dem Owner folge
-        i_follow = (
-            db.query(Follow)
-            .filter(
-                Follow.follower_id == current_user.id, Follow.following_id == r.owner_id
-            )
-            .first()
-            is not None
-            if r.owner_id != current_user.id
-            else False
-        )
-        results.append(
-            {
-                "id": r.id,
-                "title": r.title,
-                "video_url": r.video_url,
-                "chef": chef_display,
-                "owner_id": r.owner_id,
-                "owner_avatar_url": owner_avatar,
-                "ingredients": r.ingredients,
-                "steps": r.steps,
-                "tags": r.tags,
-                "tips": r.tips,
-                "likes_count": count,
-                "i_liked_it": my_like is not None,
-                "comments_count": comment_count,
-                "i_saved_it": my_save is not None,
-                "is_mine": (r.owner_id == current_user.id),
-                "i_follow_owner": i_follow,
-                "created_at": r.created_at,
-                "views": r.views,
-                "edge_rank_score": score,
-            }
-        )
+    results = hydrate_recipe_cards(db, [r for r, _ in page], current_user)
+    for card, (_, score) in zip(results, page):
+        card["edge_rank_score"] = score
+    next_offset = offset + page_size
     nextCursor = (
-        f"{ranked_recipes[-1][1]}_{ranked_recipes[-1][0].id}"
-        if ranked_recipes
-        else None
+        encode_cursor(snapshot_id, next_offset) if next_offset < len(entries) else None
     )
     return {"data": results, "nextCursor": nextCursor}
 
 
+@router.get("/feed/following")
+def get_following_feed(
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Newest uploads of followed creators, read from the fan-out inbox
+    page_size = 10
+    ids = read_following_feed(db, current_user.id, cursor_id=cursor, limit=page_size)
+    recipes = {r.id: r for r in db.query(Recipe).filter(Recipe.id.in_(ids))}
+    page = [recipes[rid] for rid in ids if rid in recipes]
+    nextCursor = str(ids[-1]) if len(ids) == page_size else None
+    return {"data": hydrate_recipe_cards(db, page, current_user), "nextCursor": nextCursor}
+
+
 @router.get("/my-saved-videos/all")
 def get_all_saved_videos(
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
@@ -169,11 +183,17 @@ def toggle_global_save(
         # Wenn schon gespeichert -> LÖSCHEN (Entmerken)
         for e in existing:
             db.delete(e)
+        bump_counter(db, recipe_id, Recipe.saves_count, -len(existing))
+        mark_interactions_changed(db, [recipe_id])
+        train_user_model(db, user.id, recipe_id, "save", undo=True)
         db.commit()
         return {"saved": False}
     else:
         # Wenn nicht gespeichert -> Speichern (Default: Collection NULL)
         db.add(SavedRecipe(user_id=user.id, recipe_id=recipe_id, collection_id=None))
+        bump_counter(db, recipe_id, Recipe.saves_count, 1)
+        mark_interactions_changed(db, [recipe_id])
+        train_user_model(db, user.id, recipe_id, "save")
         db.commit()
         return {"saved": True}
 
@@ -213,6 +233,9 @@ def toggle_collection_save(
 
     if existing:
         db.delete(existing)
+        bump_counter(db, recipe_id, Recipe.saves_count, -1)
+        mark_interactions_changed(db, [recipe_id])
+        train_user_model(db, user.id, recipe_id, "save", undo=True)
         active = False
     else:
         db.add(
@@ -220,6 +243,9 @@ def toggle_collection_save(
                 user_id=user.id, recipe_id=recipe_id, collection_id=collection_id
             )
         )
+        bump_counter(db, recipe_id, Recipe.saves_count, 1)
+        mark_interactions_changed(db, [recipe_id])
+        train_user_model(db, user.id, recipe_id, "save")
         active = True
 
     db.commit()
@@ -301,9 +327,15 @@ async def toggle_like(
     )
     if existing:
         db.delete(existing)
+        bump_counter(db, recipe_id, Recipe.likes_count, -1)
+        mark_interactions_changed(db, [recipe_id])
+        train_user_model(db, user.id, recipe_id, "like", undo=True)
         db.commit()
     else:
         db.add(Like(user_id=user.id, recipe_id=recipe_id))
+        bump_counter(db, recipe_id, Recipe.likes_count, 1)
+        mark_interactions_changed(db, [recipe_id])
+        train_user_model(db, user.id, recipe_id, "like")
         recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
         if recipe and recipe.owner_id != user.id:
             db.add(
@@ -312,7 +344,7 @@ async def toggle_like(
                     sender_id=user.id,
                     type="like",
                     post_id=recipe_id,
-                    created_at=datetime.now().isoformat(),
+                    created_at=utcnow(),
                 )
             )
             db.commit()
@@ -329,69 +361,86 @@ async def toggle_like(
     return {"msg": "Ok"}
 
 
-@router.get("/recipes/{recipe_id}/comments")
-def get_comments(recipe_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    # Get all comments for this recipe
-    all_comments = (
-        db.query(Comment)
-        .filter(Comment.recipe_id == recipe_id)
-        .order_by(Comment.id.asc())
-        .all()
-    )
+COMMENT_PAGE_SIZE = 20
 
-    # Build user lookup
-    user_ids = set(c.user_id for c in all_comments)
-    users = (
-        {u.id: u for u in db.query(User).filter(User.id.in_(user_ids)).all()}
-        if user_ids
-        else {}
-    )
 
-    # Build likes lookup
-    comment_ids = set(c.id for c in all_comments)
-    likes_count = {}
-    i_liked = set()
-    if comment_ids:
-        likes = db.query(CommentLike).filter(CommentLike.comment_id.in_(comment_ids)).all()
-        for like in likes:
-            likes_count[like.comment_id] = likes_count.get(like.comment_id, 0) + 1
-            if like.user_id == current_user.id:
-                i_liked.add(like.comment_id)
-
-    def format_comment(c):
-        u = users.get(c.user_id)
-        return {
-            "id": c.id,
-            "text": c.text,
-            "username": u.display_name
-            if u and u.display_name
-            else (u.username if u else "Gast"),
-            "user_id": c.user_id,
-            "avatar": u.avatar_url if u else None,
-            "parent_id": c.parent_id,
-            "created_at": c.created_at,
-            "replies": [],
-            "likes_count": likes_count.get(c.id, 0),
-            "i_liked_it": c.id in i_liked
+def _comment_json(c: Comment, author: Optional[User], liked: bool) -> dict:
+    return {
+        "id": c.id,
+        "text": c.text,
+        "username": author.display_name
+        if author and author.display_name
+        else (author.username if author else "Gast"),
+        "user_id": c.user_id,
+        "avatar": author.avatar_url if author else None,
+        "parent_id": c.parent_id,
+        "created_at": to_iso(c.created_at),
+        # Loaded lazily via /comments/{id}/replies
+        "replies": [],
+        "replies_count": c.replies_count,
+        "likes_count": c.likes_count,
+        "i_liked_it": liked,
+    }
+
+
+def _comment_page(db: Session, query, viewer: User, limit: int) -> dict:
+    """One keyset page; authors and the viewer's likes only for its comments."""
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    ids = [c.id for c in rows]
+    authors = {}
+    liked = set()
+    if rows:
+        authors = {
+            u.id: u
+            for u in db.query(User).filter(User.id.in_({c.user_id for c in rows}))
+        }
+        liked = {
+            row.comment_id
+            for row in db.query(CommentLike.comment_id).filter(
+                CommentLike.user_id == viewer.id, CommentLike.comment_id.in_(ids)
+            )
         }
+    return {
+        "data": [_comment_json(c, authors.get(c.user_id), c.id in liked) for c in rows],
+        "nextCursor": str(rows[-1].id) if has_more else None,
+    }
 
-    # Separate top-level and replies
-    comment_map = {}
-    top_level = []
 
-    for c in all_comments:
-        formatted = format_comment(c)
-        comment_map[c.id] = formatted
-        if c.parent_id is None:
-            top_level.append(formatted)
-        else:
-            parent = comment_map.get(c.parent_id)
-            if parent:
-                parent["replies"].append(formatted)
+@router.get("/recipes/{recipe_id}/comments")
+def get_comments(
+    recipe_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(COMMENT_PAGE_SIZE, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Top-level comments, newest first; keyset on ix_comments_recipe_parent_id
+    query = db.query(Comment).filter(
+        Comment.recipe_id == recipe_id, Comment.parent_id.is_(None)
+    )
+    if cursor is not None:
+        query = query.filter(Comment.id < cursor)
+    return _comment_page(db, query.order_by(Comment.id.desc()), current_user, limit)
+
 
-    # Reverse so newest top-level comments are first
-    top_level.reverse()
-    return top_level
+@router.get("/recipes/{recipe_id}/comments/{comment_id}/replies")
+def get_comment_replies(
+    recipe_id: int,
+    comment_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(COMMENT_PAGE_SIZE, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Replies in posting order; keyset on ix_comments_parent_id
+    query = db.query(Comment).filter(
+        Comment.parent_id == comment_id, Comment.recipe_id == recipe_id
+    )
+    if cursor is not None:
+        query = query.filter(Comment.id > cursor)
+    return _comment_page(db, query.order_by(Comment.id.asc()), current_user, limit)
 
 
 @router.post("/recipes/{recipe_id}/comments/{comment_id}/like")
@@ -401,6 +450,13 @@ def toggle_comment_like(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
+    comment = (
+        db.query(Comment)
+        .filter(Comment.id == comment_id, Comment.recipe_id == recipe_id)
+        .first()
+    )
+    if not comment:
+        raise HTTPException(status_code=404, detail="Kommentar nicht gefunden")
     existing_like = (
         db.query(CommentLike)
         .filter(CommentLike.user_id == user.id, CommentLike.comment_id == comment_id)
@@ -409,20 +465,21 @@ def toggle_comment_like(
     
     if existing_like:
         db.delete(existing_like)
+        bump_counter(db, comment_id, Comment.likes_count, -1)
         db.commit()
         return {"liked": False}
     else:
         new_like = CommentLike(
             user_id=user.id,
             comment_id=comment_id,
-            created_at=datetime.now().isoformat()
+            created_at=utcnow(),
         )
         db.add(new_like)
+        bump_counter(db, comment_id, Comment.likes_count, 1)
         db.commit()
         
         # Optional: Notify the comment owner here
-        comment = db.query(Comment).filter(Comment.id == comment_id).first()
-        if comment and comment.user_id != user.id:
+        if comment.user_id != user.id:
             from services.push_service import create_and_send_notification
             create_and_send_notification(
                 db,
@@ -470,14 +527,29 @@ async def create_comment(
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
+    thread_id = None
+    if comment.parent_id:
+        parent = (
+            db.query(Comment)
+            .filter(Comment.id == comment.parent_id, Comment.recipe_id == recipe_id)
+            .first()
+        )
+        if not parent:
+            raise HTTPException(status_code=404, detail="Kommentar nicht gefunden")
+        # Threads are one level deep: a reply to a reply joins the top-level thread
+        thread_id = parent.parent_id or parent.id
     new_comment = Comment(
         text=comment.text,
         user_id=user.id,
         recipe_id=recipe_id,
-        parent_id=comment.parent_id,
-        created_at=datetime.now().isoformat(),
+        parent_id=thread_id,
+        created_at=utcnow(),
     )
     db.add(new_comment)
+    bump_counter(db, recipe_id, Recipe.comments_count, 1)
+    if thread_id:
+        bump_counter(db, thread_id, Comment.replies_count, 1)
+    train_user_model(db, user.id, recipe_id, "comment")
     recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
 
     # Notify recipe owner about comment (if not self)
@@ -488,7 +560,7 @@ async def create_comment(
                 sender_id=user.id,
                 type="comment",
                 post_id=recipe_id,
-                created_at=datetime.now().isoformat(),
+                created_at=utcnow(),
             )
         )
 
@@ -508,7 +580,7 @@ async def create_comment(
                     sender_id=user.id,
                     type="reply",
                     post_id=recipe_id,
-                    created_at=datetime.now().isoformat(),
+                    created_at=utcnow(),
                 )
             )
 
@@ -549,14 +621,18 @@ async def create_comment(
         "user_id": user.id,
         "avatar": user.avatar_url,
         "parent_id": new_comment.parent_id,
-        "created_at": new_comment.created_at,
+        "created_at": to_iso(new_comment.created_at),
         "replies": [],
+        "replies_count": 0,
+        "likes_count": 0,
+        "i_liked_it": False,
     }
 
 
 @router.post("/upload")
 def create_recipe(
     recipe: RecipeCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
@@ -569,10 +645,25 @@ def create_recipe(
         steps=recipe.steps,
         tags=recipe.tags,
         tips=recipe.tips,
-        created_at=datetime.now().isoformat(),
+        video_width=recipe.video_width,
+        video_height=recipe.video_height,
+        video_duration_ms=recipe.video_duration_ms,
+        created_at=utcnow(),
     )
     db.add(db_recipe)
+    db.flush()
+    # Flag re-uploads of an existing recipe (collapsed in feed ranking)
+    register_recipe_signature(db, db_recipe)
+    sync_recipe_tags(db, db_recipe)
+    # Score right away so the upload shows up in the feed before the next refresh
+    upsert_recipe_score(db, db_recipe)
     db.commit()
+    # Push into followers' "Following" inboxes after the response is sent
+    background_tasks.add_task(
+        fan_out_recipe_job, db.get_bind(), db_recipe.id, db_recipe.owner_id
+    )
+    index_recipe(db_recipe, created=True)
+    bump_recipe_versions(db_recipe.tags)
     return db_recipe
 
 
@@ -592,10 +683,20 @@ def update_recipe(
         )
 
     update_data = data.model_dump(exclude_unset=True)
+    old_tags = recipe.tags
     for field, value in update_data.items():
         setattr(recipe, field, value)
+    if update_data:
+        recipe.updated_at = utcnow()
+    if "tags" in update_data:
+        sync_recipe_tags(db, recipe)
+    if SIGNATURE_FIELDS & update_data.keys():
+        resign_recipe(db, recipe)
     db.commit()
     db.refresh(recipe)
+    if INDEXED_FIELDS & update_data.keys():
+        index_recipe(recipe)
+    bump_recipe_versions(old_tags, recipe.tags)
 
     return {
         "id": recipe.id,
@@ -606,7 +707,7 @@ def update_recipe(
         "tags": recipe.tags,
         "tips": recipe.tips,
         "owner_id": recipe.owner_id,
-        "created_at": recipe.created_at,
+        "created_at": to_iso(recipe.created_at),
         "views": recipe.views,
     }
 
@@ -622,205 +723,216 @@ def delete_recipe(
         raise HTTPException(403, "Fehler")
     if os.path.exists(recipe.video_url.lstrip("/")):
         os.remove(recipe.video_url.lstrip("/"))
+    db.query(RecipeScore).filter(RecipeScore.recipe_id == recipe.id).delete(
+        synchronize_session=False
+    )
+    db.query(FeedInboxEntry).filter(FeedInboxEntry.recipe_id == recipe.id).delete(
+        synchronize_session=False
+    )
+    db.query(RecipeNeighbor).filter(
+        (RecipeNeighbor.recipe_id == recipe.id) | (RecipeNeighbor.neighbor_id == recipe.id)
+    ).delete(synchronize_session=False)
+    db.query(RecipeNeighborState).filter(
+        RecipeNeighborState.recipe_id == recipe.id
+    ).delete(synchronize_session=False)
+    forget_recipe_signature(db, recipe.id)
+    delete_recipe_tags(db, recipe.id)
+    tags = recipe.tags
     db.delete(recipe)
     db.commit()
+    unindex_recipe(recipe_id)
+    bump_recipe_versions(tags)
     return {"msg": "Weg"}
 
 
-@router.get("/recipes/{recipe_id}")
-def get_single_recipe(
-    recipe_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.post("/recipes/views")
+def record_views(
+    batch: ViewEventBatch, current_user: User = Depends(get_current_user)
 ):
-    r = db.query(Recipe).filter(Recipe.id == recipe_id).first()
-    if not r:
-        raise HTTPException(status_code=404, detail="Rezept nicht gefunden")
-
-    owner = db.query(User).filter(User.id == r.owner_id).first()
-    chef_display = owner.display_name if owner else "Unknown"
-    owner_avatar = owner.avatar_url if owner else None
-    count = db.query(Like).filter(Like.recipe_id == r.id).count()
-    comment_count = db.query(Comment).filter(Comment.recipe_id == r.id).count()
-    my_like = (
-        db.query(Like)
-        .filter(Like.recipe_id == r.id, Like.user_id == current_user.id)
-        .first()
-    )
-    my_save = (
-        db.query(SavedRecipe)
-        .filter(
-            SavedRecipe.recipe_id == r.id, SavedRecipe.user_id == current_user.id
-        )
-        .first()
+    # Buffered only; services/view_counter flushes the counts in the background
+    accepted = view_buffer.record(
+        current_user.id, [(e.recipe_id, e.watched_ms) for e in batch.events]
     )
-    i_follow = (
-        db.query(Follow)
-        .filter(
-            Follow.follower_id == current_user.id, Follow.following_id == r.owner_id
-        )
-        .first()
-        is not None
-        if r.owner_id != current_user.id
-        else False
-    )
-
-    return {
-        "id": r.id,
-        "title": r.title,
-        "video_url": r.video_url,
-        "chef": chef_display,
-        "owner_id": r.owner_id,
-        "owner_avatar_url": owner_avatar,
-        "ingredients": r.ingredients,
-        "steps": r.steps,
-        "tags": r.tags,
-        "tips": r.tips,
-        "likes_count": count,
-        "i_liked_it": my_like is not None,
-        "comments_count": comment_count,
-        "i_saved_it": my_save is not None,
-        "is_mine": (r.owner_id == current_user.id),
-        "i_follow_owner": i_follow,
-        "created_at": r.created_at,
-        "views": r.views,
-    }
+    return {"accepted": accepted}
 
 
 @router.get("/recipes/trending")
 def get_trending_recipes(
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ):
-    # Standard query logic without full Edge Rank, descending by views (or likes if views not available).
-    # Since we added views to the model, we order by views.
-    recipes = (
-        db.query(Recipe)
-        .order_by(Recipe.views.desc().nullslast(), Recipe.created_at.desc())
-        .limit(15)
-        .all()
+    # Ranking is held in memory by algorithms/trending; the cards are cached
+    # per ranking, only the viewer flags hit the DB on a cache hit
+    ids = trending_engine.top_ids()
+
+    def load_cards():
+        recipes = {r.id: r for r in db.query(Recipe).filter(Recipe.id.in_(ids))}
+        return build_recipe_cards(db, [recipes[rid] for rid in ids if rid in recipes])
+
+    key = hashlib.blake2b(repr(ids).encode(), digest_size=16).hexdigest()
+    cards = result_cache.get_or_compute(
+        f"trending:{key}", ("recipes", "users"), load_cards
     )
+    return {"data": apply_viewer_flags(db, [dict(c) for c in cards], current_user)}
 
-    results = []
-    for r in recipes:
-        owner = db.query(User).filter(User.id == r.owner_id).first()
-        chef_display = owner.display_name if owner else "Unknown"
-        owner_avatar = owner.avatar_url if owner else None
-        count = db.query(Like).filter(Like.recipe_id == r.id).count()
-        comment_count = db.query(Comment).filter(Comment.recipe_id == r.id).count()
-        my_like = (
-            db.query(Like)
-            .filter(Like.recipe_id == r.id, Like.user_id == current_user.id)
-            .first()
-        )
-        my_save = (
-            db.query(SavedRecipe)
-            .filter(
-                SavedRecipe.recipe_id == r.id, SavedRecipe.user_id == current_user.id
-            )
-            .first()
-        )
-        i_follow = (
-            db.query(Follow)
-            .filter(
-                Follow.follower_id == current_user.id, Follow.following_id == r.owner_id
-            )
+
+@router.get("/recipes/because-you-liked")
+def get_because_you_liked(
+    recipe_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # Source: the given recipe, or the viewer's most recent like
+    if recipe_id is None:
+        last_like = (
+            db.query(Like.recipe_id)
+            .filter(Like.user_id == current_user.id)
+            .order_by(Like.created_at.desc(), Like.recipe_id.desc())
             .first()
-            is not None
-            if r.owner_id != current_user.id
-            else False
         )
+        if not last_like:
+            return {"source": None, "data": []}
+        recipe_id = last_like.recipe_id
+    source = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    if not source:
+        raise HTTPException(status_code=404, detail="Rezept nicht gefunden")
+
+    ids = similar_recipe_ids(db, [recipe_id], limit=20)
+    recipes = {r.id: r for r in db.query(Recipe).filter(Recipe.id.in_(ids))}
+    ordered = [recipes[rid] for rid in ids if rid in recipes]
+    return {
+        "source": {"id": source.id, "title": source.title},
+        "data": hydrate_recipe_cards(db, ordered, current_user),
+    }
+
+
+def _encode_tag_cursor(recipe: Recipe) -> str:
+    return f"{to_iso(recipe.created_at)}_{recipe.id}"
 
-        results.append(
-            {
-                "id": r.id,
-                "title": r.title,
-                "video_url": r.video_url,
-                "chef": chef_display,
-                "owner_id": r.owner_id,
-                "owner_avatar_url": owner_avatar,
-                "ingredients": r.ingredients,
-                "steps": r.steps,
-                "tags": r.tags,
-                "tips": r.tips,
-                "likes_count": count,
-                "i_liked_it": my_like is not None,
-                "comments_count": comment_count,
-                "i_saved_it": my_save is not None,
-                "is_mine": (r.owner_id == current_user.id),
-                "i_follow_owner": i_follow,
-                "created_at": r.created_at,
-                "views": r.views,
-            }
-        )
-    return {"data": results}
+
+def _decode_tag_cursor(cursor: str) -> tuple:
+    try:
+        at, recipe_id = cursor.rsplit("_", 1)
+        return as_utc(datetime.fromisoformat(at)), int(recipe_id)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
 
 
 @router.get("/recipes/tags/{tag}")
 def get_recipes_by_tag(
     tag: str,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    from sqlalchemy import cast, String
+    # Exact (case-insensitive) tag match; a range scan on ix_recipe_tags_tag_created
+    page_size = 20
+    # The cursor carries its own position, so it stays valid after that recipe
+    # is deleted or loses the tag
+    before = _decode_tag_cursor(cursor) if cursor is not None else None
+
+    def load_page():
+        ids = recipe_ids_for_tags(db, [tag], page_size, before=before)
+        recipes = {r.id: r for r in db.query(Recipe).filter(Recipe.id.in_(ids))}
+        page = [recipes[rid] for rid in ids if rid in recipes]
+        return {
+            "data": build_recipe_cards(db, page),
+            "nextCursor": (
+                _encode_tag_cursor(page[-1])
+                if len(ids) == page_size and page
+                else None
+            ),
+        }
 
-    recipes = (
-        db.query(Recipe)
-        .filter(cast(Recipe.tags, String).ilike(f"%{tag}%"))
-        .order_by(Recipe.created_at.desc())
-        .limit(20)
-        .all()
+    cached = result_cache.get_or_compute(
+        f"tag:{normalize_tag(tag)}:{cursor}",
+        (f"tag:{normalize_tag(tag)}", "users"),
+        load_page,
     )
+    return {
+        "data": apply_viewer_flags(db, [dict(c) for c in cached["data"]], current_user),
+        "nextCursor": cached["nextCursor"],
+    }
 
-    results = []
-    for r in recipes:
-        owner = db.query(User).filter(User.id == r.owner_id).first()
-        chef_display = owner.display_name if owner else "Unknown"
-        owner_avatar = owner.avatar_url if owner else None
-        count = db.query(Like).filter(Like.recipe_id == r.id).count()
-        comment_count = db.query(Comment).filter(Comment.recipe_id == r.id).count()
-        my_like = (
-            db.query(Like)
-            .filter(Like.recipe_id == r.id, Like.user_id == current_user.id)
-            .first()
-        )
-        my_save = (
-            db.query(SavedRecipe)
-            .filter(
-                SavedRecipe.recipe_id == r.id, SavedRecipe.user_id == current_user.id
-            )
-            .first()
-        )
-        i_follow = (
-            db.query(Follow)
-            .filter(
-                Follow.follower_id == current_user.id, Follow.following_id == r.owner_id
-            )
-            .first()
-            is not None
-            if r.owner_id != current_user.id
-            else False
-        )
 
-        results.append(
+@router.get("/recipes/cook-with")
+def get_recipes_cook_with(
+    ingredients: List[str] = Query(...),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    min_coverage: float = Query(0.0, ge=0.0, le=1.0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Recipes ranked by the share of their ingredients the user has."""
+    if len(ingredients) > COOK_WITH_MAX_INGREDIENTS:
+        raise HTTPException(status_code=400, detail="Zu viele Zutaten")
+    hits, total = cook_with(
+        db, ingredients, limit=limit, offset=offset, min_coverage=min_coverage
+    )
+    recipes = {
+        r.id: r for r in db.query(Recipe).filter(Recipe.id.in_([h[0] for h in hits]))
+    }
+    page = [(recipes[rid], coverage) for rid, coverage, _ in hits if rid in recipes]
+    cards = hydrate_recipe_cards(db, [r for r, _ in page], current_user)
+    have = {normalize_ingredient(i) for i in ingredients}
+    for card, (recipe, coverage) in zip(cards, page):
+        card["coverage"] = round(coverage, 4)
+        card["missing"] = missing_ingredients(recipe.ingredients, have)
+    next_offset = offset + limit if offset + limit < total else None
+    return {"data": cards, "total": total, "next_offset": next_offset}
+
+
+@router.get("/recipes/{recipe_id}/pairings")
+def get_recipe_pairings(
+    recipe_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not db.query(Recipe.id).filter(Recipe.id == recipe_id).first():
+        raise HTTPException(status_code=404, detail="Rezept nicht gefunden")
+    suggestions = get_contextual_suggestions(db, recipe_id, current_user.id)
+    ids = suggestions["recipe_ids"]
+    recipes = {r.id: r for r in db.query(Recipe).filter(Recipe.id.in_(ids))}
+    ordered = [recipes[rid] for rid in ids if rid in recipes]
+    return {
+        "pairings": [
             {
-                "id": r.id,
-                "title": r.title,
-                "video_url": r.video_url,
-                "chef": chef_display,
-                "owner_id": r.owner_id,
-                "owner_avatar_url": owner_avatar,
-                "ingredients": r.ingredients,
-                "steps": r.steps,
-                "tags": r.tags,
-                "tips": r.tips,
-                "likes_count": count,
-                "i_liked_it": my_like is not None,
-                "comments_count": comment_count,
-                "i_saved_it": my_save is not None,
-                "is_mine": (r.owner_id == current_user.id),
-                "i_follow_owner": i_follow,
-                "created_at": r.created_at,
-                "views": r.views,
+                "term": term.split(":", 1)[1],
+                "kind": "tag" if term.startswith("tag:") else "ingredient",
+                "score": round(score, 4),
             }
-        )
-    return {"data": results}
+            for term, score in suggestions["pairings"]
+        ],
+        "data": hydrate_recipe_cards(db, ordered, current_user),
+    }
+
+
+@router.get("/recipes/{recipe_id}/related")
+def get_related(
+    recipe_id: int,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not db.query(Recipe.id).filter(Recipe.id == recipe_id).first():
+        raise HTTPException(status_code=404, detail="Rezept nicht gefunden")
+    related = get_related_recipes(db, recipe_id, min(max(limit, 1), 50))
+    recipes = {
+        r.id: r for r in db.query(Recipe).filter(Recipe.id.in_([rid for rid, _ in related]))
+    }
+    ordered = [recipes[rid] for rid, _ in related if rid in recipes]
+    return {"data": hydrate_recipe_cards(db, ordered, current_user)}
+
+
+# Declared after the static /recipes/... routes so they are not shadowed
+@router.get("/recipes/{recipe_id}")
+def get_single_recipe(
+    recipe_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    r = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+    if not r:
+        raise HTTPException(status_code=404, detail="Rezept nicht gefunden")
+
+    return hydrate_recipe_cards(db, [r], current_user)[0]
@@ -1,63 +1,117 @@
-from fastapi import APIRouter, Depends
+import os
+
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 
 from database import get_db
 from models import User, Recipe
 from auth import get_current_user
+from algorithms.search_engine import search_index, search_recipes
+from algorithms.fulltext_search import fulltext_search, ilike_search
+from algorithms.autocomplete import AUTOCOMPLETE_LIMIT, autocomplete_index
+from services.result_cache import normalize_query, result_cache
 
 router = APIRouter()
 
+SEARCH_USER_LIMIT = 20
+
+# Recipe search backend: "index" = in-process BM25 index, "fulltext" = the
+# database's FTS (SQLite FTS5 / Postgres tsvector, picked by dialect),
+# "ilike" = title substring / exact tag match. All return the same response.
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "index")
+SEARCH_BACKENDS = {
+    "index": search_recipes,
+    "fulltext": fulltext_search,
+    "ilike": ilike_search,
+}
+
 
 @router.get("/search")
 def search(
     q: str,
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    if not q:
-        return {"users": [], "videos": []}
-
-    # Search Users
-    users = (
-        db.query(User)
-        .filter(or_(User.username.ilike(f"%{q}%"), User.display_name.ilike(f"%{q}%")))
-        .all()
+    q = normalize_query(q)
+    if not q.strip():
+        return {"users": [], "videos": [], "total": 0, "next_offset": None}
+    # Same response for every viewer: cached until a recipe or user changes
+    key = f"search:{SEARCH_BACKEND}:{limit}:{offset}:{q}"
+    if SEARCH_BACKEND == "index":
+        # Results of this worker's in-process index, as of its current state
+        key += f":{search_index.generation}"
+    return result_cache.get_or_compute(
+        key,
+        ("recipes", "users"),
+        lambda: _search_results(db, q, limit, offset),
     )
+
+
+def _search_results(db: Session, q: str, limit: int, offset: int) -> dict:
+    # Search Users (first page only)
     user_results = []
-    for u in users:
-        user_results.append(
-            {
-                "id": u.id,
-                "username": u.username,
-                "display_name": u.display_name,
-                "avatar_url": u.avatar_url,
-            }
+    if offset == 0:
+        term = q.strip()
+        users = (
+            db.query(User)
+            .filter(
+                or_(
+                    User.username.ilike(f"%{term}%"),
+                    User.display_name.ilike(f"%{term}%"),
+                )
+            )
+            .order_by(User.id)
+            .limit(SEARCH_USER_LIMIT)
+            .all()
         )
+        for u in users:
+            user_results.append(
+                {
+                    "id": u.id,
+                    "username": u.username,
+                    "display_name": u.display_name,
+                    "avatar_url": u.avatar_url,
+                }
+            )
 
-    # Search Recipes
-    # SQLite doesn't support JSON specific operators easily with SQLAlchemy in this setup,
-    # so we'll fetch all and filter in python or use simple text match on other fields.
-    # For now, let's search title and tags (as string match if possible, or just title)
-
-    # Simple Title Search
-    recipes = db.query(Recipe).filter(Recipe.title.ilike(f"%{q}%")).all()
-
-    # For tags, it's a bit harder with simple SQL on JSON.
-    # We can stick to Title for now or fetch all and filter (inefficient but works for small app).
-    # Let's stick to simple title search for efficiency.
-
-    video_results = []
-    for r in recipes:
-        video_results.append(
-            {
-                "id": r.id,
-                "title": r.title,
-                "video_url": r.video_url,  # Already full URL? No, needs prefix in frontend or backend.
-                # In other routers we return full URL or partial. Main.py/feed returned full?
-                # Let's check feed logic. Feed does: video_url: r.video_url
-                # Frontend adds BASE_URL.
-            }
+    # Search Recipes: ranked over title, tags, ingredients and chef
+    hits, total = SEARCH_BACKENDS[SEARCH_BACKEND](db, q, limit, offset)
+    recipes = {
+        r.id: r
+        for r in db.query(Recipe.id, Recipe.title, Recipe.video_url).filter(
+            Recipe.id.in_([rid for rid, _ in hits])
         )
+    }
+    video_results = [
+        {
+            "id": rid,
+            "title": recipes[rid].title,
+            # Relative path; the frontend adds BASE_URL
+            "video_url": recipes[rid].video_url,
+        }
+        for rid, _ in hits
+        if rid in recipes
+    ]
+
+    next_offset = offset + limit if offset + limit < total else None
+    return {
+        "users": user_results,
+        "videos": video_results,
+        "total": total,
+        "next_offset": next_offset,
+    }
 
-    return {"users": user_results, "videos": video_results}
+
+@router.get("/autocomplete")
+def autocomplete(
+    q: str,
+    limit: int = Query(AUTOCOMPLETE_LIMIT, ge=1, le=20),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    # In-memory prefix index; no database query once built
+    autocomplete_index.ensure_built(db)
+    return {"suggestions": autocomplete_index.suggest(q, limit)}
@@ -6,6 +6,14 @@ from database import get_db
 from models import User, Follow, Recipe, Like, Notification, SavedRecipe
 from datetime import datetime
 from auth import get_current_user
+from timeutils import utcnow
+from services.following_inbox import backfill_on_follow, remove_on_unfollow
+from services.recipe_indexes import unindex_recipe
+from algorithms.near_duplicates import forget_recipe_signature
+from algorithms.autocomplete import autocomplete_index
+from algorithms.item_similarity import mark_interactions_changed
+from services.recipe_tags import delete_recipe_tags
+from services.result_cache import bump_recipe_versions, bump_user_versions
 from pydantic import BaseModel
 
 
@@ -61,6 +69,10 @@ async def update_profile(
         avatar_url = await storage_manager.save_avatar(file, new_name)
         current_user.avatar_url = avatar_url
     db.commit()
+    autocomplete_index.update_user(
+        current_user.id, current_user.username, current_user.display_name
+    )
+    bump_user_versions()
     return {"msg": "Profil aktualisiert", "avatar_url": current_user.avatar_url}
 
 
@@ -82,21 +94,6 @@ def get_my_videos(
     )
     results = []
     for r in recipes:
-        count = db.query(Like).filter(Like.recipe_id == r.id).count()
-        # comment_count = db.query(Comment).filter(Comment.recipe_id == r.id).count() # optimize import if needed
-        # Just use verify logic or simplify. Let's keep it consistent.
-        # Need Comment model imported if using it.
-        # Let's import Comment inside or at top.
-        # Added Comment to imports.
-        pass
-
-    # Re-reading logic from main.py, it was calculating comment count.
-    # I need to import Comment model.
-    from models import Comment
-
-    for r in recipes:
-        count = db.query(Like).filter(Like.recipe_id == r.id).count()
-        comment_count = db.query(Comment).filter(Comment.recipe_id == r.id).count()
         results.append(
             {
                 "id": r.id,
@@ -108,9 +105,9 @@ def get_my_videos(
                 "steps": r.steps,
                 "tags": r.tags,
                 "tips": r.tips,
-                "likes_count": count,
+                "likes_count": r.likes_count,
                 "i_liked_it": False,
-                "comments_count": comment_count,
+                "comments_count": r.comments_count,
                 "i_saved_it": False,
                 "is_mine": True,
             }
@@ -146,16 +143,18 @@ async def toggle_follow(
     )
     if existing:
         db.delete(existing)
+        remove_on_unfollow(db, current_user.id, user_id)
         db.commit()
         return {"following": False}
     else:
         db.add(Follow(follower_id=current_user.id, following_id=user_id))
+        backfill_on_follow(db, current_user.id, user_id)
         # Notification create
         notif = Notification(
             recipient_id=user_id,
             sender_id=current_user.id,
             type="follow",
-            created_at=datetime.now().isoformat(),
+            created_at=utcnow(),
         )
         db.add(notif)
         db.commit()
@@ -194,13 +193,12 @@ def get_user_profile(
     )
     videos = []
     for r in recipes:
-        like_count = db.query(Like).filter(Like.recipe_id == r.id).count()
         videos.append(
             {
                 "id": r.id,
                 "title": r.title,
                 "video_url": r.video_url,
-                "likes_count": like_count,
+                "likes_count": r.likes_count,
                 "tags": r.tags,
                 "ingredients": r.ingredients,
                 "steps": r.steps,
@@ -309,6 +307,7 @@ async def delete_my_profile(
 ):
     from models import (
         Comment,
+        CommentLike,
         Collection,
         SharedCollection,
         ShoppingList,
@@ -317,9 +316,17 @@ async def delete_my_profile(
         Conversation,
         Message,
         PushToken,
+        RecipeScore,
+        FeedInboxEntry,
+        FanoutOnReadCreator,
+        UserInterestVector,
+        RecipeNeighbor,
+        RecipeNeighborState,
     )
     from services.storage_manager import storage_manager
-    from sqlalchemy import or_
+    from services.engagement_counters import subtract_grouped
+    from sqlalchemy import or_, func, select
+    from sqlalchemy.orm import aliased
 
     # 1. Avatar löschen
     if current_user.avatar_url:
@@ -341,11 +348,89 @@ async def delete_my_profile(
         )
     ).delete(synchronize_session=False)
 
+    # 3b. "Following"-Inbox (eigene und als Creator verteilte Einträge)
+    db.query(FeedInboxEntry).filter(
+        or_(
+            FeedInboxEntry.follower_id == current_user.id,
+            FeedInboxEntry.owner_id == current_user.id,
+        )
+    ).delete(synchronize_session=False)
+    db.query(FanoutOnReadCreator).filter(
+        FanoutOnReadCreator.user_id == current_user.id
+    ).delete(synchronize_session=False)
+    db.query(UserInterestVector).filter(
+        UserInterestVector.user_id == current_user.id
+    ).delete(synchronize_session=False)
+
     # 4. Likes, Comments, SavedRecipes (von fremden Videos) löschen
+    #    Zähler auf den betroffenen Rezepten vorher korrigieren
+    own_collection_ids = db.query(Collection.id).filter(
+        Collection.user_id == current_user.id
+    )
+    liked = (
+        db.query(Like.recipe_id, func.count())
+        .filter(Like.user_id == current_user.id)
+        .group_by(Like.recipe_id)
+        .all()
+    )
+    subtract_grouped(db, Recipe.likes_count, liked)
+    # Own comments plus other users' replies in threads the user started
+    thread, doomed = aliased(Comment), aliased(Comment)
+    doomed_comment_ids = select(doomed.id).where(
+        or_(
+            doomed.user_id == current_user.id,
+            doomed.parent_id.in_(
+                select(thread.id).where(thread.user_id == current_user.id)
+            ),
+        )
+    )
+    subtract_grouped(
+        db,
+        Recipe.comments_count,
+        db.query(Comment.recipe_id, func.count())
+        .filter(Comment.id.in_(doomed_comment_ids))
+        .group_by(Comment.recipe_id)
+        .all(),
+    )
+    saved = (
+        db.query(SavedRecipe.recipe_id, func.count())
+        .filter(
+            or_(
+                SavedRecipe.user_id == current_user.id,
+                SavedRecipe.collection_id.in_(own_collection_ids),
+            )
+        )
+        .group_by(SavedRecipe.recipe_id)
+        .all()
+    )
+    subtract_grouped(db, Recipe.saves_count, saved)
+    mark_interactions_changed(db, {rid for rid, _ in liked + saved})
+    subtract_grouped(
+        db,
+        Comment.likes_count,
+        db.query(CommentLike.comment_id, func.count())
+        .filter(CommentLike.user_id == current_user.id)
+        .group_by(CommentLike.comment_id)
+        .all(),
+    )
+    subtract_grouped(
+        db,
+        Comment.replies_count,
+        db.query(Comment.parent_id, func.count())
+        .filter(Comment.user_id == current_user.id, Comment.parent_id.isnot(None))
+        .group_by(Comment.parent_id)
+        .all(),
+    )
+    db.query(CommentLike).filter(
+        or_(
+            CommentLike.user_id == current_user.id,
+            CommentLike.comment_id.in_(doomed_comment_ids),
+        )
+    ).delete(synchronize_session=False)
     db.query(Like).filter(Like.user_id == current_user.id).delete(
         synchronize_session=False
     )
-    db.query(Comment).filter(Comment.user_id == current_user.id).delete(
+    db.query(Comment).filter(Comment.id.in_(doomed_comment_ids)).delete(
         synchronize_session=False
     )
     db.query(SavedRecipe).filter(SavedRecipe.user_id == current_user.id).delete(
@@ -406,17 +491,35 @@ async def delete_my_profile(
 
     # 8. Rezepte löschen
     my_recipes = db.query(Recipe).filter(Recipe.owner_id == current_user.id).all()
+    my_tags = [r.tags for r in my_recipes]
     for r in my_recipes:
         if r.video_url:
             await storage_manager.delete_file(r.video_url)
         db.query(Like).filter(Like.recipe_id == r.id).delete(synchronize_session=False)
+        db.query(CommentLike).filter(
+            CommentLike.comment_id.in_(
+                db.query(Comment.id).filter(Comment.recipe_id == r.id)
+            )
+        ).delete(synchronize_session=False)
         db.query(Comment).filter(Comment.recipe_id == r.id).delete(
             synchronize_session=False
         )
         db.query(SavedRecipe).filter(SavedRecipe.recipe_id == r.id).delete(
             synchronize_session=False
         )
+        db.query(RecipeScore).filter(RecipeScore.recipe_id == r.id).delete(
+            synchronize_session=False
+        )
+        db.query(RecipeNeighbor).filter(
+            or_(RecipeNeighbor.recipe_id == r.id, RecipeNeighbor.neighbor_id == r.id)
+        ).delete(synchronize_session=False)
+        db.query(RecipeNeighborState).filter(
+            RecipeNeighborState.recipe_id == r.id
+        ).delete(synchronize_session=False)
+        forget_recipe_signature(db, r.id)
+        delete_recipe_tags(db, r.id)
         db.delete(r)
+        unindex_recipe(r.id)
 
     # 9. PushTokens löschen
     db.query(PushToken).filter(PushToken.user_id == current_user.id).delete(
@@ -424,6 +527,10 @@ async def delete_my_profile(
     )
 
     # 10. User löschen
+    user_id = current_user.id
     db.delete(current_user)
     db.commit()
+    autocomplete_index.remove_user(user_id)
+    bump_recipe_versions(*my_tags)
+    bump_user_versions()
     return {"msg": "Account erfolgreich unwiderruflich gelöscht"}
@@ -1,5 +1,11 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field, PlainSerializer
+from typing import Annotated, List, Optional
+from datetime import datetime
+
+from timeutils import to_iso
+
+# DateTime columns keep serializing as the former ISO strings
+IsoDateTime = Annotated[datetime, PlainSerializer(to_iso, return_type=str)]
 
 
 class UserCreate(BaseModel):
@@ -26,6 +32,10 @@ class RecipeCreate(BaseModel):
     steps: List[dict]
     tags: List[str]
     tips: Optional[str] = None
+    # Optional video metadata from the client's picker (pixels / milliseconds)
+    video_width: Optional[int] = Field(None, gt=0)
+    video_height: Optional[int] = Field(None, gt=0)
+    video_duration_ms: Optional[int] = Field(None, gt=0)
 
 
 class RecipeUpdate(BaseModel):
@@ -54,6 +64,19 @@ class ExtractInfoRequest(BaseModel):
     tags: Optional[str] = None
 
 
+# Longer reports are bogus; also keeps watch_ms_total deltas far from overflow
+MAX_WATCHED_MS = 6 * 60 * 60 * 1000
+
+
+class ViewEvent(BaseModel):
+    recipe_id: int
+    watched_ms: int = Field(0, ge=0, le=MAX_WATCHED_MS)
+
+
+class ViewEventBatch(BaseModel):
+    events: List[ViewEvent] = Field(..., max_length=200)
+
+
 class CollectionCreate(BaseModel):
     name: str
 
@@ -66,7 +89,7 @@ class MessageOut(BaseModel):
     id: int
     text: str
     sender_id: int
-    created_at: str
+    created_at: IsoDateTime
     read: bool
 
     class Config:
@@ -85,3 +108,8 @@ class ConversationOut(BaseModel):
     last_message: Optional[str] = None
     last_message_time: Optional[str] = None
     unread_count: int = 0
+
+
+class ConversationPageOut(BaseModel):
+    data: List[ConversationOut]
+    nextCursor: Optional[str] = None
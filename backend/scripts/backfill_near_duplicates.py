@@ -0,0 +1,35 @@
+"""Compute near-duplicate signatures and flags for all existing recipes.
+
+New uploads are signed in create_recipe; run this once after deploying
+near-duplicate detection, after bulk imports, or when changing the MinHash
+or LSH parameters in algorithms/near_duplicates.py.
+
+Run from backend/:
+    python -m scripts.backfill_near_duplicates
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from database import SessionLocal
+from algorithms.near_duplicates import backfill_near_duplicates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        stats = backfill_near_duplicates(db)
+        db.commit()
+        print(f"Signed {stats['recipes']} recipes, {stats['duplicates']} near-duplicates")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Rebuild the item-item neighbour table (recipe_neighbors).
+
+The app refreshes recipes with new likes/saves periodically; use --full
+after bulk imports or when changing NEIGHBORS_TOP_K.
+
+Run from backend/:
+    python -m scripts.build_item_neighbors [--full]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from database import SessionLocal
+from algorithms.item_similarity import refresh_item_neighbors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--full", action="store_true", help="Recompute all recipes")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        refreshed = refresh_item_neighbors(db, full=args.full)
+        db.commit()
+        print(f"Computed neighbours for {refreshed} recipes")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Rebuild the denormalized like/save/comment counters on recipes.
+
+Run from backend/:
+    python -m scripts.rebuild_engagement_counters
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from database import SessionLocal
+from services.engagement_counters import rebuild_engagement_counters
+
+
+def main():
+    db = SessionLocal()
+    try:
+        updated = rebuild_engagement_counters(db)
+        db.commit()
+        print(f"Rebuilt engagement counters for {updated} recipes")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""Generate a synthetic dataset for performance work.
+
+Creates users, recipes with realistic ingredients/steps/tags JSON, power-law
+distributed likes, saves and comments, a follow graph, the matching
+"Following" inboxes and chat histories. Counters, quality and materialized
+scores and item neighbours are rebuilt at the end, so the data looks like a
+long-running production DB.
+
+Run from backend/ (uses DATABASE_URL, or --database-url):
+    python -m scripts.seed_dataset --users 2000 --recipes 20000
+"""
+
+import argparse
+import os
+import sys
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import Session
+
+from database import Base
+from migrations import run_auto_migrations
+from models import (
+    User,
+    Recipe,
+    Like,
+    SavedRecipe,
+    Comment,
+    Follow,
+    FeedInboxEntry,
+    Conversation,
+    Message,
+)
+from timeutils import utcnow
+
+SEED_PASSWORD = "benchmark"
+INSERT_CHUNK = 5000
+HISTORY_DAYS = 90
+
+INGREDIENTS = [
+    ("Nudeln", "g"), ("Tomaten", "Stk"), ("Knoblauch", "Zehe"), ("Zwiebel", "Stk"),
+    ("Olivenöl", "EL"), ("Parmesan", "g"), ("Basilikum", "Bund"), ("Sahne", "ml"),
+    ("Butter", "g"), ("Mehl", "g"), ("Eier", "Stk"), ("Milch", "ml"),
+    ("Zucker", "g"), ("Reis", "g"), ("Hähnchenbrust", "g"), ("Rinderhack", "g"),
+    ("Paprika", "Stk"), ("Zucchini", "Stk"), ("Kartoffeln", "g"), ("Karotten", "Stk"),
+    ("Spinat", "g"), ("Feta", "g"), ("Kichererbsen", "Dose"), ("Kokosmilch", "ml"),
+    ("Currypaste", "EL"), ("Ingwer", "cm"), ("Limette", "Stk"), ("Sojasauce", "EL"),
+    ("Lachs", "g"), ("Champignons", "g"), ("Mozzarella", "g"), ("Schmand", "g"),
+    ("Haferflocken", "g"), ("Bananen", "Stk"), ("Schokolade", "g"), ("Honig", "EL"),
+]
+TAGS = [
+    "Pasta", "Vegan", "Vegetarisch", "Schnell", "Low Carb", "Dessert", "Frühstück",
+    "Asiatisch", "Italienisch", "Grillen", "Meal Prep", "Suppe", "Salat", "Backen",
+    "Fleisch", "Fisch", "Günstig", "Familie", "Party", "Gesund",
+]
+DISHES = [
+    "Pasta", "Curry", "Bowl", "Auflauf", "Suppe", "Salat", "Pfanne", "Burger",
+    "Kuchen", "Pancakes", "Risotto", "Wrap", "Lasagne", "Gnocchi", "Eintopf",
+]
+ADJECTIVES = [
+    "Schnelle", "Cremige", "Würzige", "Omas", "Einfache", "Knusprige", "Leichte",
+    "Vegane", "Herbstliche", "Sommerliche", "Scharfe", "Beste",
+]
+STEP_TEMPLATES = [
+    "{a} waschen und klein schneiden.",
+    "{a} in einer Pfanne mit etwas Öl anbraten.",
+    "{a} und {b} hinzufügen und 5 Minuten köcheln lassen.",
+    "Mit Salz und Pfeffer abschmecken.",
+    "{a} im Ofen bei 180 °C backen.",
+    "Alles gut vermengen und servieren.",
+]
+CHAT_LINES = [
+    "Hast du das Rezept schon ausprobiert?",
+    "Sieht mega lecker aus!",
+    "Welche Nudeln nimmst du dafür?",
+    "Danke für den Tipp 😊",
+    "Kann man das auch vegan machen?",
+    "Morgen koche ich das nach.",
+]
+
+
+def _power_law_weights(rng, n: int, alpha: float = 1.1):
+    """Zipf-like popularity over a random permutation of 0..n-1."""
+    weights = 1.0 / np.power(np.arange(1, n + 1), alpha)
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _activity(rng, n: int, mean: float, cap: int):
+    """Per-user action counts with a heavy tail (few power users)."""
+    counts = (rng.pareto(1.5, n) + 1) * mean / 3
+    return np.minimum(counts.astype(int), cap)
+
+
+def _insert_chunked(db: Session, model, rows: list):
+    for i in range(0, len(rows), INSERT_CHUNK):
+        db.execute(insert(model), rows[i : i + INSERT_CHUNK])
+
+
+def _recipe_payload(rng):
+    picks = rng.choice(len(INGREDIENTS), size=int(rng.integers(3, 9)), replace=False)
+    ingredients = [
+        {
+            "name": INGREDIENTS[i][0],
+            "amount": str(int(rng.integers(1, 20)) * 25),
+            "unit": INGREDIENTS[i][1],
+        }
+        for i in picks
+    ]
+    names = [ing["name"] for ing in ingredients]
+    steps = [
+        {
+            "order": n + 1,
+            "instruction": STEP_TEMPLATES[int(rng.integers(len(STEP_TEMPLATES)))].format(
+                a=names[n % len(names)], b=names[(n + 1) % len(names)]
+            ),
+        }
+        for n in range(int(rng.integers(3, 8)))
+    ]
+    tags = [
+        TAGS[i] for i in rng.choice(len(TAGS), size=int(rng.integers(1, 5)), replace=False)
+    ]
+    title = (
+        f"{ADJECTIVES[int(rng.integers(len(ADJECTIVES)))]} "
+        f"{names[0]}-{DISHES[int(rng.integers(len(DISHES)))]}"
+    )
+    return title, ingredients, steps, tags
+
+
+def _sync_sequences(db: Session, tables):
+    """Explicit ids bypass Postgres sequences; move them past the seeded rows."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in tables:
+        db.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            )
+        )
+
+
+def seed_dataset(
+    engine,
+    users: int = 1000,
+    recipes: int = 10000,
+    follows_per_user: float = 30,
+    likes_per_user: float = 60,
+    conversations: int = 500,
+    seed: int = 42,
+) -> dict:
+    """Populate an empty database. Returns row counts per table."""
+    from auth import get_password_hash
+    from services.engagement_counters import rebuild_engagement_counters
+    from services.conversation_summaries import rebuild_conversation_summaries
+    from algorithms.edge_rank_scores import refresh_recipe_scores
+    from algorithms.item_similarity import refresh_item_neighbors
+    from algorithms.quality_score import refresh_quality_scores
+    from algorithms.near_duplicates import backfill_near_duplicates
+    from services.recipe_tags import backfill_recipe_tags
+
+    rng = np.random.default_rng(seed)
+    Base.metadata.create_all(bind=engine)
+    run_auto_migrations(engine)
+    now = utcnow()
+    stats = {}
+
+    with Session(engine) as db:
+        if db.query(User.id).first() is not None:
+            raise SystemExit("Database is not empty; seed into a fresh database")
+
+        hashed = get_password_hash(SEED_PASSWORD)
+        _insert_chunked(
+            db,
+            User,
+            [
+                {
+                    "id": u,
+                    "username": f"user{u}",
+                    "email": f"user{u}@example.com",
+                    "hashed_password": hashed,
+                    "age": int(rng.integers(16, 70)),
+                    "display_name": f"User {u}",
+                    "is_verified": True,
+                }
+                for u in range(1, users + 1)
+            ],
+        )
+        stats["users"] = users
+
+        # Creators follow a power law too: a few chefs upload most recipes
+        creator_p = _power_law_weights(rng, users, alpha=0.9)
+        owners = rng.choice(users, size=recipes, p=creator_p) + 1
+        ages = np.sort(rng.uniform(0, HISTORY_DAYS * 24, recipes))[::-1]
+        rows = []
+        for r in range(recipes):
+            title, ingredients, steps, tags = _recipe_payload(rng)
+            rows.append(
+                {
+                    "id": r + 1,
+                    "title": title,
+                    "video_url": f"/static/videos/seed_{r + 1}.mp4",
+                    "chef": f"user{owners[r]}",
+                    "owner_id": int(owners[r]),
+                    "ingredients": ingredients,
+                    "steps": steps,
+                    "tags": tags,
+                    "tips": None,
+                    "views": int(rng.pareto(1.2) * 200),
+                    "created_at": now - timedelta(hours=float(ages[r])),
+                }
+            )
+        _insert_chunked(db, Recipe, rows)
+        stats["recipes"] = recipes
+
+        popularity = _power_law_weights(rng, recipes)
+        recipe_ids = np.arange(1, recipes + 1)
+
+        def pick(k):
+            return rng.choice(recipe_ids, size=min(k, recipes), replace=False, p=popularity)
+
+        likes, saves, comments = [], [], []
+        for u, k in enumerate(_activity(rng, users, likes_per_user, recipes // 2), 1):
+            liked = pick(k)
+            likes.extend({"user_id": u, "recipe_id": int(rid)} for rid in liked)
+            saves.extend(
+                {"user_id": u, "recipe_id": int(rid), "collection_id": None}
+                for rid in liked[: k // 4]
+            )
+            for rid in pick(k // 5):
+                comments.append(
+                    {
+                        "text": "Sehr lecker, danke fürs Teilen!",
+                        "user_id": u,
+                        "recipe_id": int(rid),
+                        "created_at": now - timedelta(hours=float(rng.uniform(0, 72))),
+                    }
+                )
+        _insert_chunked(db, Like, likes)
+        _insert_chunked(db, SavedRecipe, saves)
+        _insert_chunked(db, Comment, comments)
+        stats.update(likes=len(likes), saved_recipes=len(saves), comments=len(comments))
+
+        follows = set()
+        for u, k in enumerate(_activity(rng, users, follows_per_user, users - 1), 1):
+            for target in rng.choice(users, size=k, replace=False, p=creator_p) + 1:
+                if int(target) != u:
+                    follows.add((u, int(target)))
+        _insert_chunked(
+            db, Follow, [{"follower_id": a, "following_id": b} for a, b in follows]
+        )
+        stats["follows"] = len(follows)
+
+        # Following inboxes as fan-out-on-write would have produced them
+        db.execute(
+            insert(FeedInboxEntry).from_select(
+                ["follower_id", "recipe_id", "owner_id"],
+                select(Follow.follower_id, Recipe.id, Recipe.owner_id).join(
+                    Recipe, Recipe.owner_id == Follow.following_id
+                ),
+            )
+        )
+
+        messages = []
+        pairs = {
+            tuple(sorted(int(x) + 1 for x in rng.choice(users, size=2, replace=False)))
+            for _ in range(conversations)
+        }
+        conversation_rows = []
+        for c, (a, b) in enumerate(sorted(pairs), 1):
+            started = now - timedelta(hours=float(rng.uniform(1, HISTORY_DAYS * 24)))
+            n = int(rng.integers(1, 40))
+            offsets = np.sort(rng.uniform(0, (now - started).total_seconds(), n))
+            for i, offset in enumerate(offsets):
+                messages.append(
+                    {
+                        "conversation_id": c,
+                        "sender_id": a if rng.random() < 0.5 else b,
+                        "text": CHAT_LINES[i % len(CHAT_LINES)],
+                        "created_at": started + timedelta(seconds=float(offset)),
+                        "read": i < n - 2,
+                    }
+                )
+            conversation_rows.append(
+                {
+                    "id": c,
+                    "user1_id": a,
+                    "user2_id": b,
+                    "created_at": started,
+                    "updated_at": messages[-1]["created_at"],
+                }
+            )
+        _insert_chunked(db, Conversation, conversation_rows)
+        _insert_chunked(db, Message, messages)
+        stats.update(conversations=len(conversation_rows), messages=len(messages))
+
+        _sync_sequences(db, ["users", "recipes", "conversations"])
+        rebuild_engagement_counters(db)
+        rebuild_conversation_summaries(db)
+        refresh_quality_scores(db)
+        refresh_recipe_scores(db)
+        refresh_item_neighbors(db, full=True)
+        backfill_near_duplicates(db)
+        backfill_recipe_tags(db)
+        db.commit()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
+    )
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--recipes", type=int, default=10000)
+    parser.add_argument("--follows-per-user", type=float, default=30)
+    parser.add_argument("--likes-per-user", type=float, default=60)
+    parser.add_argument("--conversations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    stats = seed_dataset(
+        engine,
+        users=args.users,
+        recipes=args.recipes,
+        follows_per_user=args.follows_per_user,
+        likes_per_user=args.likes_per_user,
+        conversations=args.conversations,
+        seed=args.seed,
+    )
+    for table, n in stats.items():
+        print(f"{table}: {n}")
+    print(f"Password for all users: {SEED_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(interval_seconds: float, job, run_immediately=False):
+    """Run a blocking `job` in a worker thread every `interval_seconds`."""
+    if not run_immediately:
+        await asyncio.sleep(interval_seconds)
+    while True:
+        try:
+            await asyncio.to_thread(job)
+        except Exception as e:
+            logger.error(f"Background job {job.__name__} failed: {e}")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,160 @@
+"""Pluggable key/value cache backends.
+
+InMemoryLRUCache is the default (per worker). RedisCache works with any
+client exposing get/set(ex=, nx=)/delete/incr, e.g. redis.Redis or a test
+fake. Values must be JSON-serializable. Both also keep integer counters
+(counter/incr) that are never evicted or expired with the cached values.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class InMemoryLRUCache:
+    def __init__(
+        self, max_entries: int = 1000, default_ttl: int = 600, max_bytes: int = None
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        # Optional budget on the JSON size of keys + values
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (expires_at, value, size)
+        self._bytes = 0
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _pop_locked(self, key: str):
+        self._bytes -= self._data.pop(key)[2]
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= time.monotonic():
+                self._pop_locked(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def _size(self, key: str, value) -> int:
+        return len(key) + len(json.dumps(value)) if self.max_bytes else 0
+
+    def _set_locked(self, key: str, value, ttl: int, size: int):
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        if key in self._data:
+            self._pop_locked(key)
+        if self.max_bytes and size > self.max_bytes:
+            return
+        self._data[key] = (expires_at, value, size)
+        self._bytes += size
+        while len(self._data) > self.max_entries or (
+            self.max_bytes and self._bytes > self.max_bytes
+        ):
+            # Least recently used first
+            self._pop_locked(next(iter(self._data)))
+
+    def set(self, key: str, value, ttl: int = None):
+        size = self._size(key, value)
+        with self._lock:
+            self._set_locked(key, value, ttl, size)
+
+    def add(self, key: str, value, ttl: int = None) -> bool:
+        """Set key only if it is absent (or expired); True if it was set."""
+        size = self._size(key, value)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._set_locked(key, value, ttl, size)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._data:
+                self._pop_locked(key)
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._counters[key] = self._counters.get(key, 0) + 1
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+            self._bytes = 0
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    def __init__(self, client, prefix: str = "rezepttok:", default_ttl: int = 600):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    def set(self, key: str, value, ttl: int = None):
+        self.client.set(
+            self.prefix + key, json.dumps(value), ex=ttl or self.default_ttl
+        )
+
+    def add(self, key: str, value, ttl: int = None) -> bool:
+        return bool(
+            self.client.set(
+                self.prefix + key,
+                json.dumps(value),
+                ex=ttl or self.default_ttl,
+                nx=True,
+            )
+        )
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def counter(self, key: str) -> int:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            # Start unseen (or evicted) counters at a fresh value, never at one
+            # that was handed out before
+            self.client.set(self.prefix + key, time.time_ns(), nx=True)
+            raw = self.client.get(self.prefix + key)
+        return int(raw)
+
+    def incr(self, key: str) -> int:
+        self.counter(key)
+        return self.client.incr(self.prefix + key)
+
+
+def create_cache_backend(max_entries: int, default_ttl: int, max_bytes: int = None):
+    """
+    CACHE_BACKEND=redis uses REDIS_URL, anything else stays in-process. With
+    Redis the memory budget is the server's maxmemory, not max_bytes.
+    """
+    if os.getenv("CACHE_BACKEND", "memory") == "redis":
+        import redis
+
+        client = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"))
+        return RedisCache(client, default_ttl=default_ttl)
+    return InMemoryLRUCache(
+        max_entries=max_entries, default_ttl=default_ttl, max_bytes=max_bytes
+    )
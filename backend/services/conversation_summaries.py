@@ -0,0 +1,100 @@
+"""Denormalized inbox summary on Conversation.
+
+last_message_id, last_message_preview and last_message_at describe the newest
+message; user1_unread / user2_unread count the messages each participant has
+not read yet. GET /conversations reads them in one query instead of looking up
+the last message and unread count per conversation. send_message and
+mark_as_read keep them current in the same transaction;
+rebuild_conversation_summaries recomputes them from the messages table.
+"""
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from models import Conversation, Message
+from services.engagement_counters import bump_counter
+
+PREVIEW_LENGTH = 200
+
+
+def unread_column(conv: Conversation, user_id: int):
+    """The unread counter of user_id's side of conv."""
+    if conv.user1_id == user_id:
+        return Conversation.user1_unread
+    return Conversation.user2_unread
+
+
+def record_message(db: Session, conv: Conversation, message: Message):
+    """After a flushed message was added to conv. Caller commits."""
+    recipient_id = conv.user2_id if conv.user1_id == message.sender_id else conv.user1_id
+    bump_counter(db, conv.id, unread_column(conv, recipient_id), 1)
+    # Guarded, so a slower concurrent send cannot replace a newer last message
+    db.query(Conversation).filter(
+        Conversation.id == conv.id,
+        or_(
+            Conversation.last_message_id.is_(None),
+            Conversation.last_message_id < message.id,
+        ),
+    ).update(
+        {
+            Conversation.last_message_id: message.id,
+            Conversation.last_message_preview: message.text[:PREVIEW_LENGTH],
+            Conversation.last_message_at: message.created_at,
+            Conversation.updated_at: message.created_at,
+        },
+        synchronize_session=False,
+    )
+
+
+def mark_read(db: Session, conv: Conversation, user_id: int) -> int:
+    """Mark the other participant's messages read for user_id. Caller commits."""
+    n = (
+        db.query(Message)
+        .filter(
+            Message.conversation_id == conv.id,
+            Message.sender_id != user_id,
+            Message.read.is_(False),
+        )
+        .update({Message.read: True}, synchronize_session=False)
+    )
+    bump_counter(db, conv.id, unread_column(conv, user_id), -n)
+    return n
+
+
+def rebuild_conversation_summaries(db: Session) -> int:
+    """Recompute all summaries from the messages table. Caller commits."""
+
+    def unread(reader_id):
+        return (
+            select(func.count(Message.id))
+            .where(
+                Message.conversation_id == Conversation.id,
+                Message.sender_id != reader_id,
+                Message.read.is_(False),
+            )
+            .scalar_subquery()
+        )
+
+    db.query(Conversation).update(
+        {
+            Conversation.last_message_id: select(func.max(Message.id))
+            .where(Message.conversation_id == Conversation.id)
+            .scalar_subquery(),
+            Conversation.user1_unread: unread(Conversation.user1_id),
+            Conversation.user2_unread: unread(Conversation.user2_id),
+        },
+        synchronize_session=False,
+    )
+    last = select(Message).where(Message.id == Conversation.last_message_id)
+    return db.query(Conversation).update(
+        {
+            Conversation.last_message_preview: last.with_only_columns(
+                func.substr(Message.text, 1, PREVIEW_LENGTH)
+            ).scalar_subquery(),
+            Conversation.last_message_at: func.coalesce(
+                last.with_only_columns(Message.created_at).scalar_subquery(),
+                Conversation.created_at,
+            ),
+        },
+        synchronize_session=False,
+    )
@@ -0,0 +1,74 @@
+"""Denormalized engagement counters on Recipe and Comment.
+
+Recipe.likes_count, saves_count and comments_count mirror COUNT(*) over the
+likes, saved_recipes and comments tables; Comment.likes_count and
+replies_count mirror comment_likes and a comment's replies. Writers adjust
+them inside the same transaction as the row they insert or delete;
+rebuild_engagement_counters / rebuild_comment_counters repair drift from the
+source tables.
+"""
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+
+from models import Recipe, Like, SavedRecipe, Comment, CommentLike
+
+
+def bump_counter(db: Session, row_id: int, column, delta: int = 1):
+    """Atomically add `delta` to one counter column (e.g. Recipe.likes_count)."""
+    if not delta:
+        return
+    model = column.class_
+    db.query(model).filter(model.id == row_id).update(
+        {column: column + delta}, synchronize_session=False
+    )
+
+
+def subtract_grouped(db: Session, column, rows):
+    """Subtract per-row amounts given as (row_id, n) rows."""
+    for row_id, n in rows:
+        bump_counter(db, row_id, column, -n)
+
+
+def rebuild_engagement_counters(db: Session) -> int:
+    """Recompute all counters from the source tables. Caller commits."""
+    likes = (
+        select(func.count(Like.user_id))
+        .where(Like.recipe_id == Recipe.id)
+        .scalar_subquery()
+    )
+    saves = (
+        select(func.count(SavedRecipe.id))
+        .where(SavedRecipe.recipe_id == Recipe.id)
+        .scalar_subquery()
+    )
+    comments = (
+        select(func.count(Comment.id))
+        .where(Comment.recipe_id == Recipe.id)
+        .scalar_subquery()
+    )
+    return db.query(Recipe).update(
+        {
+            Recipe.likes_count: likes,
+            Recipe.saves_count: saves,
+            Recipe.comments_count: comments,
+        },
+        synchronize_session=False,
+    )
+
+
+def rebuild_comment_counters(db: Session) -> int:
+    """Recompute Comment.likes_count / replies_count. Caller commits."""
+    reply = aliased(Comment)
+    likes = (
+        select(func.count(CommentLike.user_id))
+        .where(CommentLike.comment_id == Comment.id)
+        .scalar_subquery()
+    )
+    replies = (
+        select(func.count(reply.id)).where(reply.parent_id == Comment.id).scalar_subquery()
+    )
+    return db.query(Comment).update(
+        {Comment.likes_count: likes, Comment.replies_count: replies},
+        synchronize_session=False,
+    )
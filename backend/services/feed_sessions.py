@@ -0,0 +1,64 @@
+"""Feed sessions: stable snapshots of a viewer's ranked feed.
+
+The first /feed request ranks the viewer's top FEED_SNAPSHOT_SIZE recipes once
+and stores the ordered ids; later pages are slices of that snapshot, so
+scores are not recomputed per page and pagination does not drift.
+"""
+
+import base64
+import os
+import uuid
+from typing import Optional
+
+from services.cache_backends import create_cache_backend
+
+FEED_SNAPSHOT_SIZE = int(os.getenv("FEED_SNAPSHOT_SIZE", "300"))
+FEED_SESSION_TTL = int(os.getenv("FEED_SESSION_TTL", "900"))
+FEED_SESSION_MAX_ENTRIES = int(os.getenv("FEED_SESSION_MAX_ENTRIES", "2000"))
+
+
+def encode_cursor(snapshot_id: str, offset: int) -> str:
+    raw = f"{snapshot_id}:{offset}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[tuple]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        snapshot_id, offset = base64.urlsafe_b64decode(padded).decode().split(":")
+        offset = int(offset)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if offset < 0:
+        return None
+    return snapshot_id, offset
+
+
+class FeedSessionStore:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _key(self, user_id: int, snapshot_id: str) -> str:
+        # Scoped per user so a cursor cannot read someone else's snapshot
+        return f"feed:{user_id}:{snapshot_id}"
+
+    def create(self, user_id: int, entries: list) -> str:
+        """Store [(recipe_id, score), ...] and return the snapshot id."""
+        snapshot_id = uuid.uuid4().hex
+        self.backend.set(
+            self._key(user_id, snapshot_id),
+            [[rid, score] for rid, score in entries],
+            ttl=FEED_SESSION_TTL,
+        )
+        return snapshot_id
+
+    def load(self, user_id: int, snapshot_id: str) -> Optional[list]:
+        entries = self.backend.get(self._key(user_id, snapshot_id))
+        if entries is None:
+            return None
+        return [(rid, score) for rid, score in entries]
+
+
+feed_sessions = FeedSessionStore(
+    create_cache_backend(FEED_SESSION_MAX_ENTRIES, FEED_SESSION_TTL)
+)
@@ -0,0 +1,176 @@
+"""Fan-out-on-write inbox for the "Following" feed.
+
+create_recipe pushes the new recipe id into feed_inbox for every follower of
+the creator, in batches. Creators with more than FANOUT_FOLLOWER_LIMIT
+followers skip fan-out and are recorded in fanout_on_read_creators; their
+followers pull those uploads on read instead. A creator who drops back below
+the limit leaves that table, after the latest uploads were copied into every
+follower's inbox. Inboxes keep the newest FEED_INBOX_SIZE entries.
+"""
+
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+from database import dialect_insert
+from models import Follow, Recipe, FeedInboxEntry, FanoutOnReadCreator
+
+logger = logging.getLogger(__name__)
+
+FANOUT_BATCH_SIZE = int(os.getenv("FANOUT_BATCH_SIZE", "1000"))
+FANOUT_FOLLOWER_LIMIT = int(os.getenv("FANOUT_FOLLOWER_LIMIT", "5000"))
+# How many recent uploads a new follower gets copied into their inbox
+FOLLOW_BACKFILL_SIZE = 20
+FEED_INBOX_SIZE = int(os.getenv("FEED_INBOX_SIZE", "1000"))
+
+
+def _trim_inboxes(db: Session, follower_ids: list):
+    """Drop entries beyond the newest FEED_INBOX_SIZE of each follower's inbox."""
+    newer = aliased(FeedInboxEntry)
+    oldest_kept = (
+        select(newer.recipe_id)
+        .where(newer.follower_id == FeedInboxEntry.follower_id)
+        .order_by(newer.recipe_id.desc())
+        .offset(FEED_INBOX_SIZE - 1)
+        .limit(1)
+        .scalar_subquery()
+    )
+    db.query(FeedInboxEntry).filter(
+        FeedInboxEntry.follower_id.in_(follower_ids),
+        FeedInboxEntry.recipe_id < oldest_kept,
+    ).delete(synchronize_session=False)
+
+
+def fan_out_recipe(db: Session, recipe_id: int, owner_id: int) -> int:
+    """
+    Write recipe_id into each follower's inbox. Commits per batch; entries a
+    concurrent follow already backfilled are skipped.
+    """
+    followers = db.query(Follow).filter(Follow.following_id == owner_id).count()
+    pulled = db.get(FanoutOnReadCreator, owner_id)
+    if followers > FANOUT_FOLLOWER_LIMIT:
+        if not pulled:
+            db.add(FanoutOnReadCreator(user_id=owner_id))
+            db.commit()
+        return 0
+
+    recipe_ids = [recipe_id]
+    if pulled:
+        # Followers pulled this creator's uploads on read so far
+        recipe_ids = [
+            row.id
+            for row in db.query(Recipe.id)
+            .filter(Recipe.owner_id == owner_id)
+            .order_by(Recipe.id.desc())
+            .limit(FOLLOW_BACKFILL_SIZE)
+        ]
+
+    written = 0
+    last_follower_id = 0
+    while True:
+        batch = [
+            row.follower_id
+            for row in db.query(Follow.follower_id)
+            .filter(
+                Follow.following_id == owner_id,
+                Follow.follower_id > last_follower_id,
+            )
+            .order_by(Follow.follower_id)
+            .limit(FANOUT_BATCH_SIZE)
+        ]
+        if not batch:
+            break
+        db.execute(
+            dialect_insert(db.get_bind(), FeedInboxEntry).on_conflict_do_nothing(),
+            [
+                {"follower_id": fid, "recipe_id": rid, "owner_id": owner_id}
+                for fid in batch
+                for rid in recipe_ids
+            ],
+        )
+        _trim_inboxes(db, batch)
+        db.commit()
+        written += len(batch)
+        last_follower_id = batch[-1]
+
+    if pulled:
+        db.delete(pulled)
+        db.commit()
+    return written
+
+
+def fan_out_recipe_job(bind, recipe_id: int, owner_id: int):
+    """Background-task entry point; uses its own session on the request's engine."""
+    db = Session(bind=bind)
+    try:
+        written = fan_out_recipe(db, recipe_id, owner_id)
+        logger.info(f"Fan-out of recipe {recipe_id} to {written} inboxes")
+    except Exception:
+        db.rollback()
+        logger.exception(f"Fan-out of recipe {recipe_id} by user {owner_id} failed")
+    finally:
+        db.close()
+
+
+def backfill_on_follow(db: Session, follower_id: int, owner_id: int):
+    """Copy the creator's latest uploads into a new follower's inbox."""
+    if db.get(FanoutOnReadCreator, owner_id):
+        return
+    recent = (
+        db.query(Recipe.id)
+        .filter(Recipe.owner_id == owner_id)
+        .order_by(Recipe.id.desc())
+        .limit(FOLLOW_BACKFILL_SIZE)
+        .all()
+    )
+    if not recent:
+        return
+    # A concurrent fan-out may already have written some of these
+    db.execute(
+        dialect_insert(db.get_bind(), FeedInboxEntry).on_conflict_do_nothing(),
+        [
+            {"follower_id": follower_id, "recipe_id": r.id, "owner_id": owner_id}
+            for r in recent
+        ],
+    )
+
+
+def remove_on_unfollow(db: Session, follower_id: int, owner_id: int):
+    db.query(FeedInboxEntry).filter(
+        FeedInboxEntry.follower_id == follower_id,
+        FeedInboxEntry.owner_id == owner_id,
+    ).delete(synchronize_session=False)
+
+
+def read_following_feed(
+    db: Session, user_id: int, cursor_id: Optional[int] = None, limit: int = 10
+) -> list:
+    """Recipe ids, newest first: inbox range scan merged with pull-on-read creators."""
+    query = db.query(FeedInboxEntry.recipe_id).filter(
+        FeedInboxEntry.follower_id == user_id
+    )
+    if cursor_id is not None:
+        query = query.filter(FeedInboxEntry.recipe_id < cursor_id)
+    ids = [
+        row.recipe_id
+        for row in query.order_by(FeedInboxEntry.recipe_id.desc()).limit(limit)
+    ]
+
+    pulled_creators = [
+        row.user_id
+        for row in db.query(FanoutOnReadCreator.user_id).join(
+            Follow,
+            (Follow.following_id == FanoutOnReadCreator.user_id)
+            & (Follow.follower_id == user_id),
+        )
+    ]
+    if pulled_creators:
+        query = db.query(Recipe.id).filter(Recipe.owner_id.in_(pulled_creators))
+        if cursor_id is not None:
+            query = query.filter(Recipe.id < cursor_id)
+        pulled = [row.id for row in query.order_by(Recipe.id.desc()).limit(limit)]
+        ids = sorted(set(ids) | set(pulled), reverse=True)[:limit]
+    return ids
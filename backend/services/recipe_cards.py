@@ -0,0 +1,90 @@
+"""Batched hydration of recipe cards for list endpoints.
+
+Fills the card payload used by /feed, /recipes/trending, /recipes/tags/{tag}
+and /recipes/{id} with a fixed number of set-based queries, independent of
+page size: one for owners, then one each for the viewer's likes, saves and
+follows. Counts come from the denormalized columns on Recipe.
+"""
+
+from sqlalchemy.orm import Session
+
+from models import User, Recipe, Like, SavedRecipe, Follow
+from timeutils import to_iso
+
+
+def build_recipe_cards(db: Session, recipes: list) -> list:
+    """Viewer-independent part of each card (recipe fields, owner, counts)."""
+    owner_ids = {r.owner_id for r in recipes}
+    owners = (
+        {u.id: u for u in db.query(User).filter(User.id.in_(owner_ids)).all()}
+        if owner_ids
+        else {}
+    )
+
+    cards = []
+    for r in recipes:
+        owner = owners.get(r.owner_id)
+        cards.append(
+            {
+                "id": r.id,
+                "title": r.title,
+                "video_url": r.video_url,
+                "chef": owner.display_name if owner else "Unknown",
+                "owner_id": r.owner_id,
+                "owner_avatar_url": owner.avatar_url if owner else None,
+                "ingredients": r.ingredients,
+                "steps": r.steps,
+                "tags": r.tags,
+                "tips": r.tips,
+                "likes_count": r.likes_count,
+                "comments_count": r.comments_count,
+                "created_at": to_iso(r.created_at),
+                "views": r.views,
+            }
+        )
+    return cards
+
+
+def apply_viewer_flags(db: Session, cards: list, viewer: User) -> list:
+    """Set i_liked_it / i_saved_it / is_mine / i_follow_owner in place."""
+    recipe_ids = {c["id"] for c in cards}
+    owner_ids = {c["owner_id"] for c in cards if c["owner_id"] != viewer.id}
+
+    liked = set()
+    saved = set()
+    followed = set()
+    if recipe_ids:
+        liked = {
+            row.recipe_id
+            for row in db.query(Like.recipe_id).filter(
+                Like.user_id == viewer.id, Like.recipe_id.in_(recipe_ids)
+            )
+        }
+        # Saved anywhere (global or in any collection)
+        saved = {
+            row.recipe_id
+            for row in db.query(SavedRecipe.recipe_id)
+            .filter(
+                SavedRecipe.user_id == viewer.id,
+                SavedRecipe.recipe_id.in_(recipe_ids),
+            )
+            .distinct()
+        }
+    if owner_ids:
+        followed = {
+            row.following_id
+            for row in db.query(Follow.following_id).filter(
+                Follow.follower_id == viewer.id, Follow.following_id.in_(owner_ids)
+            )
+        }
+
+    for c in cards:
+        c["i_liked_it"] = c["id"] in liked
+        c["i_saved_it"] = c["id"] in saved
+        c["is_mine"] = c["owner_id"] == viewer.id
+        c["i_follow_owner"] = c["owner_id"] in followed
+    return cards
+
+
+def hydrate_recipe_cards(db: Session, recipes: list[Recipe], viewer: User) -> list:
+    return apply_viewer_flags(db, build_recipe_cards(db, recipes), viewer)
@@ -0,0 +1,51 @@
+"""Keeps the in-process recipe indexes in step with recipe writes.
+
+Routers call index_recipe after a recipe was created or its content was
+patched, and unindex_recipe after it was deleted. Each worker's indexes are
+also rebuilt periodically (see main.py), which picks up writes handled by
+other workers.
+"""
+
+from models import Recipe
+from algorithms.trending import trending_engine
+from algorithms.contextual_pairing import pairing_index
+from algorithms.related_recipes import related_index
+from algorithms.search_engine import search_index
+from algorithms.autocomplete import autocomplete_index
+from algorithms.ingredient_coverage import ingredient_index
+
+# Recipe fields that feed the content indexes
+INDEXED_FIELDS = {"title", "tags", "ingredients", "steps"}
+
+
+def index_recipe(recipe: Recipe, created: bool = False):
+    if created:
+        trending_engine.note_upload(recipe.id)
+    pairing_index.update_recipe(recipe.id, recipe.tags, recipe.ingredients)
+    related_index.update_recipe(
+        recipe.id,
+        recipe.title,
+        recipe.tags,
+        recipe.ingredients,
+        recipe.steps,
+        updated_at=recipe.updated_at,
+    )
+    search_index.update_recipe(
+        recipe.id,
+        recipe.title,
+        recipe.tags,
+        recipe.ingredients,
+        recipe.chef,
+        updated_at=recipe.updated_at,
+    )
+    autocomplete_index.update_recipe(recipe.id, recipe.title, recipe.tags)
+    ingredient_index.update_recipe(recipe.id, recipe.ingredients)
+
+
+def unindex_recipe(recipe_id: int):
+    trending_engine.forget(recipe_id)
+    pairing_index.remove_recipe(recipe_id)
+    related_index.remove_recipe(recipe_id)
+    search_index.remove_recipe(recipe_id)
+    autocomplete_index.remove_recipe(recipe_id)
+    ingredient_index.remove_recipe(recipe_id)
@@ -0,0 +1,101 @@
+"""Normalized recipe_tags rows mirroring the Recipe.tags JSON column.
+
+Tags are stored lowercased and trimmed, one row per (recipe, tag), with the
+recipe's created_at copied in so tag pages are a range scan on
+ix_recipe_tags_tag_created. create_recipe / update_recipe call
+sync_recipe_tags before committing; deletes call delete_recipe_tags.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from models import Recipe, RecipeTag
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK = 1000
+
+
+def normalize_tag(tag) -> str:
+    return tag.strip().lower() if isinstance(tag, str) else ""
+
+
+def normalized_tags(tags) -> list:
+    """Unique normalized tags, in first-seen order."""
+    return list(dict.fromkeys(t for t in map(normalize_tag, tags or []) if t))
+
+
+def sync_recipe_tags(db: Session, recipe: Recipe):
+    """Replace the recipe's tag rows with its current tags. Caller commits."""
+    delete_recipe_tags(db, recipe.id)
+    rows = [
+        {"recipe_id": recipe.id, "tag": tag, "created_at": recipe.created_at}
+        for tag in normalized_tags(recipe.tags)
+    ]
+    if rows:
+        db.execute(insert(RecipeTag), rows)
+
+
+def delete_recipe_tags(db: Session, recipe_id: int):
+    db.query(RecipeTag).filter(RecipeTag.recipe_id == recipe_id).delete(
+        synchronize_session=False
+    )
+
+
+def recipe_ids_for_tags(
+    db: Session,
+    tags: list,
+    limit: int,
+    before: Optional[tuple] = None,
+) -> list:
+    """
+    Newest recipe ids carrying any of the tags. before=(created_at, recipe_id)
+    continues a previous page. One index range scan per tag.
+    """
+    tags = normalized_tags(tags)
+    if not tags:
+        return []
+    query = db.query(RecipeTag.recipe_id).filter(RecipeTag.tag.in_(tags))
+    if before is not None:
+        created_at, recipe_id = before
+        query = query.filter(
+            (RecipeTag.created_at < created_at)
+            | ((RecipeTag.created_at == created_at) & (RecipeTag.recipe_id < recipe_id))
+        )
+    rows = query.order_by(
+        RecipeTag.created_at.desc(), RecipeTag.recipe_id.desc()
+    ).limit(limit * len(tags))
+    # A recipe with several matching tags appears once per tag
+    seen = dict.fromkeys(row.recipe_id for row in rows)
+    return list(seen)[:limit]
+
+
+def backfill_recipe_tags(db: Session) -> int:
+    """Rebuild recipe_tags from Recipe.tags for all recipes. Caller commits."""
+    db.query(RecipeTag).delete(synchronize_session=False)
+    written = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Recipe.id, Recipe.tags, Recipe.created_at)
+            .filter(Recipe.id > last_id)
+            .order_by(Recipe.id)
+            .limit(BACKFILL_CHUNK)
+            .all()
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+        rows = [
+            {"recipe_id": r.id, "tag": tag, "created_at": r.created_at}
+            for r in batch
+            for tag in normalized_tags(r.tags)
+        ]
+        if rows:
+            db.execute(insert(RecipeTag), rows)
+        written += len(rows)
+    logger.info(f"Backfilled {written} recipe tags")
+    return written
@@ -0,0 +1,83 @@
+"""Shared result cache for listings that look the same for every viewer.
+
+/search, /recipes/tags/{tag} and /recipes/trending cache their viewer-independent
+payload under the normalized request plus the current version of every entity
+the result depends on: "recipes" (any recipe write), "tag:<tag>" (writes to a
+recipe carrying the tag) and "users" (registrations and profile changes).
+Writes bump those versions, so later reads build a different key and never see
+the stale entry, which then ages out of the LRU. Versions are read before the
+result is computed, so a write racing with a computation invalidates it too.
+
+Results computed from an in-process index (SEARCH_BACKEND=index) are keyed on
+that worker's index generation too: another worker's index may not have
+absorbed a write yet when the bumped version reaches it, and must not publish
+its stale page under the new version.
+
+Like counts inside cached cards may lag by up to RESULT_CACHE_TTL seconds.
+Viewer flags (apply_viewer_flags) are added by the caller after the lookup.
+With the in-process backend every worker has its own cache and versions; run
+several workers with CACHE_BACKEND=redis so bumps reach all of them.
+"""
+
+import os
+
+from services.cache_backends import create_cache_backend
+from services.recipe_tags import normalized_tags
+
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "60"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "32"))
+
+
+def normalize_query(q: str) -> str:
+    """Lowercased, single-spaced; a trailing space (finished last word) is kept."""
+    words = (q or "").lower().split()
+    if not words:
+        return ""
+    return " ".join(words) + (" " if q[-1:].isspace() else "")
+
+
+def tag_entities(tags) -> list:
+    return [f"tag:{t}" for t in normalized_tags(tags)]
+
+
+class ResultCache:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _versions(self, entities) -> str:
+        return ".".join(str(self.backend.counter(f"version:{e}")) for e in entities)
+
+    def bump(self, *entities):
+        for entity in dict.fromkeys(entities):
+            self.backend.incr(f"version:{entity}")
+
+    def get_or_compute(self, key: str, entities: tuple, compute):
+        """Cached value for key at the entities' current versions, else compute()."""
+        full_key = f"result:{key}@{self._versions(entities)}"
+        value = self.backend.get(full_key)
+        if value is None:
+            value = compute()
+            self.backend.set(full_key, value)
+        return value
+
+
+result_cache = ResultCache(
+    create_cache_backend(
+        RESULT_CACHE_MAX_ENTRIES,
+        RESULT_CACHE_TTL,
+        max_bytes=int(RESULT_CACHE_MAX_MB * 2**20),
+    )
+)
+
+
+def bump_recipe_versions(*tag_lists):
+    """After a recipe write; pass the recipe's tags before and after it."""
+    result_cache.bump(
+        "recipes", *(entity for tags in tag_lists for entity in tag_entities(tags))
+    )
+
+
+def bump_user_versions():
+    """After a registration, profile change or account deletion."""
+    result_cache.bump("users")
@@ -0,0 +1,150 @@
+"""Write-behind buffer for recipe view events.
+
+POST /recipes/views only records events in memory. A periodic job flushes
+the aggregated deltas with one grouped UPDATE (views = views + n) per chunk
+of recipes, so autoplay does not turn every view into its own write. A crash
+loses at most VIEW_FLUSH_SECONDS of views; shutdown flushes the remainder.
+If a grouped UPDATE fails, its recipes are retried one by one; a recipe that
+fails in two flushes in a row has its deltas dropped, so one bad delta cannot
+block view counting for everything else.
+
+Repeated views of the same recipe by the same user within VIEW_DEDUPE_SECONDS
+are dropped.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+
+from models import Recipe
+from schemas import MAX_WATCHED_MS
+
+logger = logging.getLogger(__name__)
+
+VIEW_FLUSH_SECONDS = int(os.getenv("VIEW_FLUSH_SECONDS", "5"))
+VIEW_DEDUPE_SECONDS = int(os.getenv("VIEW_DEDUPE_SECONDS", "600"))
+# Recipes per UPDATE statement (keeps bound parameters below SQLite's limit)
+VIEW_FLUSH_CHUNK = 250
+
+
+class ViewBuffer:
+    def __init__(self, dedupe_seconds: int = VIEW_DEDUPE_SECONDS):
+        self.dedupe_seconds = dedupe_seconds
+        self._lock = threading.Lock()
+        # recipe_id -> [views, watched_ms]
+        self._pending = {}
+        # (user_id, recipe_id) -> monotonic time of the last counted view
+        self._seen = {}
+        # Recipes whose deltas already failed once and were put back
+        self._failed = set()
+
+    def record(self, user_id: int, events, now: Optional[float] = None) -> int:
+        """Buffer (recipe_id, watched_ms) events. Returns how many were counted."""
+        now = time.monotonic() if now is None else now
+        accepted = 0
+        with self._lock:
+            for recipe_id, watched_ms in events:
+                key = (user_id, recipe_id)
+                last = self._seen.get(key)
+                if last is not None and now - last < self.dedupe_seconds:
+                    continue
+                self._seen[key] = now
+                entry = self._pending.setdefault(recipe_id, [0, 0])
+                entry[0] += 1
+                entry[1] += min(max(int(watched_ms or 0), 0), MAX_WATCHED_MS)
+                accepted += 1
+        return accepted
+
+    def pending(self) -> dict:
+        with self._lock:
+            return {rid: tuple(v) for rid, v in self._pending.items()}
+
+    def _take(self, now: float) -> dict:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            cutoff = now - self.dedupe_seconds
+            self._seen = {k: t for k, t in self._seen.items() if t > cutoff}
+        return pending
+
+    def _restore(self, pending: dict):
+        with self._lock:
+            for rid, (views, watched_ms) in pending.items():
+                entry = self._pending.setdefault(rid, [0, 0])
+                entry[0] += views
+                entry[1] += watched_ms
+
+    def _apply(self, db: Session, pending: dict, ids: list):
+        for i in range(0, len(ids), VIEW_FLUSH_CHUNK):
+            chunk = ids[i : i + VIEW_FLUSH_CHUNK]
+            views = case(
+                {rid: pending[rid][0] for rid in chunk}, value=Recipe.id, else_=0
+            )
+            watched = case(
+                {rid: pending[rid][1] for rid in chunk}, value=Recipe.id, else_=0
+            )
+            db.execute(
+                update(Recipe)
+                .where(Recipe.id.in_(chunk))
+                .values(
+                    views=func.coalesce(Recipe.views, 0) + views,
+                    watch_ms_total=func.coalesce(Recipe.watch_ms_total, 0) + watched,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+    def flush(self, db: Session, now: Optional[float] = None) -> int:
+        """Apply buffered deltas and commit. Returns the number of recipes touched."""
+        pending = self._take(time.monotonic() if now is None else now)
+        if not pending:
+            return 0
+        failed = []
+        try:
+            self._apply(db, pending, sorted(pending))
+        except Exception:
+            db.rollback()
+            logger.exception("Grouped view flush failed, retrying per recipe")
+            for rid in sorted(pending):
+                try:
+                    self._apply(db, pending, [rid])
+                except Exception:
+                    db.rollback()
+                    failed.append(rid)
+
+        with self._lock:
+            self._failed.difference_update(pending.keys() - set(failed))
+        retry = {rid: pending[rid] for rid in failed if rid not in self._failed}
+        dropped = [rid for rid in failed if rid not in retry]
+        if retry:
+            # Keep the deltas for one more attempt
+            self._restore(retry)
+            with self._lock:
+                self._failed.update(retry)
+        if dropped:
+            with self._lock:
+                self._failed.difference_update(dropped)
+            logger.error(
+                f"Dropped view deltas of {len(dropped)} recipes after two failed flushes"
+            )
+        return len(pending) - len(failed)
+
+
+view_buffer = ViewBuffer()
+
+
+def flush_view_buffer_job():
+    """Entry point for the periodic flusher (and the final flush on shutdown)."""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        touched = view_buffer.flush(db)
+        if touched:
+            logger.info(f"Flushed views for {touched} recipes")
+    finally:
+        db.close()
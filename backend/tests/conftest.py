@@ -23,6 +23,7 @@ services.mail_manager.mail_manager.send_verification_code = AsyncMock(
 
 from main import app
 from limiter import limiter
+from services.result_cache import result_cache
 
 # Disable rate limiter for tests to prevent 429 Too Many Requests errors
 limiter.enabled = False
@@ -37,6 +38,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def setup_database():
     """Create all tables before each test, drop after."""
     Base.metadata.create_all(bind=engine)
+    # Cached results and their versions refer to the previous test's rows
+    result_cache.backend.clear()
     yield
     Base.metadata.drop_all(bind=engine)
     # Clean up test db file
@@ -0,0 +1,228 @@
+"""Tests for services/cache_backends, the feed session store and the result cache."""
+
+import time
+
+from services.cache_backends import InMemoryLRUCache, RedisCache
+from tests.conftest import auth_header
+from services.feed_sessions import FeedSessionStore, encode_cursor, decode_cursor
+
+
+class FakeRedis:
+    """Minimal in-process stand-in for the redis.Redis calls we use."""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, name):
+        entry = self.store.get(name)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.store[name]
+            return None
+        return value
+
+    def set(self, name, value, ex=None, nx=False):
+        if nx and self.get(name) is not None:
+            return None
+        expires_at = time.monotonic() + ex if ex else None
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        self.store[name] = (value, expires_at)
+        return True
+
+    def delete(self, *names):
+        for name in names:
+            self.store.pop(name, None)
+
+    def incr(self, name):
+        value = int(self.get(name) or 0) + 1
+        self.store[name] = (str(value).encode(), None)
+        return value
+
+
+def test_lru_evicts_least_recently_used():
+    cache = InMemoryLRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_ttl_expiry():
+    cache = InMemoryLRUCache(max_entries=10)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_redis_backend_roundtrip_and_ttl():
+    cache = RedisCache(FakeRedis())
+    cache.set("k", [[1, 2.5]], ttl=60)
+    assert cache.get("k") == [[1, 2.5]]
+    cache.delete("k")
+    assert cache.get("k") is None
+
+    cache.set("short", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+
+
+def test_add_only_sets_absent_keys():
+    for backend in (InMemoryLRUCache(), RedisCache(FakeRedis())):
+        assert backend.add("lock", 1, ttl=60)
+        assert not backend.add("lock", 2, ttl=60)
+        assert backend.get("lock") == 1
+        backend.delete("lock")
+        assert backend.add("lock", 3, ttl=60)
+
+
+def test_feed_session_store_scoped_per_user():
+    for backend in (InMemoryLRUCache(), RedisCache(FakeRedis())):
+        store = FeedSessionStore(backend)
+        snapshot_id = store.create(1, [(10, 5.0), (9, 4.0)])
+        assert store.load(1, snapshot_id) == [(10, 5.0), (9, 4.0)]
+        assert store.load(2, snapshot_id) is None
+
+
+def test_cursor_roundtrip():
+    assert decode_cursor(encode_cursor("abc123", 20)) == ("abc123", 20)
+    assert decode_cursor("12.5_3") is None
+    assert decode_cursor(encode_cursor("abc123", -5)) is None
+
+
+def test_lru_byte_budget():
+    cache = InMemoryLRUCache(max_entries=100, max_bytes=64)
+    cache.set("a", "x" * 20)
+    cache.set("b", "y" * 20)
+    assert cache.bytes_used <= 64 and len(cache) == 2
+    cache.set("c", "z" * 20)
+    # "a" was least recently used and is evicted to stay within the budget
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 20
+    # Values larger than the whole budget are not stored
+    cache.set("huge", "h" * 100)
+    assert cache.get("huge") is None
+    assert cache.bytes_used <= 64
+
+
+def test_version_counters_survive_eviction():
+    cache = InMemoryLRUCache(max_entries=1)
+    assert cache.counter("v") == 0
+    assert cache.incr("v") == 1
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.counter("v") == 1
+
+    redis_cache = RedisCache(FakeRedis())
+    start = redis_cache.counter("v")
+    assert redis_cache.incr("v") == start + 1
+    # An evicted counter restarts at a fresh value, not at one seen before
+    redis_cache.client.store.clear()
+    assert redis_cache.counter("v") > start + 1
+
+
+# ── RESULT CACHE ─────────────────────────────────────────────────────
+
+
+def test_result_cache_invalidated_by_version_bumps():
+    from services.result_cache import ResultCache, normalize_query
+
+    for backend in (InMemoryLRUCache(), RedisCache(FakeRedis())):
+        cache = ResultCache(backend)
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"n": len(calls)}
+
+        assert cache.get_or_compute("k", ("recipes", "tag:pasta"), compute) == {"n": 1}
+        assert cache.get_or_compute("k", ("recipes", "tag:pasta"), compute) == {"n": 1}
+        cache.bump("tag:vegan")
+        assert cache.get_or_compute("k", ("recipes", "tag:pasta"), compute) == {"n": 1}
+        cache.bump("tag:pasta")
+        assert cache.get_or_compute("k", ("recipes", "tag:pasta"), compute) == {"n": 2}
+
+    assert normalize_query("  Pasta   CARBONARA") == "pasta carbonara"
+    assert normalize_query("Pasta ") == "pasta "
+
+
+def test_listing_endpoints_served_from_cache(
+    client, db_session, auth_token, second_auth_token
+):
+    from sqlalchemy import event
+    from algorithms.search_engine import search_index
+    from models import Recipe
+    from tests.conftest import engine
+
+    search_index.build(db_session)
+    recipe = {
+        "title": "Test Pasta",
+        "video_url": "/static/videos/test.mp4",
+        "ingredients": [{"name": "Nudeln"}],
+        "steps": [],
+        "tags": ["Pasta"],
+    }
+    client.post("/upload", json=recipe, headers=auth_header(auth_token))
+    recipe_id = db_session.query(Recipe.id).scalar()
+
+    statements = []
+
+    def _before(conn, cursor, statement, *a):
+        statements.append(statement)
+
+    def get(url, token):
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", _before)
+        try:
+            r = client.get(url, headers=auth_header(token))
+        finally:
+            event.remove(engine, "before_cursor_execute", _before)
+        assert r.status_code == 200
+        return r.json(), [s for s in statements if "FROM recipes" in s]
+
+    first, _ = get("/recipes/tags/Pasta", auth_token)
+    # Another viewer gets the cached cards with their own flags
+    second, recipe_queries = get("/recipes/tags/pasta", second_auth_token)
+    assert recipe_queries == []
+    assert (first["data"][0]["is_mine"], second["data"][0]["is_mine"]) == (True, False)
+    body, recipe_queries = get("/search?q=PASTA", second_auth_token)
+    body_again, recipe_queries = get("/search?q=pasta", auth_token)
+    assert recipe_queries == [] and body_again == body
+
+    # Edits and profile changes bump the versions; the next read is fresh
+    client.patch(
+        f"/recipes/{recipe_id}",
+        json={"title": "Pasta Bolognese"},
+        headers=auth_header(auth_token),
+    )
+    body, _ = get("/recipes/tags/pasta", second_auth_token)
+    assert body["data"][0]["title"] == "Pasta Bolognese"
+    assert [v["title"] for v in get("/search?q=pasta", auth_token)[0]["videos"]] == [
+        "Pasta Bolognese"
+    ]
+    client.post(
+        "/update-profile",
+        data={"display_name": "Chefkoch", "bio": "Hallo"},
+        headers=auth_header(auth_token),
+    )
+    body, _ = get("/recipes/tags/pasta", second_auth_token)
+    assert body["data"][0]["chef"] == "Chefkoch"
+
+    # Search results follow this worker's index, not only the shared versions:
+    # a page computed before the index caught up is not served afterwards
+    search_index.remove_recipe(recipe_id)
+    assert get("/search?q=pasta", auth_token)[0]["videos"] == []
+    db_session.expire_all()
+    row = db_session.get(Recipe, recipe_id)
+    search_index.update_recipe(
+        row.id, row.title, row.tags, row.ingredients, row.chef, updated_at=row.updated_at
+    )
+    assert [v["title"] for v in get("/search?q=pasta", auth_token)[0]["videos"]] == [
+        "Pasta Bolognese"
+    ]
@@ -39,7 +39,7 @@ def test_list_conversations(client, auth_token, second_auth_token):
 
     r = client.get("/conversations", headers=auth_header(auth_token))
     assert r.status_code == 200
-    assert len(r.json()) == 1
+    assert len(r.json()["data"]) == 1
 
 
 # ── MESSAGES ─────────────────────────────────────────────────────────
@@ -146,7 +146,7 @@ def test_mark_as_read(client, auth_token, second_auth_token):
     )
 
     # User2 checks unread
-    convs = client.get("/conversations", headers=auth_header(second_auth_token)).json()
+    convs = client.get("/conversations", headers=auth_header(second_auth_token)).json()["data"]
     assert convs[0]["unread_count"] >= 1
 
     # User2 marks as read
@@ -156,5 +156,134 @@ def test_mark_as_read(client, auth_token, second_auth_token):
     assert r.status_code == 200
 
     # Check again
-    convs = client.get("/conversations", headers=auth_header(second_auth_token)).json()
+    convs = client.get("/conversations", headers=auth_header(second_auth_token)).json()["data"]
     assert convs[0]["unread_count"] == 0
+
+
+def test_message_timestamps_serialize_as_iso_strings(client, auth_token, second_auth_token):
+    from datetime import datetime
+
+    user2_id = _get_my_id(client, second_auth_token)
+    conv_id = client.post(
+        f"/conversations?user_id={user2_id}", headers=auth_header(auth_token)
+    ).json()["conversation_id"]
+    sent = client.post(
+        f"/conversations/{conv_id}/messages",
+        json={"text": "Zeit?"},
+        headers=auth_header(auth_token),
+    ).json()
+
+    # Naive UTC ISO 8601, same shape as the former string columns
+    created = datetime.fromisoformat(sent["created_at"])
+    assert created.tzinfo is None
+    listed = client.get("/conversations", headers=auth_header(auth_token)).json()["data"]
+    assert listed[0]["last_message_time"] == sent["created_at"]
+
+
+# ── INBOX ────────────────────────────────────────────────────────────
+
+
+def _conversation_with(client, token, other_token):
+    other_id = _get_my_id(client, other_token)
+    return client.post(
+        f"/conversations?user_id={other_id}", headers=auth_header(token)
+    ).json()["conversation_id"]
+
+
+def _send(client, token, conv_id, text):
+    client.post(
+        f"/conversations/{conv_id}/messages",
+        json={"text": text},
+        headers=auth_header(token),
+    )
+
+
+def test_inbox_keyset_pages_by_last_message(client, auth_token):
+    others = [
+        create_verified_user(client, f"inbox{i}", f"inbox{i}@test.com", "TestPass789!")
+        for i in range(5)
+    ]
+    conv_ids = [_conversation_with(client, auth_token, t) for t in others]
+    # The oldest conversation gets the newest message and moves to the top
+    _send(client, others[0], conv_ids[0], "Neueste")
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get(
+            "/conversations", params=params, headers=auth_header(auth_token)
+        ).json()
+        seen += page["data"]
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+
+    assert [c["id"] for c in seen] == [conv_ids[0], *conv_ids[:0:-1]]
+    assert seen[0]["last_message"] == "Neueste"
+    assert seen[0]["unread_count"] == 1
+    assert seen[1]["last_message"] is None
+    assert seen[1]["last_message_time"] is None
+
+
+def test_unread_counts_only_other_participant(client, auth_token, second_auth_token):
+    conv_id = _conversation_with(client, auth_token, second_auth_token)
+    _send(client, auth_token, conv_id, "Eins")
+    _send(client, auth_token, conv_id, "Zwei")
+    _send(client, second_auth_token, conv_id, "Drei")
+
+    mine = client.get("/conversations", headers=auth_header(auth_token)).json()
+    theirs = client.get("/conversations", headers=auth_header(second_auth_token)).json()
+    assert mine["data"][0]["unread_count"] == 1
+    assert theirs["data"][0]["unread_count"] == 2
+    assert theirs["data"][0]["last_message"] == "Drei"
+
+    r = client.get("/conversations/unread-count", headers=auth_header(second_auth_token))
+    assert r.json() == {"unread_count": 2}
+    client.post(f"/conversations/{conv_id}/read", headers=auth_header(second_auth_token))
+    r = client.get("/conversations/unread-count", headers=auth_header(second_auth_token))
+    assert r.json() == {"unread_count": 0}
+
+
+def test_rebuild_conversation_summaries(client, db_session, auth_token, second_auth_token):
+    from models import Conversation
+    from services.conversation_summaries import rebuild_conversation_summaries
+
+    conv_id = _conversation_with(client, auth_token, second_auth_token)
+    _send(client, auth_token, conv_id, "Hallo")
+    _send(client, auth_token, conv_id, "Noch da?")
+    before = client.get("/conversations", headers=auth_header(second_auth_token)).json()
+
+    db_session.query(Conversation).update(
+        {Conversation.user2_unread: 0, Conversation.last_message_preview: None}
+    )
+    rebuild_conversation_summaries(db_session)
+    db_session.commit()
+
+    after = client.get("/conversations", headers=auth_header(second_auth_token)).json()
+    assert after == before
+
+
+def test_inbox_query_count_is_constant(client, auth_token):
+    from sqlalchemy import event
+    from tests.conftest import engine
+
+    def count_queries():
+        statements = []
+
+        def before(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before)
+        try:
+            client.get("/conversations", headers=auth_header(auth_token))
+        finally:
+            event.remove(engine, "before_cursor_execute", before)
+        return len(statements)
+
+    first = create_verified_user(client, "qc0", "qc0@test.com", "TestPass789!")
+    _send(client, first, _conversation_with(client, auth_token, first), "Hi")
+    few = count_queries()
+    for i in range(1, 6):
+        other = create_verified_user(client, f"qc{i}", f"qc{i}@test.com", "TestPass789!")
+        _send(client, other, _conversation_with(client, auth_token, other), "Hi")
+    assert count_queries() == few
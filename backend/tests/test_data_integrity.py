@@ -23,6 +23,13 @@ def _get_recipe_id(client, token):
     return feed[0]["id"]
 
 
+def _upload_recipe(client, db_session, token):
+    from models import Recipe
+
+    client.post("/upload", json=SAMPLE_RECIPE, headers=auth_header(token))
+    return db_session.query(Recipe.id).order_by(Recipe.id.desc()).first()[0]
+
+
 def test_like_count_accuracy(client, auth_token, second_auth_token):
     """Like count in feed should match actual likes."""
     recipe_id = _get_recipe_id(client, auth_token)
@@ -99,7 +106,7 @@ def test_unread_count_after_read(client, auth_token, second_auth_token):
         )
 
     # User2 unread = 3
-    convs = client.get("/conversations", headers=auth_header(second_auth_token)).json()
+    convs = client.get("/conversations", headers=auth_header(second_auth_token)).json()["data"]
     assert convs[0]["unread_count"] == 3
 
     # Mark read
@@ -108,7 +115,7 @@ def test_unread_count_after_read(client, auth_token, second_auth_token):
     )
 
     # Unread = 0
-    convs = client.get("/conversations", headers=auth_header(second_auth_token)).json()
+    convs = client.get("/conversations", headers=auth_header(second_auth_token)).json()["data"]
     assert convs[0]["unread_count"] == 0
 
 
@@ -133,3 +140,123 @@ def test_saved_status_in_feed(client, auth_token):
     )
     feed = client.get("/feed", headers=auth_header(auth_token)).json()
     assert feed[0]["i_saved_it"] is True
+
+
+def test_engagement_counters_on_delete_profile(client, db_session, auth_token, second_auth_token):
+    """Deleting a profile should remove its likes/saves/comments from the counters."""
+    from models import Recipe
+
+    recipe_id = _upload_recipe(client, db_session, auth_token)
+    client.post(f"/recipes/{recipe_id}/like", headers=auth_header(second_auth_token))
+    client.post(
+        f"/recipes/{recipe_id}/toggle-global-save",
+        headers=auth_header(second_auth_token),
+    )
+    client.post(
+        f"/recipes/{recipe_id}/comments",
+        json={"text": "Toll"},
+        headers=auth_header(second_auth_token),
+    )
+
+    recipe = db_session.query(Recipe).filter(Recipe.id == recipe_id).first()
+    assert (recipe.likes_count, recipe.saves_count, recipe.comments_count) == (1, 1, 1)
+
+    client.delete("/my-profile", headers=auth_header(second_auth_token))
+    db_session.expire_all()
+    recipe = db_session.query(Recipe).filter(Recipe.id == recipe_id).first()
+    assert (recipe.likes_count, recipe.saves_count, recipe.comments_count) == (0, 0, 0)
+
+
+def test_delete_profile_removes_replies_to_own_comments(
+    client, db_session, auth_token, second_auth_token
+):
+    """Other users' replies would be orphaned when their thread starter leaves."""
+    from models import Comment, Recipe
+
+    recipe_id = _upload_recipe(client, db_session, auth_token)
+    thread = client.post(
+        f"/recipes/{recipe_id}/comments",
+        json={"text": "Toll"},
+        headers=auth_header(second_auth_token),
+    ).json()["id"]
+    client.post(
+        f"/recipes/{recipe_id}/comments",
+        json={"text": "Danke", "parent_id": thread},
+        headers=auth_header(auth_token),
+    )
+    client.post(
+        f"/recipes/{recipe_id}/comments",
+        json={"text": "Eigener Thread"},
+        headers=auth_header(auth_token),
+    )
+
+    client.delete("/my-profile", headers=auth_header(second_auth_token))
+    db_session.expire_all()
+    assert [c.text for c in db_session.query(Comment)] == ["Eigener Thread"]
+    assert db_session.get(Recipe, recipe_id).comments_count == 1
+
+
+def test_rebuild_engagement_counters(client, db_session, auth_token):
+    """The repair job should restore counters from the source tables."""
+    from models import Recipe
+    from services.engagement_counters import rebuild_engagement_counters
+
+    recipe_id = _upload_recipe(client, db_session, auth_token)
+    client.post(f"/recipes/{recipe_id}/like", headers=auth_header(auth_token))
+
+    db_session.query(Recipe).update({Recipe.likes_count: 42, Recipe.saves_count: 7})
+    db_session.commit()
+
+    rebuild_engagement_counters(db_session)
+    db_session.commit()
+    recipe = db_session.query(Recipe).filter(Recipe.id == recipe_id).first()
+    assert (recipe.likes_count, recipe.saves_count, recipe.comments_count) == (1, 0, 0)
+
+
+def test_timestamp_migration_normalizes_legacy_sqlite_strings(tmp_path):
+    """Legacy 'YYYY-MM-DDTHH:MM:SS' strings are normalized and read as DateTime."""
+    from datetime import datetime
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session
+    from database import Base
+    from migrations import run_auto_migrations
+    from models import Recipe
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for rid, ts in [(1, "2024-05-01T09:00:00.500000"), (2, "2024-05-01 10:00:00")]:
+            conn.execute(
+                text(
+                    "INSERT INTO recipes (id, title, video_url, chef, owner_id, views, "
+                    "created_at, likes_count, saves_count, comments_count) "
+                    "VALUES (:id, 't', 'v', 'c', 1, 0, :ts, 0, 0, 0)"
+                ),
+                {"id": rid, "ts": ts},
+            )
+
+    run_auto_migrations(engine)
+
+    with Session(engine) as db:
+        newest = db.query(Recipe).order_by(Recipe.created_at.desc()).first()
+        assert newest.id == 2
+        assert db.get(Recipe, 1).created_at == datetime(2024, 5, 1, 9, 0, 0, 500000)
+    engine.dispose()
+
+
+def test_seed_dataset_produces_consistent_counters(tmp_path):
+    from sqlalchemy import create_engine, func
+    from sqlalchemy.orm import Session
+    from models import Recipe, Like, FeedInboxEntry, RecipeScore
+    from scripts.seed_dataset import seed_dataset
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    stats = seed_dataset(engine, users=20, recipes=100, conversations=5, seed=1)
+
+    with Session(engine) as db:
+        assert db.query(Recipe).count() == stats["recipes"] == 100
+        assert db.query(func.sum(Recipe.likes_count)).scalar() == stats["likes"]
+        assert db.query(Like).count() == stats["likes"]
+        assert db.query(RecipeScore).count() == 100
+        assert db.query(FeedInboxEntry).count() > 0
+    engine.dispose()
@@ -104,14 +104,14 @@ def test_chat_flow(client):
     )
 
     # B checks unread
-    convs = client.get("/conversations", headers=auth_header(token_b)).json()
+    convs = client.get("/conversations", headers=auth_header(token_b)).json()["data"]
     assert convs[0]["unread_count"] == 2
 
     # B marks as read
     client.post(f"/conversations/{conv_id}/read", headers=auth_header(token_b))
 
     # B checks again
-    convs = client.get("/conversations", headers=auth_header(token_b)).json()
+    convs = client.get("/conversations", headers=auth_header(token_b)).json()["data"]
     assert convs[0]["unread_count"] == 0
 
     # B replies
@@ -1,5 +1,7 @@
 """Tests for recipes_router: Feed, CRUD, Like, Comment, Save, Collections."""
 
+import pytest
+
 from tests.conftest import auth_header
 
 
@@ -108,7 +110,141 @@ def test_comment_create_and_load(client, auth_token):
     comments = client.get(
         f"/recipes/{recipe_id}/comments", headers=auth_header(auth_token)
     ).json()
-    assert len(comments) == 1
+    assert len(comments["data"]) == 1
+    assert comments["nextCursor"] is None
+
+
+def _comment(client, token, recipe_id, text, parent_id=None):
+    r = client.post(
+        f"/recipes/{recipe_id}/comments",
+        json={"text": text, "parent_id": parent_id},
+        headers=auth_header(token),
+    )
+    assert r.status_code == 200
+    return r.json()["id"]
+
+
+def test_comment_threads_paginate(client, auth_token):
+    recipe_id = _create_recipe(client, auth_token).json()["id"]
+    top_ids = [_comment(client, auth_token, recipe_id, f"K{i}") for i in range(5)]
+    reply_ids = [
+        _comment(client, auth_token, recipe_id, f"A{i}", parent_id=top_ids[0])
+        for i in range(3)
+    ]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get(
+            f"/recipes/{recipe_id}/comments",
+            params=params,
+            headers=auth_header(auth_token),
+        ).json()
+        seen += [c["id"] for c in page["data"]]
+        cursor = page["nextCursor"]
+        if not cursor:
+            break
+    # Top-level only, newest first
+    assert seen == top_ids[::-1]
+
+    first = client.get(
+        f"/recipes/{recipe_id}/comments",
+        params={"cursor": top_ids[1]},
+        headers=auth_header(auth_token),
+    ).json()["data"]
+    assert [c["id"] for c in first] == [top_ids[0]]
+    assert first[0]["replies_count"] == 3
+
+    replies = client.get(
+        f"/recipes/{recipe_id}/comments/{top_ids[0]}/replies",
+        params={"limit": 2},
+        headers=auth_header(auth_token),
+    ).json()
+    assert [c["id"] for c in replies["data"]] == reply_ids[:2]
+    rest = client.get(
+        f"/recipes/{recipe_id}/comments/{top_ids[0]}/replies",
+        params={"cursor": replies["nextCursor"]},
+        headers=auth_header(auth_token),
+    ).json()
+    assert [c["id"] for c in rest["data"]] == reply_ids[2:]
+    assert rest["nextCursor"] is None
+
+
+def test_reply_to_reply_joins_thread(client, auth_token):
+    recipe_id = _create_recipe(client, auth_token).json()["id"]
+    top = _comment(client, auth_token, recipe_id, "Oben")
+    reply = _comment(client, auth_token, recipe_id, "Antwort", parent_id=top)
+    nested = client.post(
+        f"/recipes/{recipe_id}/comments",
+        json={"text": "Antwort auf Antwort", "parent_id": reply},
+        headers=auth_header(auth_token),
+    ).json()
+    assert nested["parent_id"] == top
+
+    r = client.post(
+        f"/recipes/{recipe_id}/comments",
+        json={"text": "Ins Leere", "parent_id": 999999},
+        headers=auth_header(auth_token),
+    )
+    assert r.status_code == 404
+
+
+def test_comment_like_counts(client, auth_token, second_auth_token):
+    recipe_id = _create_recipe(client, auth_token).json()["id"]
+    comment_id = _comment(client, auth_token, recipe_id, "Gefällt mir")
+    for _ in range(3):
+        client.post(
+            f"/recipes/{recipe_id}/comments/{comment_id}/like",
+            headers=auth_header(auth_token),
+        )
+
+    mine = client.get(
+        f"/recipes/{recipe_id}/comments", headers=auth_header(auth_token)
+    ).json()["data"][0]
+    theirs = client.get(
+        f"/recipes/{recipe_id}/comments", headers=auth_header(second_auth_token)
+    ).json()["data"][0]
+    assert mine["likes_count"] == theirs["likes_count"] == 1
+    assert mine["i_liked_it"] is True
+    assert theirs["i_liked_it"] is False
+
+    # Missing comments and comments of another recipe are not found
+    other_recipe = _create_recipe(client, auth_token).json()["id"]
+    for url in (
+        f"/recipes/{recipe_id}/comments/999999/like",
+        f"/recipes/{other_recipe}/comments/{comment_id}/like",
+    ):
+        assert client.post(url, headers=auth_header(auth_token)).status_code == 404
+
+
+def test_comment_page_query_count(client, auth_token):
+    """A page costs the same number of queries however many comments exist."""
+    from sqlalchemy import event
+    from tests.conftest import engine
+
+    recipe_id = _create_recipe(client, auth_token).json()["id"]
+
+    def count_queries():
+        statements = []
+
+        def before(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before)
+        try:
+            client.get(
+                f"/recipes/{recipe_id}/comments", headers=auth_header(auth_token)
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", before)
+        return len(statements)
+
+    _comment(client, auth_token, recipe_id, "Erster")
+    few = count_queries()
+    for i in range(15):
+        parent = _comment(client, auth_token, recipe_id, f"K{i}")
+        _comment(client, auth_token, recipe_id, f"A{i}", parent_id=parent)
+    assert count_queries() == few
 
 
 # ── SAVE & COLLECTIONS ──────────────────────────────────────────────
@@ -179,3 +315,962 @@ def test_trending_recipes(client, auth_token):
     assert len(data) >= 1
     assert data[0]["title"] == "Test Pasta"
     assert "views" in data[0]
+
+
+def test_trending_engine_ranks_recent_engagement(client, db_session, auth_token):
+    from datetime import timedelta
+    from algorithms.trending import REFRESH_LOCK_KEY, TrendingEngine
+    from models import Recipe
+    from services.cache_backends import RedisCache
+    from tests.test_caching import FakeRedis
+    from timeutils import utcnow
+
+    for _ in range(3):
+        _create_recipe(client, auth_token)
+    old_viral, fresh, quiet = db_session.query(Recipe).order_by(Recipe.id).all()
+    now = utcnow()
+    old_viral.created_at = now - timedelta(days=30)
+    old_viral.views = 100000
+    db_session.commit()
+
+    # Shared state round-trips through JSON, as it would through Redis
+    engine = TrendingEngine(size=2, backend=RedisCache(FakeRedis()))
+    engine.refresh(db_session, now=now)
+    # All-time views of old recipes are only the baseline
+    assert engine.top_ids() == [quiet.id, fresh.id]
+
+    fresh.likes_count = 10
+    old_viral.likes_count = 1
+    db_session.commit()
+    engine.refresh(db_session, now=now + timedelta(hours=1))
+    assert engine.top_ids() == [fresh.id, old_viral.id]
+
+    # Another worker on the same backend continues the shared history
+    worker = TrendingEngine(size=2, backend=engine.backend)
+    worker.refresh(db_session, now=now + timedelta(hours=1))
+    assert worker.top_ids() == [fresh.id, old_viral.id]
+    # While one worker refreshes, the others load its last state
+    engine.backend.add(REFRESH_LOCK_KEY, 1)
+    waiting = TrendingEngine(size=2, backend=engine.backend)
+    waiting.refresh(db_session, now=now + timedelta(hours=30))
+    assert waiting.top_ids() == [fresh.id, old_viral.id]
+    engine.backend.delete(REFRESH_LOCK_KEY)
+
+    # Buckets fall out of the window; newest uploads fill the list
+    engine.refresh(db_session, now=now + timedelta(hours=30))
+    assert engine.top_ids() == [quiet.id, fresh.id]
+
+
+# ── QUERY COUNT ──────────────────────────────────────────────────────
+
+
+def _count_queries(client, url, token):
+    from sqlalchemy import event
+    from tests.conftest import engine
+
+    statements = []
+
+    def _before(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before)
+    try:
+        r = client.get(url, headers=auth_header(token))
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+    assert r.status_code == 200
+    return len(statements)
+
+
+def test_list_endpoints_constant_query_count(client, auth_token, second_auth_token):
+    """Card hydration must not issue per-recipe queries."""
+    _create_recipe(client, second_auth_token)
+    urls = ["/feed", "/recipes/trending", "/recipes/tags/Pasta"]
+    single_page = {url: _count_queries(client, url, auth_token) for url in urls}
+
+    for _ in range(5):
+        _create_recipe(client, second_auth_token)
+    for url in urls:
+        assert _count_queries(client, url, auth_token) == single_page[url]
+
+
+# ── MATERIALIZED SCORES ──────────────────────────────────────────────
+
+
+def test_score_refresh_only_touches_changed_recipes(client, db_session, auth_token):
+    from algorithms.edge_rank_scores import refresh_recipe_scores
+    from models import RecipeScore
+
+    _create_recipe(client, auth_token)
+    _create_recipe(client, auth_token)
+    assert db_session.query(RecipeScore).count() == 2
+    assert refresh_recipe_scores(db_session) == 0
+
+    recipe_id = db_session.query(RecipeScore.recipe_id).first()[0]
+    client.post(f"/recipes/{recipe_id}/like", headers=auth_header(auth_token))
+    assert refresh_recipe_scores(db_session) == 1
+    db_session.commit()
+    assert refresh_recipe_scores(db_session) == 0
+
+
+def test_feed_follow_boost(client, auth_token, second_auth_token):
+    _create_recipe(client, second_auth_token, {**SAMPLE_RECIPE, "title": "Von Chef"})
+    _create_recipe(client, auth_token)
+
+    feed = client.get("/feed", headers=auth_header(auth_token)).json()["data"]
+    assert feed[0]["title"] == "Test Pasta"
+
+    chef_id = feed[1]["owner_id"]
+    client.post(f"/users/{chef_id}/toggle-follow", headers=auth_header(auth_token))
+    feed = client.get("/feed", headers=auth_header(auth_token)).json()["data"]
+    assert feed[0]["title"] == "Von Chef"
+    assert feed[0]["i_follow_owner"] is True
+
+
+def test_feed_pagination_uses_stable_snapshot(client, auth_token, second_auth_token):
+    for i in range(12):
+        _create_recipe(client, second_auth_token, {**SAMPLE_RECIPE, "title": f"R{i}"})
+
+    first = client.get("/feed", headers=auth_header(auth_token)).json()
+    assert len(first["data"]) == 10
+    assert first["nextCursor"]
+
+    # Engagement between pages must not reshuffle the session
+    last_id = first["data"][-1]["id"]
+    client.post(f"/recipes/{last_id}/like", headers=auth_header(auth_token))
+
+    second = client.get(
+        f"/feed?cursor={first['nextCursor']}", headers=auth_header(auth_token)
+    ).json()
+    seen = {c["id"] for c in first["data"]}
+    assert len(second["data"]) == 2
+    assert not seen & {c["id"] for c in second["data"]}
+    assert second["nextCursor"] is None
+
+
+# ── FOLLOWING FEED ───────────────────────────────────────────────────
+
+
+def _user_id(client, token):
+    return client.get("/my-profile", headers=auth_header(token)).json()["id"]
+
+
+def test_following_feed_fan_out_on_write(client, db_session, monkeypatch):
+    from tests.conftest import create_verified_user
+    from models import FeedInboxEntry
+    import services.following_inbox as inbox
+
+    monkeypatch.setattr(inbox, "FANOUT_BATCH_SIZE", 1)
+    chef = create_verified_user(client, "chef", "chef@test.com")
+    fans = [create_verified_user(client, f"fan{i}", f"fan{i}@test.com") for i in range(2)]
+    chef_id = _user_id(client, chef)
+    for fan in fans:
+        client.post(f"/users/{chef_id}/toggle-follow", headers=auth_header(fan))
+
+    _create_recipe(client, chef)
+    assert db_session.query(FeedInboxEntry).count() == 2
+
+    feed = client.get("/feed/following", headers=auth_header(fans[0])).json()
+    assert [c["title"] for c in feed["data"]] == ["Test Pasta"]
+
+    client.post(f"/users/{chef_id}/toggle-follow", headers=auth_header(fans[0]))
+    feed = client.get("/feed/following", headers=auth_header(fans[0])).json()
+    assert feed["data"] == []
+
+
+def test_following_feed_backfill_on_follow(client, auth_token, second_auth_token):
+    _create_recipe(client, second_auth_token)
+    chef_id = _user_id(client, second_auth_token)
+    client.post(f"/users/{chef_id}/toggle-follow", headers=auth_header(auth_token))
+
+    feed = client.get("/feed/following", headers=auth_header(auth_token)).json()
+    assert len(feed["data"]) == 1
+    assert feed["data"][0]["i_follow_owner"] is True
+
+
+def test_following_feed_fan_out_on_read_for_large_creators(
+    client, db_session, auth_token, second_auth_token, monkeypatch
+):
+    from models import FeedInboxEntry, FanoutOnReadCreator
+    import services.following_inbox as inbox
+
+    monkeypatch.setattr(inbox, "FANOUT_FOLLOWER_LIMIT", 0)
+    chef_id = _user_id(client, second_auth_token)
+    client.post(f"/users/{chef_id}/toggle-follow", headers=auth_header(auth_token))
+    _create_recipe(client, second_auth_token)
+
+    assert db_session.query(FeedInboxEntry).count() == 0
+    assert db_session.query(FanoutOnReadCreator).count() == 1
+    feed = client.get("/feed/following", headers=auth_header(auth_token)).json()
+    assert [c["title"] for c in feed["data"]] == ["Test Pasta"]
+
+    # Back below the limit: earlier uploads move into the inbox, pulling stops
+    monkeypatch.setattr(inbox, "FANOUT_FOLLOWER_LIMIT", 10)
+    _create_recipe(client, second_auth_token, {**SAMPLE_RECIPE, "title": "Zweites"})
+    assert db_session.query(FeedInboxEntry).count() == 2
+    assert db_session.query(FanoutOnReadCreator).count() == 0
+    feed = client.get("/feed/following", headers=auth_header(auth_token)).json()
+    assert [c["title"] for c in feed["data"]] == ["Zweites", "Test Pasta"]
+
+
+def test_fan_out_skips_existing_entries_and_trims_inboxes(
+    client, db_session, auth_token, second_auth_token, monkeypatch
+):
+    from models import FeedInboxEntry
+    import services.following_inbox as inbox
+
+    chef_id = _user_id(client, second_auth_token)
+    client.post(f"/users/{chef_id}/toggle-follow", headers=auth_header(auth_token))
+    recipe_id = _create_recipe(client, second_auth_token).json()["id"]
+
+    # A follow backfill raced the fan-out and wrote the entry first
+    assert inbox.fan_out_recipe(db_session, recipe_id, chef_id) == 1
+    assert db_session.query(FeedInboxEntry).count() == 1
+
+    monkeypatch.setattr(inbox, "FEED_INBOX_SIZE", 2)
+    for i in range(3):
+        _create_recipe(client, second_auth_token, {**SAMPLE_RECIPE, "title": f"R{i}"})
+    inbox_ids = [row.recipe_id for row in db_session.query(FeedInboxEntry.recipe_id)]
+    assert len(inbox_ids) == 2
+    assert recipe_id not in inbox_ids
+
+
+# ── CANDIDATES & RANKING ─────────────────────────────────────────────
+
+
+def test_vectorized_ranking_matches_edge_rank_formula():
+    import numpy as np
+    from algorithms.edge_rank_scores import edge_rank_base_score
+    from algorithms.ranking import edge_rank_vectorized, FOLLOW_BOOST
+
+    rng = np.random.default_rng(7)
+    n = 200
+    likes, saves, comments = (rng.integers(0, 500, n) for _ in range(3))
+    views = rng.integers(0, 5000, n)
+    age = rng.uniform(0, 200, n)
+    following = rng.random(n) < 0.3
+
+    vectorized = edge_rank_vectorized(
+        likes.astype(float), saves.astype(float), comments.astype(float),
+        views.astype(float), age, following,
+    )
+    for i in range(n):
+        expected = edge_rank_base_score(
+            int(likes[i]), int(saves[i]), int(comments[i]), int(views[i]), age[i]
+        ) * (FOLLOW_BOOST if following[i] else 1.0)
+        assert vectorized[i] == pytest.approx(expected)
+
+
+def test_tag_affinity_candidates(client, db_session, auth_token, second_auth_token):
+    from algorithms.candidate_generation import tag_affinity
+    from models import Recipe
+
+    _create_recipe(client, second_auth_token, {**SAMPLE_RECIPE, "tags": ["Vegan"]})
+    _create_recipe(client, second_auth_token, {**SAMPLE_RECIPE, "tags": ["Grill"]})
+    _create_recipe(client, second_auth_token, {**SAMPLE_RECIPE, "tags": ["vegan", "Bowl"]})
+    vegan_ids = [
+        r.id for r in db_session.query(Recipe) if "vegan" in [t.lower() for t in r.tags]
+    ]
+    client.post(f"/recipes/{vegan_ids[0]}/like", headers=auth_header(auth_token))
+
+    viewer_id = client.get("/my-profile", headers=auth_header(auth_token)).json()["id"]
+    assert sorted(tag_affinity(db_session, viewer_id, 10)) == sorted(vegan_ids)
+
+
+# ── VIEW EVENTS ──────────────────────────────────────────────────────
+
+
+def test_view_events_are_buffered_deduped_and_flushed(
+    client, db_session, auth_token, second_auth_token, monkeypatch
+):
+    from models import Recipe
+    import routers.recipes_router as recipes_router
+    from services.view_counter import ViewBuffer
+
+    buffer = ViewBuffer(dedupe_seconds=600)
+    monkeypatch.setattr(recipes_router, "view_buffer", buffer)
+    _create_recipe(client, second_auth_token)
+    recipe = db_session.query(Recipe).one()
+
+    events = [{"recipe_id": recipe.id, "watched_ms": 4000}] * 3
+    r = client.post("/recipes/views", json={"events": events}, headers=auth_header(auth_token))
+    assert r.json() == {"accepted": 1}
+    client.post(
+        "/recipes/views",
+        json={"events": [{"recipe_id": recipe.id, "watched_ms": 1000}]},
+        headers=auth_header(second_auth_token),
+    )
+
+    # Nothing is written until the flush
+    db_session.expire_all()
+    assert db_session.get(Recipe, recipe.id).views == 0
+    assert buffer.flush(db_session) == 1
+    db_session.expire_all()
+    stored = db_session.get(Recipe, recipe.id)
+    assert (stored.views, stored.watch_ms_total) == (2, 5000)
+    assert buffer.pending() == {}
+
+
+def test_view_flush_drops_poisoned_deltas(client, db_session, auth_token):
+    from models import Recipe
+    from schemas import MAX_WATCHED_MS
+    from services.view_counter import ViewBuffer
+
+    for _ in range(2):
+        _create_recipe(client, auth_token)
+    good, bad = [r.id for r in db_session.query(Recipe).order_by(Recipe.id)]
+
+    r = client.post(
+        "/recipes/views",
+        json={"events": [{"recipe_id": good, "watched_ms": MAX_WATCHED_MS + 1}]},
+        headers=auth_header(auth_token),
+    )
+    assert r.status_code == 422
+
+    buffer = ViewBuffer(dedupe_seconds=0)
+    # Oversized reports are clamped when recorded
+    buffer.record(1, [(good, 10**19)])
+    assert buffer.pending() == {good: (1, MAX_WATCHED_MS)}
+    # A delta the database rejects (out of range for the column)
+    buffer._pending[bad] = [1, 10**19]
+
+    # The other recipes are still counted; the bad delta is retried once ...
+    assert buffer.flush(db_session) == 1
+    assert buffer.pending() == {bad: (1, 10**19)}
+    buffer.record(2, [(good, 1000)])
+    assert buffer.flush(db_session) == 1
+    # ... and then dropped
+    assert buffer.pending() == {}
+    db_session.expire_all()
+    assert db_session.get(Recipe, good).views == 2
+    assert db_session.get(Recipe, bad).views == 0
+
+
+# ── RECOMMENDATIONS ──────────────────────────────────────────────────
+
+
+def test_interest_vector_updates_incrementally(
+    client, db_session, auth_token, second_auth_token
+):
+    import numpy as np
+
+    from algorithms.recommendation import get_recommended_content, load_user_vector
+    from models import Recipe, UserInterestVector
+
+    vegan = {**SAMPLE_RECIPE, "tags": ["Vegan"], "ingredients": [{"name": "Tofu"}]}
+    grill = {**SAMPLE_RECIPE, "tags": ["Grill"], "ingredients": [{"name": "Steak"}]}
+    for recipe in (vegan, vegan, grill):
+        _create_recipe(client, second_auth_token, recipe)
+    liked, other_vegan, steak = [r.id for r in db_session.query(Recipe).order_by(Recipe.id)]
+    viewer_id = _user_id(client, auth_token)
+    assert get_recommended_content(db_session, viewer_id) == []
+
+    client.post(f"/recipes/{liked}/like", headers=auth_header(auth_token))
+    assert db_session.get(UserInterestVector, viewer_id) is not None
+    ranked = get_recommended_content(db_session, viewer_id)
+    assert [rid for rid, _ in ranked] == [other_vegan, liked]
+    assert steak not in dict(ranked)
+
+    # Saving the steak recipe folds it into the stored vector
+    client.post(f"/recipes/{steak}/toggle-global-save", headers=auth_header(auth_token))
+    db_session.expire_all()
+    ranked = dict(get_recommended_content(db_session, viewer_id))
+    assert ranked[steak] > ranked[other_vegan]
+
+    # Like followed by unlike restores the vector, decay included
+    before = load_user_vector(db_session, viewer_id)
+    for _ in range(2):
+        client.post(f"/recipes/{other_vegan}/like", headers=auth_header(auth_token))
+    db_session.expire_all()
+    after = load_user_vector(db_session, viewer_id)
+    assert after[0].tolist() == before[0].tolist()
+    assert np.allclose(after[1], before[1])
+
+    # Un-liking removes the vegan features again
+    client.post(f"/recipes/{liked}/like", headers=auth_header(auth_token))
+    db_session.expire_all()
+    assert len(load_user_vector(db_session, viewer_id)[0]) == 2
+    assert other_vegan not in dict(get_recommended_content(db_session, viewer_id))
+
+
+def test_interest_history_reads_latest_interactions(
+    client, db_session, auth_token, second_auth_token, monkeypatch
+):
+    import algorithms.recommendation as recommendation
+    from models import Recipe
+
+    vegan = {**SAMPLE_RECIPE, "tags": ["Vegan"], "ingredients": [{"name": "Tofu"}]}
+    grill = {**SAMPLE_RECIPE, "tags": ["Grill"], "ingredients": [{"name": "Steak"}]}
+    for recipe in (vegan, grill):
+        _create_recipe(client, second_auth_token, recipe)
+    first, second = db_session.query(Recipe).order_by(Recipe.id).all()
+    viewer_id = _user_id(client, auth_token)
+    # Liked and saved in reverse upload order
+    for rid in (second.id, first.id):
+        client.post(f"/recipes/{rid}/like", headers=auth_header(auth_token))
+        client.post(f"/recipes/{rid}/toggle-global-save", headers=auth_header(auth_token))
+
+    monkeypatch.setattr(recommendation, "HISTORY_LIMIT", 1)
+    ids, _ = recommendation.build_user_vector(db_session, viewer_id)
+    expected, _ = recommendation.recipe_features(first.tags, first.ingredients)
+    assert ids.tolist() == expected.tolist()
+
+
+def test_first_interest_vector_upserts(client, db_session, auth_token, monkeypatch):
+    from algorithms.recommendation import load_user_vector, train_user_model
+    from models import UserInterestVector
+
+    recipe_id = _create_recipe(client, auth_token).json()["id"]
+    viewer_id = _user_id(client, auth_token)
+    client.post(f"/recipes/{recipe_id}/like", headers=auth_header(auth_token))
+    stored = load_user_vector(db_session, viewer_id)
+
+    # A concurrent request that looked before the first vector was committed
+    get = db_session.get
+    monkeypatch.setattr(
+        db_session,
+        "get",
+        lambda model, key: None if model is UserInterestVector else get(model, key),
+    )
+    train_user_model(db_session, viewer_id, recipe_id, "save")
+    db_session.commit()
+    monkeypatch.undo()
+    db_session.expire_all()
+    assert load_user_vector(db_session, viewer_id)[0].tolist() == stored[0].tolist()
+
+
+# ── ITEM-ITEM NEIGHBOURS ─────────────────────────────────────────────
+
+
+def test_item_neighbors_and_because_you_liked(client, db_session, auth_token):
+    from tests.conftest import create_verified_user
+    from algorithms.item_similarity import refresh_item_neighbors
+    from algorithms.candidate_generation import similar_to_liked
+    from models import Recipe, RecipeNeighbor
+
+    for _ in range(3):
+        _create_recipe(client, auth_token)
+    pasta, curry, cake = [r.id for r in db_session.query(Recipe).order_by(Recipe.id)]
+    fans = [create_verified_user(client, f"fan{i}", f"fan{i}@test.com") for i in range(3)]
+    for fan, liked in zip(fans, [(pasta, curry), (pasta, curry), (pasta, cake)]):
+        for rid in liked:
+            client.post(f"/recipes/{rid}/like", headers=auth_header(fan))
+
+    assert refresh_item_neighbors(db_session) == 3
+    db_session.commit()
+    # cake shares only one user with pasta: below MIN_CO_INTERACTIONS
+    neighbors = {(n.recipe_id, n.neighbor_id) for n in db_session.query(RecipeNeighbor)}
+    assert neighbors == {(pasta, curry), (curry, pasta)}
+
+    r = client.get("/recipes/because-you-liked", headers=auth_header(fans[0]))
+    assert r.json()["source"]["id"] == curry
+    assert [c["id"] for c in r.json()["data"]] == [pasta]
+    fan_id = _user_id(client, fans[2])
+    assert similar_to_liked(db_session, fan_id, 10) == [curry]
+
+    def pairs():
+        return {(n.recipe_id, n.neighbor_id) for n in db_session.query(RecipeNeighbor)}
+
+    # Only recipes with new interactions, and their neighbours, are recomputed
+    assert refresh_item_neighbors(db_session) == 0
+    client.post(f"/recipes/{cake}/like", headers=auth_header(fans[1]))
+    assert refresh_item_neighbors(db_session) == 2
+    db_session.commit()
+    assert {(cake, pasta), (pasta, cake)} <= pairs()
+
+    # A like and an unlike leave the count unchanged but swap who liked cake
+    client.post(f"/recipes/{cake}/like", headers=auth_header(fans[2]))
+    client.post(f"/recipes/{cake}/like", headers=auth_header(fans[0]))
+    assert refresh_item_neighbors(db_session) == 3
+    db_session.commit()
+    assert {(cake, curry), (curry, cake)} <= pairs()
+
+    # The source is the latest like, not the newest recipe liked
+    late = create_verified_user(client, "late", "late@test.com")
+    for rid in (curry, pasta):
+        client.post(f"/recipes/{rid}/like", headers=auth_header(late))
+    r = client.get("/recipes/because-you-liked", headers=auth_header(late))
+    assert r.json()["source"]["id"] == pasta
+
+
+# ── CONTEXTUAL PAIRING ───────────────────────────────────────────────
+
+
+def test_pairings_use_cooccurrence_index(client, db_session, auth_token):
+    from algorithms.contextual_pairing import pairing_index
+    from models import Recipe
+
+    with_sauce = {
+        **SAMPLE_RECIPE,
+        "ingredients": [{"name": "Nudeln"}, {"name": "Tomatensauce"}],
+    }
+    plain = {**SAMPLE_RECIPE, "ingredients": [{"name": "Nudeln"}]}
+    dessert = {**SAMPLE_RECIPE, "tags": ["Dessert"], "ingredients": [{"name": "Zucker"}]}
+    for recipe in (with_sauce, with_sauce, plain, dessert):
+        _create_recipe(client, auth_token, recipe)
+    first, second, current, _ = [r.id for r in db_session.query(Recipe).order_by(Recipe.id)]
+    pairing_index.build(db_session)
+
+    r = client.get(f"/recipes/{current}/pairings", headers=auth_header(auth_token))
+    body = r.json()
+    assert [p["term"] for p in body["pairings"]] == ["tomatensauce"]
+    assert body["pairings"][0]["kind"] == "ingredient"
+    assert sorted(c["id"] for c in body["data"]) == [first, second]
+
+    # Updating a recipe adjusts the index without a rebuild
+    client.patch(
+        f"/recipes/{first}",
+        json={"ingredients": [{"name": "Nudeln"}]},
+        headers=auth_header(auth_token),
+    )
+    r = client.get(f"/recipes/{current}/pairings", headers=auth_header(auth_token))
+    assert r.json() == {"pairings": [], "data": []}
+
+
+def test_pairing_scores_stay_fresh_after_unrelated_writes():
+    from algorithms.contextual_pairing import CooccurrenceIndex
+
+    recipes = {
+        1: ["Nudeln", "Sauce"],
+        2: ["Nudeln", "Sauce"],
+        3: ["Nudeln", "Käse"],
+        4: ["Nudeln", "Käse"],
+        5: ["Sauce", "Salz"],
+        6: ["Reis"],
+        7: ["Reis"],
+        10: ["Nudeln"],
+    }
+    index = CooccurrenceIndex()
+    for rid, names in recipes.items():
+        index.update_recipe(rid, [], names)
+
+    def fresh_terms():
+        fresh = CooccurrenceIndex()
+        for rid, names in recipes.items():
+            fresh.update_recipe(rid, [], names)
+        return fresh.complementary_terms(10)
+
+    assert index.complementary_terms(10) == fresh_terms()
+    # A new recipe changes n, an edit changes a partner's df
+    for rid, names in ((8, ["Salat"]), (5, ["Salz"])):
+        recipes[rid] = names
+        index.update_recipe(rid, [], names)
+        assert index.complementary_terms(10) == fresh_terms()
+    del recipes[6]
+    index.remove_recipe(6)
+    assert index.complementary_terms(10) == fresh_terms()
+
+
+# ── QUALITY SCORE ────────────────────────────────────────────────────
+
+
+def test_quality_scores_batch_refresh(client, db_session, auth_token):
+    from algorithms.quality_score import refresh_quality_scores
+    from algorithms.edge_rank_scores import refresh_recipe_scores
+    from models import Recipe, RecipeScore
+
+    meta = {"video_width": 1080, "video_height": 1920, "video_duration_ms": 30000}
+    _create_recipe(client, auth_token, {**SAMPLE_RECIPE, **meta})
+    _create_recipe(client, auth_token)
+    good, unknown = db_session.query(Recipe).order_by(Recipe.id).all()
+    assert (good.video_height, unknown.video_height) == (1920, None)
+    assert good.quality_score == unknown.quality_score == 0.5
+
+    for r in (good, unknown):
+        r.views = 200
+    good.likes_count, good.saves_count, good.watch_ms_total = 40, 10, 200 * 27000
+    db_session.commit()
+
+    assert refresh_quality_scores(db_session) == 2
+    db_session.commit()
+    db_session.expire_all()
+    assert good.quality_score > 0.5 > unknown.quality_score
+    # Nothing changed since the last pass: nothing is written
+    assert refresh_quality_scores(db_session) == 0
+
+    refresh_recipe_scores(db_session)
+    db_session.commit()
+    scores = {s.recipe_id: s for s in db_session.query(RecipeScore)}
+    assert scores[good.id].quality_score == pytest.approx(good.quality_score)
+
+
+# ── RELATED RECIPES ──────────────────────────────────────────────────
+
+
+def test_related_recipes_tfidf(client, db_session, auth_token):
+    from algorithms.related_recipes import related_index
+    from models import Recipe
+
+    curry = {
+        **SAMPLE_RECIPE,
+        "title": "Linsen Curry",
+        "tags": ["Vegan"],
+        "ingredients": [{"name": "Linsen"}, {"name": "Kokosmilch"}],
+    }
+    dal = {**curry, "title": "Linsen Dal"}
+    cake = {**SAMPLE_RECIPE, "title": "Apfelkuchen", "tags": ["Dessert"],
+            "ingredients": [{"name": "Äpfel"}], "steps": []}
+    for recipe in (curry, dal, cake):
+        _create_recipe(client, auth_token, recipe)
+    curry_id, dal_id, cake_id = [r.id for r in db_session.query(Recipe).order_by(Recipe.id)]
+    related_index.build(db_session)
+
+    r = client.get(f"/recipes/{curry_id}/related", headers=auth_header(auth_token))
+    assert [c["id"] for c in r.json()["data"]] == [dal_id]
+    assert client.get("/recipes/999999/related", headers=auth_header(auth_token)).status_code == 404
+
+    # Editing the cake into a curry is picked up without a rebuild
+    client.patch(
+        f"/recipes/{cake_id}",
+        json={"title": "Linsen Curry", "ingredients": [{"name": "Linsen"}]},
+        headers=auth_header(auth_token),
+    )
+    r = client.get(f"/recipes/{curry_id}/related", headers=auth_header(auth_token))
+    assert sorted(c["id"] for c in r.json()["data"]) == [dal_id, cake_id]
+
+    client.delete(f"/recipes/{dal_id}", headers=auth_header(auth_token))
+    r = client.get(f"/recipes/{curry_id}/related", headers=auth_header(auth_token))
+    assert [c["id"] for c in r.json()["data"]] == [cake_id]
+
+
+def test_related_index_snapshot_is_memory_mapped(client, db_session, auth_token, tmp_path):
+    import numpy as np
+    from algorithms.related_recipes import TfidfIndex
+    from models import Recipe
+
+    _create_recipe(client, auth_token, {**SAMPLE_RECIPE, "title": "Tomaten Pasta"})
+    _create_recipe(client, auth_token, {**SAMPLE_RECIPE, "title": "Tomaten Suppe"})
+    first, second = [r.id for r in db_session.query(Recipe).order_by(Recipe.id)]
+    built = TfidfIndex()
+    built.build(db_session)
+    built.save(str(tmp_path))
+
+    loaded = TfidfIndex()
+    assert loaded.load(str(tmp_path))
+    # The CSR arrays are views onto the mapped files, not copies
+    base = loaded._base.data
+    while not isinstance(base, np.memmap) and base is not None:
+        base = base.base
+    assert isinstance(base, np.memmap)
+    assert loaded.related(first) == built.related(first)
+
+    # A recipe uploaded after the snapshot is caught up by sync_with
+    _create_recipe(client, auth_token, {**SAMPLE_RECIPE, "title": "Tomaten Pasta"})
+    third = db_session.query(Recipe.id).order_by(Recipe.id.desc()).first().id
+    loaded.sync_with(db_session)
+    assert loaded.related(first)[0][0] == third
+    assert second in [rid for rid, _ in loaded.related(first)]
+
+    # An edit made after the snapshot is caught up as well
+    client.patch(
+        f"/recipes/{second}",
+        json={"title": "Apfelkuchen", "ingredients": [{"name": "Äpfel"}], "steps": []},
+        headers=auth_header(auth_token),
+    )
+    loaded.sync_with(db_session)
+    rebuilt = TfidfIndex()
+    rebuilt.build(db_session)
+    assert loaded.related(second) == pytest.approx(rebuilt.related(second))
+    assert loaded.related(second) != built.related(second)
+
+
+def test_related_index_saves_from_several_workers(client, db_session, auth_token, tmp_path):
+    import os
+    from algorithms.related_recipes import TfidfIndex
+
+    _create_recipe(client, auth_token)
+    workers = [TfidfIndex() for _ in range(3)]
+    targets = []
+    for worker in workers:
+        worker.build(db_session)
+        targets.append(os.path.basename(worker.save(str(tmp_path))))
+    # Distinct versions even within one millisecond; no temp files left over
+    assert len(set(targets)) == 3
+    with open(tmp_path / "CURRENT") as f:
+        current = f.read().strip()
+    assert current == targets[-1]
+    assert sorted(os.listdir(tmp_path)) == ["CURRENT", *sorted(targets[-2:])]
+    assert TfidfIndex().load(str(tmp_path))
+
+
+# ── NEAR-DUPLICATES ──────────────────────────────────────────────────
+
+
+def test_near_duplicate_uploads_are_flagged_and_collapsed(
+    client, db_session, auth_token
+):
+    from algorithms.feed_logic import rank_feed
+    from algorithms.near_duplicates import backfill_near_duplicates
+    from models import Recipe, RecipeLshBucket
+
+    lasagne = {
+        **SAMPLE_RECIPE,
+        "title": "Omas Lasagne",
+        "ingredients": [
+            {"name": "Lasagneplatten"},
+            {"name": "Hackfleisch"},
+            {"name": "Tomaten"},
+        ],
+        "steps": [
+            {"order": 1, "instruction": "Hackfleisch anbraten, mit Tomaten ablöschen"},
+            {"order": 2, "instruction": "Sauce und Platten schichten, 40 Minuten backen"},
+        ],
+    }
+    # Same recipe, ingredients reordered and title cased differently
+    reupload = {
+        **lasagne,
+        "title": "omas LASAGNE",
+        "ingredients": list(reversed(lasagne["ingredients"])),
+    }
+    for recipe in (lasagne, SAMPLE_RECIPE, reupload):
+        _create_recipe(client, auth_token, recipe)
+    recipes = db_session.query(Recipe).order_by(Recipe.id).all()
+    assert [r.duplicate_of for r in recipes] == [None, None, recipes[0].id]
+    original, other, copy = [r.id for r in recipes]
+
+    user_id = _user_id(client, auth_token)
+    feed_ids = [rid for rid, _ in rank_feed(db_session, user_id, limit=10)]
+    assert other in feed_ids
+    assert len({original, copy} & set(feed_ids)) == 1
+
+    # Backfill reproduces the flags from scratch
+    db_session.query(Recipe).update({Recipe.duplicate_of: None, Recipe.minhash: None})
+    db_session.query(RecipeLshBucket).delete()
+    stats = backfill_near_duplicates(db_session)
+    db_session.commit()
+    assert stats == {"recipes": 3, "duplicates": 1}
+    db_session.expire_all()
+    assert db_session.get(Recipe, copy).duplicate_of == original
+
+    # Deleting the original promotes the copy
+    client.delete(f"/recipes/{original}", headers=auth_header(auth_token))
+    db_session.expire_all()
+    assert db_session.get(Recipe, copy).duplicate_of is None
+    assert db_session.query(RecipeLshBucket).filter_by(recipe_id=original).count() == 0
+
+
+
+def test_near_duplicate_flags_follow_edits(client, db_session, auth_token):
+    from algorithms.near_duplicates import LSH_BANDS
+    from models import Recipe, RecipeLshBucket
+
+    lasagne = {
+        **SAMPLE_RECIPE,
+        "title": "Omas Lasagne",
+        "ingredients": [{"name": "Lasagneplatten"}, {"name": "Hackfleisch"}],
+        "steps": [{"order": 1, "instruction": "Schichten und 40 Minuten backen"}],
+    }
+    original = _create_recipe(client, auth_token, lasagne).json()["id"]
+    placeholder = _create_recipe(
+        client, auth_token, {**SAMPLE_RECIPE, "title": "Kommt bald"}
+    ).json()["id"]
+    assert db_session.get(Recipe, placeholder).duplicate_of is None
+
+    # Patching a placeholder into a copy is caught like a re-upload
+    r = client.patch(
+        f"/recipes/{placeholder}",
+        json={k: lasagne[k] for k in ("title", "ingredients", "steps")},
+        headers=auth_header(auth_token),
+    )
+    assert r.status_code == 200
+    db_session.expire_all()
+    assert db_session.get(Recipe, placeholder).duplicate_of == original
+    buckets = db_session.query(RecipeLshBucket).filter_by(recipe_id=placeholder)
+    assert buckets.count() == LSH_BANDS
+
+    # Editing the original into another recipe releases its copy
+    client.patch(
+        f"/recipes/{original}",
+        json={
+            "title": "Linsensuppe",
+            "ingredients": [{"name": "Rote Linsen"}, {"name": "Karotten"}],
+            "steps": [{"order": 1, "instruction": "Alles 20 Minuten köcheln"}],
+        },
+        headers=auth_header(auth_token),
+    )
+    db_session.expire_all()
+    assert db_session.get(Recipe, placeholder).duplicate_of is None
+    assert db_session.get(Recipe, original).duplicate_of is None
+
+# ── TAGS ─────────────────────────────────────────────────────────────
+
+
+def test_recipe_tags_table_backs_tag_pages(client, db_session, auth_token):
+    from models import Recipe, RecipeTag
+    from services.recipe_tags import backfill_recipe_tags
+
+    for tags in (["Eis", "Sommer"], [" EI ", "Frühstück"], ["ei"]):
+        _create_recipe(client, auth_token, {**SAMPLE_RECIPE, "tags": tags})
+    eis, omelett, spiegelei = [r.id for r in db_session.query(Recipe).order_by(Recipe.id)]
+
+    def tag_page(tag, **params):
+        r = client.get(f"/recipes/tags/{tag}", params=params, headers=auth_header(auth_token))
+        assert r.status_code == 200
+        return r.json()
+
+    # Exact, case-insensitive match: "ei" no longer matches "Eis"
+    page = tag_page("Ei")
+    assert [c["id"] for c in page["data"]] == [spiegelei, omelett]
+    assert page["nextCursor"] is None
+
+    # Patching tags moves the recipe between tag pages
+    client.patch(
+        f"/recipes/{eis}", json={"tags": ["EI"]}, headers=auth_header(auth_token)
+    )
+    assert [c["id"] for c in tag_page("ei")["data"]] == [spiegelei, omelett, eis]
+    assert tag_page("eis")["data"] == []
+
+    # Backfill reproduces the rows from the JSON column
+    rows = sorted(db_session.query(RecipeTag.recipe_id, RecipeTag.tag).all())
+    db_session.query(RecipeTag).delete()
+    assert backfill_recipe_tags(db_session) == len(rows)
+    db_session.commit()
+    assert sorted(db_session.query(RecipeTag.recipe_id, RecipeTag.tag).all()) == rows
+
+    client.delete(f"/recipes/{omelett}", headers=auth_header(auth_token))
+    assert db_session.query(RecipeTag).filter_by(recipe_id=omelett).count() == 0
+
+
+def test_tag_page_cursor_pagination(client, db_session, auth_token):
+    from models import Recipe
+
+    for i in range(25):
+        _create_recipe(client, auth_token, {**SAMPLE_RECIPE, "title": f"Pasta {i}"})
+    expected = [r.id for r in db_session.query(Recipe.id).order_by(Recipe.id.desc())]
+
+    url = "/recipes/tags/pasta"
+    first = client.get(url, headers=auth_header(auth_token)).json()
+    assert len(first["data"]) == 20
+    second = client.get(
+        url, params={"cursor": first["nextCursor"]}, headers=auth_header(auth_token)
+    ).json()
+    assert second["nextCursor"] is None
+    assert [c["id"] for c in first["data"] + second["data"]] == expected
+
+    # The cursor stays valid after its recipe is deleted
+    client.delete(f"/recipes/{first['data'][-1]['id']}", headers=auth_header(auth_token))
+    again = client.get(
+        url, params={"cursor": first["nextCursor"]}, headers=auth_header(auth_token)
+    ).json()
+    assert [c["id"] for c in again["data"]] == expected[20:]
+
+    r = client.get(url, params={"cursor": "42"}, headers=auth_header(auth_token))
+    assert r.status_code == 400
+
+
+# ── COOK WITH ────────────────────────────────────────────────────────
+
+
+def test_cook_with_ranks_by_ingredient_coverage(client, db_session, auth_token):
+    from algorithms.ingredient_coverage import ingredient_index
+    from models import Recipe
+
+    ingredient_index.build(db_session)
+    recipes = {
+        "Omelett": ["Eier", "Milch", "Salz"],
+        "Pfannkuchen": ["Mehl", "Eier", "Milch", "Zucker"],
+        "Rührei": ["Eier", "Butter"],
+        "Curry": ["Reis", "Kokosmilch"],
+    }
+    for title, names in recipes.items():
+        _create_recipe(
+            client,
+            auth_token,
+            {
+                **SAMPLE_RECIPE,
+                "title": title,
+                "ingredients": [{"name": n, "amount": "1"} for n in names],
+            },
+        )
+    ids = {r.title: r.id for r in db_session.query(Recipe)}
+
+    def cook_with(*ingredients, **params):
+        r = client.get(
+            "/recipes/cook-with",
+            params={"ingredients": list(ingredients), **params},
+            headers=auth_header(auth_token),
+        )
+        assert r.status_code == 200
+        return r.json()
+
+    # Names are normalized; unknown ingredients are ignored
+    body = cook_with("eier", "MILCH", "Salz", "Safran")
+    assert [(c["title"], c["coverage"]) for c in body["data"]] == [
+        ("Omelett", 1.0),
+        ("Pfannkuchen", 0.5),
+        ("Rührei", 0.5),
+    ]
+    assert body["total"] == 3 and body["next_offset"] is None
+    assert body["data"][1]["missing"] == [
+        {"name": "Mehl", "amount": "1"},
+        {"name": "Zucker", "amount": "1"},
+    ]
+    assert body["data"][0]["missing"] == []
+
+    body = cook_with("Eier", "Milch", min_coverage=0.6)
+    assert [c["title"] for c in body["data"]] == ["Omelett"]
+
+    # Edits and deletes reach the index
+    client.patch(
+        f"/recipes/{ids['Curry']}",
+        json={"ingredients": [{"name": "Eier"}]},
+        headers=auth_header(auth_token),
+    )
+    client.delete(f"/recipes/{ids['Omelett']}", headers=auth_header(auth_token))
+    body = cook_with("Eier", limit=1)
+    assert [c["title"] for c in body["data"]] == ["Curry"]
+    assert (body["total"], body["next_offset"]) == (3, 1)
+
+
+def test_cook_with_ignores_amounts_units_and_adjectives(client, db_session, auth_token):
+    from algorithms.ingredient_coverage import ingredient_index, normalize_ingredient
+
+    ingredient_index.build(db_session)
+    assert normalize_ingredient("2 rote Zwiebeln, gehackt") == normalize_ingredient(
+        "zwiebel"
+    )
+    ingredients = [
+        {"name": "2 Eier", "amount": "2", "unit": "Stück"},
+        {"name": "100ml Milch", "amount": "100", "unit": "ml"},
+        {"name": "Rote Zwiebeln", "amount": "2"},
+        {"name": "1 Prise Salz", "amount": "1", "unit": "Prise"},
+    ]
+    _create_recipe(client, auth_token, {**SAMPLE_RECIPE, "ingredients": ingredients})
+
+    r = client.get(
+        "/recipes/cook-with",
+        params={"ingredients": ["Eier", "milch", "Zwiebel"]},
+        headers=auth_header(auth_token),
+    )
+    [card] = r.json()["data"]
+    assert card["coverage"] == 0.75
+    assert card["missing"] == [ingredients[3]]
+
+
+def test_ingredient_index_bincount_coverage_at_scale():
+    import numpy as np
+    from algorithms.ingredient_coverage import IngredientIndex, normalize_ingredient
+
+    rng = np.random.default_rng(0)
+    names = [f"zutat{i}" for i in range(300)]
+    index = IngredientIndex()
+    recipes = {}
+    for rid in range(1, 20001):
+        picks = [names[i] for i in rng.choice(300, size=6, replace=False)]
+        recipes[rid] = set(picks)
+        index.update_recipe(rid, [{"name": n} for n in picks])
+    have = set(names[:40])
+
+    hits, total = index.cook_with({normalize_ingredient(n) for n in have}, limit=50)
+    expected = sorted(
+        (
+            (len(ings & have) / len(ings), len(ings & have), rid)
+            for rid, ings in recipes.items()
+            if ings & have
+        ),
+        reverse=True,
+    )
+    assert total == len(expected)
+    assert [(rid, matched) for rid, _, matched in hits] == [
+        (rid, matched) for _, matched, rid in expected[:50]
+    ]
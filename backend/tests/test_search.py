@@ -0,0 +1,268 @@
+"""Tests for search_router: BM25 recipe search."""
+
+import pytest
+
+from tests.conftest import auth_header
+
+RECIPE = {
+    "title": "Spaghetti Carbonara",
+    "video_url": "/static/videos/test.mp4",
+    "ingredients": [{"name": "Spaghetti"}, {"name": "Guanciale"}, {"name": "Pecorino"}],
+    "steps": [{"order": 1, "instruction": "Nudeln kochen"}],
+    "tags": ["Pasta", "Italienisch"],
+}
+
+
+def _upload(client, token, **overrides):
+    client.post("/upload", json={**RECIPE, **overrides}, headers=auth_header(token))
+
+
+def _search(client, token, q, **params):
+    r = client.get("/search", params={"q": q, **params}, headers=auth_header(token))
+    assert r.status_code == 200
+    return r.json()
+
+
+def _titles(body):
+    return [v["title"] for v in body["videos"]]
+
+
+def test_search_ranks_by_bm25_over_all_fields(client, db_session, auth_token):
+    from algorithms.search_engine import search_index
+
+    search_index.build(db_session)
+    _upload(client, auth_token)
+    _upload(
+        client,
+        auth_token,
+        title="Pesto Pasta",
+        tags=["Vegetarisch"],
+        ingredients=[{"name": "Basilikum"}],
+    )
+    _upload(
+        client,
+        auth_token,
+        title="Tomatensuppe",
+        tags=["Suppe"],
+        ingredients=[{"name": "Tomaten"}],
+    )
+
+    # Tags and ingredients are searchable, not only titles
+    assert _titles(_search(client, auth_token, "italienisch")) == ["Spaghetti Carbonara"]
+    assert _titles(_search(client, auth_token, "basilikum")) == ["Pesto Pasta"]
+    # A title hit outranks a tag hit
+    assert _titles(_search(client, auth_token, "pasta")) == [
+        "Pesto Pasta",
+        "Spaghetti Carbonara",
+    ]
+    # The last word matches as a prefix while typing
+    assert _titles(_search(client, auth_token, "tomat")) == ["Tomatensuppe"]
+    assert _search(client, auth_token, "tom ")["videos"] == []
+    # Chef (uploader username) is indexed too
+    assert _search(client, auth_token, "testuser")["total"] == 3
+
+
+def test_search_pagination(client, db_session, auth_token):
+    from algorithms.search_engine import search_index
+
+    search_index.build(db_session)
+    for i in range(5):
+        _upload(client, auth_token, title=f"Pasta Nummer {i}")
+
+    first = _search(client, auth_token, "pasta", limit=2)
+    assert first["total"] == 5 and first["next_offset"] == 2
+    second = _search(client, auth_token, "pasta", limit=2, offset=2)
+    last = _search(client, auth_token, "pasta", limit=2, offset=4)
+    assert last["next_offset"] is None
+    ids = [v["id"] for page in (first, second, last) for v in page["videos"]]
+    assert len(set(ids)) == 5
+
+
+def test_search_index_follows_edits_and_snapshots(
+    client, db_session, auth_token, tmp_path
+):
+    from algorithms.search_engine import SearchIndex, search_index
+    from models import Recipe
+
+    search_index.build(db_session)
+    _upload(client, auth_token)
+    recipe_id = db_session.query(Recipe.id).first().id
+
+    client.patch(
+        f"/recipes/{recipe_id}",
+        json={"title": "Cacio e Pepe"},
+        headers=auth_header(auth_token),
+    )
+    assert _titles(_search(client, auth_token, "cacio")) == ["Cacio e Pepe"]
+    assert _search(client, auth_token, "carbonara")["videos"] == []
+
+    path = str(tmp_path / "search.json")
+    search_index.save(path)
+    loaded = SearchIndex()
+    assert loaded.load(path)
+    assert loaded.search("pepe") == search_index.search("pepe")
+    assert [f.name for f in tmp_path.iterdir()] == ["search.json"]
+
+    # An edit handled by another worker after the snapshot is caught up too
+    client.patch(
+        f"/recipes/{recipe_id}",
+        json={"title": "Aglio e Olio"},
+        headers=auth_header(auth_token),
+    )
+    loaded.sync_with(db_session)
+    assert loaded.search("pepe") == ([], 0)
+    assert loaded.search("aglio") == search_index.search("aglio")
+
+    client.delete(f"/recipes/{recipe_id}", headers=auth_header(auth_token))
+    assert _search(client, auth_token, "cacio")["videos"] == []
+    # A worker loading the older snapshot drops the deleted recipe on sync
+    loaded.sync_with(db_session)
+    assert loaded.search("aglio") == ([], 0)
+
+
+@pytest.mark.parametrize("backend", ["index", "fulltext"])
+def test_search_backends_return_same_response(
+    client, db_session, auth_token, monkeypatch, backend
+):
+    import routers.search_router
+    from algorithms.search_engine import search_index
+    from migrations import run_auto_migrations
+    from models import Recipe
+    from tests.conftest import engine
+
+    # FTS5 table + triggers; rows uploaded afterwards are indexed by the triggers
+    run_auto_migrations(engine)
+    monkeypatch.setattr(routers.search_router, "SEARCH_BACKEND", backend)
+    search_index.build(db_session)
+    _upload(client, auth_token)
+    _upload(
+        client,
+        auth_token,
+        title="Pesto Pasta",
+        tags=["Vegetarisch"],
+        ingredients=[{"name": "Basilikum"}],
+    )
+    _upload(client, auth_token, title="Linsensuppe", tags=["Suppe"], ingredients=[])
+
+    assert _titles(_search(client, auth_token, "guanciale")) == ["Spaghetti Carbonara"]
+    assert _titles(_search(client, auth_token, "pasta")) == [
+        "Pesto Pasta",
+        "Spaghetti Carbonara",
+    ]
+    assert _titles(_search(client, auth_token, "linse")) == ["Linsensuppe"]
+
+    body = _search(client, auth_token, "pasta", limit=1)
+    assert (body["total"], body["next_offset"]) == (2, 1)
+    assert _titles(_search(client, auth_token, "pasta", limit=1, offset=1)) == [
+        "Spaghetti Carbonara"
+    ]
+
+    # Edits and deletes reach the FTS table through the triggers
+    first = db_session.query(Recipe.id).order_by(Recipe.id).first().id
+    client.patch(
+        f"/recipes/{first}",
+        json={"title": "Cacio e Pepe"},
+        headers=auth_header(auth_token),
+    )
+    assert _titles(_search(client, auth_token, "cacio")) == ["Cacio e Pepe"]
+    client.delete(f"/recipes/{first}", headers=auth_header(auth_token))
+    assert _search(client, auth_token, "cacio")["videos"] == []
+
+
+def test_search_folds_umlauts_splits_compounds_and_corrects_typos(
+    client, db_session, auth_token
+):
+    from algorithms.search_engine import search_index
+
+    search_index.build(db_session)
+    _upload(
+        client,
+        auth_token,
+        title="Omas Käsespätzle",
+        tags=["Schwäbisch"],
+        ingredients=[{"name": "Bergkäse"}, {"name": "Zwiebeln"}],
+    )
+    _upload(client, auth_token, title="Linsensuppe", tags=["Suppe"], ingredients=[])
+
+    for q in ("Käsespätzle", "kaesespaetzle", "spätzle", "spaetzle", "schwaebisch"):
+        assert _titles(_search(client, auth_token, q)) == ["Omas Käsespätzle"], q
+    # Light stemming: singular finds the plural
+    assert _titles(_search(client, auth_token, "Zwiebel ")) == ["Omas Käsespätzle"]
+    # Compound parts: "Suppe" finds Linsensuppe, "Linsen" too
+    assert set(_titles(_search(client, auth_token, "suppe "))) == {"Linsensuppe"}
+    assert _titles(_search(client, auth_token, "linsen ")) == ["Linsensuppe"]
+    # Typos within two edits are corrected, short words only within one
+    assert _titles(_search(client, auth_token, "kasespatzle ")) == ["Omas Käsespätzle"]
+    assert _titles(_search(client, auth_token, "linsensupe ")) == ["Linsensuppe"]
+    assert _search(client, auth_token, "xyzzy ")["videos"] == []
+
+
+def test_symspell_lookup():
+    from algorithms.spelling import SymSpell, edit_distance
+
+    speller = SymSpell()
+    for term in ("spaetzl", "spargel", "spinat", "kaesespaetzl"):
+        speller.add(term)
+    assert speller.lookup("spaetzl") == [(0, "spaetzl")]
+    assert speller.lookup("spatzl") == [(1, "spaetzl")]
+    # An adjacent swap is one edit
+    assert speller.lookup("sipnat") == [(1, "spinat")]
+    assert speller.lookup("kasespatzl") == [(2, "kaesespaetzl")]
+    assert speller.lookup("kasespatzl", max_distance=1) == []
+    speller.remove("spinat")
+    assert speller.lookup("sipnat") == []
+    assert edit_distance("spargel", "spaetzl", 2) == 3
+
+
+def _suggest(client, token, q):
+    r = client.get("/autocomplete", params={"q": q}, headers=auth_header(token))
+    assert r.status_code == 200
+    return r.json()["suggestions"]
+
+
+def test_autocomplete_prefixes_and_popularity(client, db_session, auth_token):
+    from algorithms.autocomplete import autocomplete_index
+    from models import Recipe
+    from tests.conftest import create_verified_user
+
+    _upload(client, auth_token, title="Pasta al Limone", tags=["Pasta"])
+    _upload(client, auth_token, title="Pastinaken Suppe", tags=["Suppe"])
+    popular = db_session.query(Recipe).filter_by(title="Pastinaken Suppe").one()
+    popular.likes_count = 10
+    db_session.commit()
+    autocomplete_index.build(db_session)
+
+    assert _suggest(client, auth_token, "past") == [
+        {"type": "recipe", "id": popular.id, "title": "Pastinaken Suppe"},
+        {"type": "tag", "tag": "pasta"},
+        {"type": "recipe", "id": popular.id - 1, "title": "Pasta al Limone"},
+    ]
+    # Inner words of titles match too
+    assert [s["title"] for s in _suggest(client, auth_token, "lim")] == ["Pasta al Limone"]
+
+    # Register, profile edit and upload update the index without a rebuild
+    token = create_verified_user(client, "kochprofi", "koch@test.com")
+    assert [s["username"] for s in _suggest(client, auth_token, "koch")] == ["kochprofi"]
+    client.post(
+        "/update-profile",
+        data={"display_name": "Zitronen Zauberer", "bio": "Hallo"},
+        headers=auth_header(token),
+    )
+    assert _suggest(client, auth_token, "zaub")[0]["display_name"] == "Zitronen Zauberer"
+    _upload(client, token, title="Zitronenkuchen", tags=["Backen"])
+    assert {s["type"] for s in _suggest(client, auth_token, "zitr")} == {"user", "recipe"}
+    assert _suggest(client, auth_token, "back") == [{"type": "tag", "tag": "backen"}]
+
+
+def test_autocomplete_stays_within_memory_budget():
+    from algorithms.autocomplete import AutocompleteIndex
+
+    index = AutocompleteIndex(memory_budget_bytes=50_000)
+    for i in range(500):
+        index.update_recipe(i, f"Rezept {i}", [], weight=i)
+    assert index.approx_bytes <= 50_000
+    # The least popular entries were evicted first
+    assert index.suggest("rezept", limit=1) == [
+        {"type": "recipe", "id": 499, "title": "Rezept 499"}
+    ]
+    assert index.suggest("0") == []
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(dt: datetime) -> datetime:
+    """SQLite hands back naive values (stored as UTC); Postgres aware ones."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def to_iso(dt: Optional[datetime]) -> Optional[str]:
+    """Serialize like the former string columns: naive UTC ISO 8601."""
+    if dt is None:
+        return None
+    if isinstance(dt, str):
+        return dt
+    return as_utc(dt).replace(tzinfo=None).isoformat()
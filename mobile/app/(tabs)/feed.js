@@ -25,6 +25,7 @@ export default function FeedTab() {
     const [newComment, setNewComment] = useState('');
     const [commentLoading, setCommentLoading] = useState(false);
     const [commentVideoId, setCommentVideoId] = useState(null);
+    const [commentsCursor, setCommentsCursor] = useState(null);
 
     const [saveModalVisible, setSaveModalVisible] = useState(false);
     const [recipeToSave, setRecipeToSave] = useState(null);
@@ -102,12 +103,44 @@ export default function FeedTab() {
         setCommentVideoId(videoId);
         setCommentsVisible(true);
         setCommentLoading(true);
+        setCurrentComments([]);
+        setCommentsCursor(null);
         try {
             const r = await fetch(`${BASE_URL}/recipes/${videoId}/comments`, { headers: { 'Authorization': `Bearer ${userToken}` } });
-            setCurrentComments(await r.json());
+            const d = await r.json();
+            setCurrentComments(d.data || []);
+            setCommentsCursor(d.nextCursor);
         } catch (e) { } finally { setCommentLoading(false); }
     };
 
+    const loadMoreComments = async () => {
+        if (!commentsCursor || !commentVideoId) return;
+        const cursor = commentsCursor;
+        setCommentsCursor(null);
+        try {
+            const r = await fetch(`${BASE_URL}/recipes/${commentVideoId}/comments?cursor=${cursor}`, { headers: { 'Authorization': `Bearer ${userToken}` } });
+            const d = await r.json();
+            setCurrentComments(prev => [...prev, ...(d.data || [])]);
+            setCommentsCursor(d.nextCursor);
+        } catch (e) { setCommentsCursor(cursor); }
+    };
+
+    // Replies are loaded page by page when a thread is expanded
+    const loadReplies = async (parentId) => {
+        const parent = currentComments.find(c => c.id === parentId);
+        const cursor = parent?.repliesCursor;
+        try {
+            const r = await fetch(`${BASE_URL}/recipes/${commentVideoId}/comments/${parentId}/replies${cursor ? `?cursor=${cursor}` : ''}`, { headers: { 'Authorization': `Bearer ${userToken}` } });
+            const d = await r.json();
+            setCurrentComments(prev => prev.map(c => {
+                if (c.id !== parentId) return c;
+                const known = new Set((c.replies || []).map(reply => reply.id));
+                const fresh = (d.data || []).filter(reply => !known.has(reply.id));
+                return { ...c, replies: [...(c.replies || []), ...fresh], repliesCursor: d.nextCursor, repliesLoaded: true };
+            }));
+        } catch (e) { }
+    };
+
     const sendComment = async (parentId = null) => {
         if (!newComment.trim() || !commentVideoId) return;
         try {
@@ -115,10 +148,10 @@ export default function FeedTab() {
             if (parentId) body.parent_id = parentId;
             const r = await fetch(`${BASE_URL}/recipes/${commentVideoId}/comments`, { method: 'POST', headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${userToken}` }, body: JSON.stringify(body) });
             const d = await r.json();
-            if (parentId) {
-                // Add reply to the parent's replies array
+            if (d.parent_id) {
+                // Add reply to its thread (replies to replies join the top-level thread)
                 setCurrentComments(prev => prev.map(c => 
-                    c.id === parentId ? { ...c, replies: [...(c.replies || []), d] } : c
+                    c.id === d.parent_id ? { ...c, replies: [...(c.replies || []), d], replies_count: (c.replies_count || 0) + 1 } : c
                 ));
             } else {
                 // Add as top-level comment
@@ -203,7 +236,10 @@ export default function FeedTab() {
                 visible={commentsVisible}
                 onClose={() => setCommentsVisible(false)}
                 comments={currentComments}
+                totalCount={videos.find(v => v.id === commentVideoId)?.comments_count}
                 loading={commentLoading}
+                loadMoreComments={loadMoreComments}
+                loadReplies={loadReplies}
                 newComment={newComment}
                 setNewComment={setNewComment}
                 sendComment={sendComment}
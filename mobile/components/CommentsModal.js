@@ -4,7 +4,7 @@ import { Ionicons } from '@expo/vector-icons';
 import { BASE_URL, getFullUrl } from '../constants/Config';
 import { useGlobal } from '../context/GlobalContext';
 
-const CommentsModal = ({ visible, onClose, comments, loading, newComment, setNewComment, sendComment, toggleCommentLike }) => {
+const CommentsModal = ({ visible, onClose, comments, totalCount, loading, loadMoreComments, loadReplies, newComment, setNewComment, sendComment, toggleCommentLike }) => {
     const { themeColor } = useGlobal();
     const styles = getStyles(themeColor);
 
@@ -28,11 +28,14 @@ const CommentsModal = ({ visible, onClose, comments, loading, newComment, setNew
         return d.toLocaleDateString();
     };
 
-    // Count all comments including replies
-    const totalCount = comments.reduce((sum, c) => sum + 1 + (c.replies?.length || 0), 0);
+    // Count all comments including replies (loaded pages only, if the recipe's total is unknown)
+    const commentCount = totalCount ?? comments.reduce((sum, c) => sum + 1 + (c.replies_count || 0), 0);
 
-    const toggleReplies = (commentId) => {
-        setExpandedReplies(prev => ({ ...prev, [commentId]: !prev[commentId] }));
+    const toggleReplies = (comment) => {
+        if (!expandedReplies[comment.id] && !comment.repliesLoaded) {
+            loadReplies && loadReplies(comment.id);
+        }
+        setExpandedReplies(prev => ({ ...prev, [comment.id]: !prev[comment.id] }));
     };
 
     const handleReply = (comment) => {
@@ -74,13 +77,13 @@ const CommentsModal = ({ visible, onClose, comments, loading, newComment, setNew
                         <Text style={styles.replyButton}>Antworten</Text>
                     </TouchableOpacity>
                     
-                    {!isReply && item.replies?.length > 0 && (
-                        <TouchableOpacity onPress={() => toggleReplies(item.id)} style={{ flexDirection: 'row', alignItems: 'center' }}>
+                    {!isReply && item.replies_count > 0 && (
+                        <TouchableOpacity onPress={() => toggleReplies(item)} style={{ flexDirection: 'row', alignItems: 'center' }}>
                             <View style={styles.replyLine} />
                             <Text style={styles.viewRepliesText}>
                                 {expandedReplies[item.id] 
                                     ? 'Antworten ausblenden' 
-                                    : `${item.replies.length} ${item.replies.length === 1 ? 'Antwort' : 'Antworten'} anzeigen`}
+                                    : `${item.replies_count} ${item.replies_count === 1 ? 'Antwort' : 'Antworten'} anzeigen`}
                             </Text>
                         </TouchableOpacity>
                     )}
@@ -103,7 +106,7 @@ const CommentsModal = ({ visible, onClose, comments, loading, newComment, setNew
                 <View style={[styles.modalContent, { height: '65%' }]}>
                     <View style={styles.modalHandle} />
                     <View style={styles.modalHeader}>
-                        <Text style={styles.modalTitle}>Kommentare ({totalCount})</Text>
+                        <Text style={styles.modalTitle}>Kommentare ({commentCount})</Text>
                         <TouchableOpacity onPress={() => { cancelReply(); onClose(); }}>
                             <Ionicons name="close" size={24} color="white" />
                         </TouchableOpacity>
@@ -121,8 +124,16 @@ const CommentsModal = ({ visible, onClose, comments, loading, newComment, setNew
                                     {expandedReplies[item.id] && item.replies?.map(reply => 
                                         renderCommentItem(reply, true)
                                     )}
+                                    {expandedReplies[item.id] && item.repliesCursor && (
+                                        <TouchableOpacity onPress={() => loadReplies(item.id)} style={styles.moreReplies}>
+                                            <View style={styles.replyLine} />
+                                            <Text style={styles.viewRepliesText}>Weitere Antworten anzeigen</Text>
+                                        </TouchableOpacity>
+                                    )}
                                 </View>
                             )}
+                            onEndReached={loadMoreComments}
+                            onEndReachedThreshold={0.5}
                             ListEmptyComponent={<Text style={{ textAlign: 'center', marginTop: 20, color: '#888' }}>Schreib den ersten Kommentar!</Text>}
                         />
                     )}
@@ -178,6 +189,7 @@ const getStyles = (themeColor) => StyleSheet.create({
     replyButton: { color: '#888', fontSize: 12, fontWeight: '600' },
     viewRepliesText: { color: '#888', fontSize: 12, fontWeight: '600' },
     replyLine: { width: 20, height: 1, backgroundColor: '#555', marginRight: 8 },
+    moreReplies: { flexDirection: 'row', alignItems: 'center', paddingLeft: 55, paddingBottom: 8 },
     
     replyIndicator: { 
         flexDirection: 'row', justifyContent: 'space-between', alignItems: 'center',
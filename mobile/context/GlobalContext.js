@@ -249,12 +249,9 @@ export const GlobalProvider = ({ children }) => {
     const loadUnreadChatCount = async () => {
         if (!userToken) return;
         try {
-            const r = await apiFetch(`${BASE_URL}/conversations`, { headers: { 'Authorization': `Bearer ${userToken}` } });
+            const r = await apiFetch(`${BASE_URL}/conversations/unread-count`, { headers: { 'Authorization': `Bearer ${userToken}` } });
             const data = await r.json();
-            if (Array.isArray(data)) {
-                const total = data.reduce((sum, c) => sum + (c.unread_count || 0), 0);
-                setUnreadChatCount(total);
-            }
+            setUnreadChatCount(data.unread_count || 0);
         } catch (e) { setUnreadChatCount(0); }
     };
 
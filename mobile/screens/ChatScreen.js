@@ -15,6 +15,7 @@ const ChatScreen = () => {
     const { userToken } = useGlobal();
     const router = useRouter();
     const [conversations, setConversations] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
     const [refreshing, setRefreshing] = useState(false);
 
@@ -25,7 +26,10 @@ const ChatScreen = () => {
                 headers: { 'Authorization': `Bearer ${userToken}` },
             });
             const data = await r.json();
-            if (Array.isArray(data)) setConversations(data);
+            if (Array.isArray(data.data)) {
+                setConversations(data.data);
+                setNextCursor(data.nextCursor);
+            }
         } catch (e) {
             console.log('Chat load error', e);
         } finally {
@@ -38,6 +42,24 @@ const ChatScreen = () => {
         loadConversations();
     }, [loadConversations]);
 
+    const loadMoreConversations = async () => {
+        if (!nextCursor || !userToken) return;
+        const cursor = nextCursor;
+        setNextCursor(null);
+        try {
+            const r = await fetch(`${BASE_URL}/conversations?cursor=${encodeURIComponent(cursor)}`, {
+                headers: { 'Authorization': `Bearer ${userToken}` },
+            });
+            const data = await r.json();
+            if (Array.isArray(data.data)) {
+                setConversations(prev => [...prev, ...data.data]);
+                setNextCursor(data.nextCursor);
+            }
+        } catch (e) {
+            setNextCursor(cursor);
+        }
+    };
+
     const onRefresh = () => {
         setRefreshing(true);
         loadConversations();
@@ -139,6 +161,8 @@ const ChatScreen = () => {
                     data={conversations}
                     keyExtractor={(item) => item.id.toString()}
                     renderItem={renderConversation}
+                    onEndReached={loadMoreConversations}
+                    onEndReachedThreshold={0.5}
                     refreshControl={
                         <RefreshControl refreshing={refreshing} onRefresh={onRefresh} tintColor={themeColor} />
                     }
@@ -24,6 +24,7 @@ const SearchScreen = ({ userToken, navigation, onChefPress, onVideoPress }) => {
     const [hasSearched, setHasSearched] = useState(false);
     const [trendingVideos, setTrendingVideos] = useState([]);
     const [isLoadingTrending, setIsLoadingTrending] = useState(true);
+    const [suggestions, setSuggestions] = useState([]);
 
     React.useEffect(() => {
         const fetchTrending = async () => {
@@ -42,6 +43,38 @@ const SearchScreen = ({ userToken, navigation, onChefPress, onVideoPress }) => {
         if (userToken) fetchTrending();
     }, [userToken]);
 
+    // Typeahead: ask /autocomplete shortly after the user stops typing
+    React.useEffect(() => {
+        const q = searchText.trim();
+        if (!q || hasSearched || !userToken) {
+            setSuggestions([]);
+            return;
+        }
+        const timer = setTimeout(async () => {
+            try {
+                const r = await fetch(`${BASE_URL}/autocomplete?q=${encodeURIComponent(q)}`, {
+                    headers: { 'Authorization': `Bearer ${userToken}` }
+                });
+                const d = await r.json();
+                setSuggestions(Array.isArray(d.suggestions) ? d.suggestions : []);
+            } catch (e) {
+                console.log(e);
+            }
+        }, 150);
+        return () => clearTimeout(timer);
+    }, [searchText, hasSearched, userToken]);
+
+    const handleSuggestionPress = (item) => {
+        if (item.type === 'user') {
+            onChefPress && onChefPress(item.id);
+        } else if (item.type === 'tag') {
+            handleTagPress(item.tag);
+        } else {
+            setSearchText(item.title);
+            handleSearch(item.title);
+        }
+    };
+
     const handleSearch = async (query) => {
         const q = query || searchText;
         if (!q.trim()) return;
@@ -131,7 +164,7 @@ const SearchScreen = ({ userToken, navigation, onChefPress, onVideoPress }) => {
                         placeholder="Rezepte oder Köche suchen..."
                         placeholderTextColor="#666"
                         value={searchText}
-                        onChangeText={setSearchText}
+                        onChangeText={(text) => { setSearchText(text); setHasSearched(false); }}
                         onSubmitEditing={() => handleSearch()}
                         returnKeyType="search"
                     />
@@ -149,6 +182,25 @@ const SearchScreen = ({ userToken, navigation, onChefPress, onVideoPress }) => {
                     <ActivityIndicator size="large" color={themeColor} />
                     <Text style={styles.searchingText}>Suche...</Text>
                 </View>
+            ) : !hasSearched && suggestions.length > 0 ? (
+                /* Typeahead suggestions */
+                <FlatList
+                    data={suggestions}
+                    keyExtractor={(item) => `${item.type}:${item.id || item.tag}`}
+                    keyboardShouldPersistTaps="handled"
+                    renderItem={({ item }) => (
+                        <TouchableOpacity style={styles.suggestionItem} onPress={() => handleSuggestionPress(item)} activeOpacity={0.7}>
+                            <Ionicons
+                                name={item.type === 'user' ? 'person-outline' : item.type === 'tag' ? 'pricetag-outline' : 'restaurant-outline'}
+                                size={18}
+                                color="#888"
+                            />
+                            <Text style={styles.suggestionText} numberOfLines={1}>
+                                {item.type === 'user' ? `${item.display_name} @${item.username}` : item.type === 'tag' ? `#${item.tag}` : item.title}
+                            </Text>
+                        </TouchableOpacity>
+                    )}
+                />
             ) : !hasSearched ? (
                 /* Trending Tags & Grid */
                 <ScrollView style={styles.trendingContainer} showsVerticalScrollIndicator={false}>
@@ -249,6 +301,8 @@ const getStyles = (themeColor) => StyleSheet.create({
 
     centered: { flex: 1, justifyContent: 'center', alignItems: 'center' },
     searchingText: { color: '#666', marginTop: 12, fontSize: 14 },
+    suggestionItem: { flexDirection: 'row', alignItems: 'center', paddingHorizontal: 20, paddingVertical: 12 },
+    suggestionText: { color: 'white', fontSize: 15, marginLeft: 12, flex: 1 },
 
     trendingContainer: { flex: 1 },
     tagsScrollWrapper: { marginBottom: 24, marginTop: 8 },
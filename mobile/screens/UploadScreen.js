@@ -40,6 +40,7 @@ const UploadScreen = ({ userToken, onUploadComplete }) => {
 
     const [uploadTitle, setUploadTitle] = useState('');
     const [uploadVideoUri, setUploadVideoUri] = useState(null);
+    const [uploadVideoMeta, setUploadVideoMeta] = useState({});
     const [isUploading, setIsUploading] = useState(false);
     const [ingredientsText, setIngredientsText] = useState('');
     const [stepsText, setStepsText] = useState('');
@@ -75,7 +76,16 @@ const UploadScreen = ({ userToken, onUploadComplete }) => {
             mediaTypes: ImagePicker.MediaTypeOptions.Videos,
             quality: 1,
         });
-        if (!r.canceled) setUploadVideoUri(r.assets[0].uri);
+        if (!r.canceled) {
+            const asset = r.assets[0];
+            setUploadVideoUri(asset.uri);
+            // Resolution/duration feed the backend quality score (unknown = null)
+            setUploadVideoMeta({
+                video_width: asset.width || null,
+                video_height: asset.height || null,
+                video_duration_ms: asset.duration ? Math.round(asset.duration) : null,
+            });
+        }
     };
 
     const getFileSize = async (uri) => {
@@ -206,11 +216,11 @@ const UploadScreen = ({ userToken, onUploadComplete }) => {
             // Step 4: Create recipe entry
             setIsProcessing(true);
             const tagsArray = uploadTags.split(',').map(t => t.trim()).filter(t => t.length > 0);
-            const rData = { title: uploadTitle, video_url: vUrl, ingredients: ingredientsText.split('\n').map(l => ({ name: l, amount: "1", unit: "x" })), steps: stepsText.split('\n').map((l, i) => ({ order: i + 1, instruction: l })), tags: tagsArray, tips: uploadTips || null };
+            const rData = { title: uploadTitle, video_url: vUrl, ingredients: ingredientsText.split('\n').map(l => ({ name: l, amount: "1", unit: "x" })), steps: stepsText.split('\n').map((l, i) => ({ order: i + 1, instruction: l })), tags: tagsArray, tips: uploadTips || null, ...uploadVideoMeta };
             await fetch(`${BASE_URL}/upload`, { method: 'POST', headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${userToken}`, 'bypass-tunnel-reminder': 'true' }, body: JSON.stringify(rData) });
 
             showMessage("Dein Rezept ist online! 🎉", "success");
-            setUploadTitle(''); setUploadVideoUri(null); setUploadTags(''); setUploadTips(''); setIngredientsText(''); setStepsText(''); setUploadProgress(0); setIsProcessing(false);
+            setUploadTitle(''); setUploadVideoUri(null); setUploadVideoMeta({}); setUploadTags(''); setUploadTips(''); setIngredientsText(''); setStepsText(''); setUploadProgress(0); setIsProcessing(false);
             if (onUploadComplete) onUploadComplete();
         } catch (e) {
             showMessage(e.message);